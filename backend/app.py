@@ -1,19 +1,40 @@
+import time
+
+# Taken before the heavy imports so startup time covers the whole worker boot
+PROCESS_STARTED = time.perf_counter()
+
 from flask import Flask
 from dotenv import load_dotenv
 import os
 
+# Load .env before importing modules that read configuration from the environment
+load_dotenv()
+
 from routes import voice_detection_bp
-from model.model_loader import load_model_and_scaler
+from health import health_bp
+from monitoring import monitoring_bp
+from streaming.ws_routes import sock, streaming_bp
+from runtime import startup
+from config import MAX_REQUEST_BYTES
 
 def create_app():
-    load_dotenv()
     app = Flask(__name__)
     app.config["API_KEY"] = os.getenv("API_KEY")
+    # Werkzeug refuses larger bodies (413) while reading them, including chunked uploads
+    app.config["MAX_CONTENT_LENGTH"] = MAX_REQUEST_BYTES or None
     if not app.config["API_KEY"]:
         raise RuntimeError("API_KEY is missing in environment variables")
-    load_model_and_scaler()
+    # Loads the model and runs the warm-up clip (on a thread when STARTUP_MODE=background)
+    startup.start(PROCESS_STARTED)
     app.register_blueprint(voice_detection_bp, url_prefix="/api")
+    app.register_blueprint(health_bp, url_prefix="/api")
+    app.register_blueprint(monitoring_bp)
+    sock.init_app(app)
+    app.register_blueprint(streaming_bp, url_prefix="/api")
     return app
-app = create_app()
+# Pipeline pool workers are spawned processes that re-import this module as
+# __mp_main__; they set themselves up in runtime.process_pool, not here
+if __name__ != "__mp_main__":
+    app = create_app()
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000, debug=False)
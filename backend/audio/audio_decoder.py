@@ -2,24 +2,180 @@ import librosa
 import io
 import soundfile as sf
 import numpy as np
+from math import gcd
+from scipy.signal import resample_poly
 
-def decode_mp3(audio_bytes):
+from config import CANONICAL_SAMPLE_RATE
+
+# Containers libsndfile decodes directly (MP3 needs libsndfile >= 1.1)
+SOUNDFILE_FORMATS = ("mp3", "wav", "flac", "ogg", "aiff")
+# resample_poly's default Kaiser window spans 10 * max(up, down) upsampled samples per side
+RESAMPLE_HALF_WIDTH = 10
+
+
+def sniff_format(audio_bytes):
+    """Identifies the container from its magic bytes; None when unknown."""
+    head = bytes(audio_bytes[:12])
+    if head[:3] == b"ID3":
+        return "mp3"
+    # MPEG audio frame sync; layer bits 00 is ADTS AAC, which libsndfile cannot read
+    if len(head) >= 2 and head[0] == 0xFF and (head[1] & 0xE0) == 0xE0 and (head[1] >> 1) & 0x3:
+        return "mp3"
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:4] == b"fLaC":
+        return "flac"
+    if head[:4] == b"OggS":
+        return "ogg"
+    if head[:4] == b"FORM" and head[8:12] in (b"AIFF", b"AIFC"):
+        return "aiff"
+    return None
+
+
+class BufferFile(io.RawIOBase):
+    """Read-only seekable file over a buffer (e.g. a SharedMemory memoryview), without copying it."""
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer).cast("B")
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, out):
+        chunk = self._view[self._pos:self._pos + len(out)]
+        out[:len(chunk)] = chunk
+        self._pos += len(chunk)
+        return len(chunk)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = (0, self._pos, len(self._view))[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def close(self):
+        self._view.release()
+        super().close()
+
+
+def audio_file(audio_bytes):
+    # BytesIO shares a bytes object's buffer but copies any other buffer type
+    return io.BytesIO(audio_bytes) if isinstance(audio_bytes, bytes) else BufferFile(audio_bytes)
+
+
+def resample_ratio(sr, target_sr):
+    factor = gcd(int(sr), int(target_sr))
+    return int(target_sr) // factor, int(sr) // factor
+
+
+def _downmix(frames):
+    """(samples, channels) -> mono; a mat-vec is ~8x faster than mean(axis=1) on interleaved data."""
+    channels = frames.shape[1]
+    if channels == 1:
+        return frames[:, 0]
+    return frames @ np.full(channels, 1.0 / channels, dtype=frames.dtype)
+
+
+def to_canonical_rate(waveform, sr, target_sr=CANONICAL_SAMPLE_RATE):
+    """Polyphase resampling to target_sr (0 keeps the native rate); returns (float32 waveform, sr)."""
+    if not target_sr or target_sr == sr:
+        return waveform.astype(np.float32, copy=False), sr
+    up, down = resample_ratio(sr, target_sr)
+    return resample_poly(waveform, up, down).astype(np.float32, copy=False), int(target_sr)
+
+
+def decode_mp3(audio_bytes, target_sr=CANONICAL_SAMPLE_RATE):
+    """
+    Decodes audio bytes (or a memoryview) into a mono float32 waveform at the canonical sample rate.
+    The container is sniffed from its magic bytes: MP3/WAV/FLAC/OGG/AIFF go straight
+    to libsndfile, anything else (or a libsndfile without MP3 support) to librosa.
+    """
+    if len(audio_bytes) == 0:
+        raise ValueError("Empty audio payload")
+
+    waveform = None
+    if sniff_format(audio_bytes) in SOUNDFILE_FORMATS:
+        try:
+            with audio_file(audio_bytes) as f:
+                waveform, sr = sf.read(f, dtype="float32", always_2d=True)
+        except Exception:
+            waveform = None
+    if waveform is not None:
+        waveform = _downmix(waveform)
+    else:
+        # librosa uses multiple backends (audioread/ffmpeg) for other containers
+        with audio_file(audio_bytes) as f:
+            waveform, sr = librosa.load(f, sr=None, mono=True)
+
+    return to_canonical_rate(waveform, sr, target_sr)
+
+
+class BlockResampler:
     """
-    Decodes audio bytes into waveform and sample rate.
-    Supports MP3, WAV, and other formats handled by librosa/soundfile.
+    Block-wise resample_poly that matches resampling the whole signal at once:
+    each block is resampled together with enough input context on both sides for
+    the filter, and only the outputs whose context is complete are emitted.
     """
-    audio_stream = io.BytesIO(audio_bytes)
-    
-    try:
-        # Try loading with soundfile first (faster for WAV/RAW)
-        waveform, sr = sf.read(audio_stream)
-        # Convert to mono if stereo
-        if len(waveform.shape) > 1:
-            waveform = np.mean(waveform, axis=1)
-        return waveform, sr
-    except Exception as e:
-        print(f"Soundfile failed, falling back to librosa: {e}")
-        # Fallback to librosa which uses multiple backends
-        audio_stream.seek(0)
-        waveform, sr = librosa.load(audio_stream, sr=None, mono=True)
-        return waveform, sr
+
+    def __init__(self, up, down):
+        self.up = up
+        self.down = down
+        context = -(-RESAMPLE_HALF_WIDTH * max(up, down) // up) + 1
+        # Keep buffer starts on multiples of `down` so the output grid stays aligned
+        self.context = -(-context // down) * down
+        self.buf = np.zeros(0, dtype=np.float32)
+        self.buf_start = 0
+        self.out_next = 0
+
+    def push(self, samples, final=False):
+        self.buf = np.concatenate([self.buf, samples])
+        end = self.buf_start + len(self.buf)
+        if final:
+            out_end = -(-end * self.up // self.down)
+        else:
+            out_end = max(0, (end - self.context) * self.up // self.down)
+        if out_end <= self.out_next:
+            return np.zeros(0, dtype=np.float32)
+
+        out_base = self.buf_start * self.up // self.down
+        out = resample_poly(self.buf, self.up, self.down)[self.out_next - out_base:out_end - out_base]
+        self.out_next = out_end
+
+        keep_from = (self.out_next * self.down // self.up - self.context) // self.down * self.down
+        if keep_from > self.buf_start:
+            self.buf = self.buf[keep_from - self.buf_start:]
+            self.buf_start = keep_from
+        return out.astype(np.float32, copy=False)
+
+
+def open_audio_blocks(audio_bytes, block_seconds, target_sr=CANONICAL_SAMPLE_RATE):
+    """
+    Block-wise decoding for long recordings: returns (sr, generator of mono float32
+    blocks of about block_seconds each at the canonical rate), so the full waveform
+    is never held in memory. Requires a format libsndfile can read (WAV/FLAC/OGG,
+    and MP3 with libsndfile >= 1.1).
+    """
+    source = audio_file(audio_bytes)
+    sound_file = sf.SoundFile(source)
+    native_sr = sound_file.samplerate
+    blocksize = max(1, int(block_seconds * native_sr))
+    resampler = None
+    sr = native_sr
+    if target_sr and target_sr != native_sr:
+        resampler = BlockResampler(*resample_ratio(native_sr, target_sr))
+        sr = int(target_sr)
+
+    def blocks():
+        with source, sound_file:
+            for block in sound_file.blocks(blocksize=blocksize, dtype="float32", always_2d=True):
+                yield _downmix(block) if resampler is None else resampler.push(_downmix(block))
+        if resampler is not None:
+            yield resampler.push(np.zeros(0, dtype=np.float32), final=True)
+
+    return sr, blocks()
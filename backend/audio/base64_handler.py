@@ -1,12 +1,43 @@
 import base64
-import re
+
+DATA_URI_PREFIX = "data:audio/"
+
+def normalize_base64(b64_string):
+    """Payload without data URI header or whitespace; normalizing it again is a no-op (no copy)."""
+    # Strip an optional data URI header ("data:audio/mpeg;base64,") without a regex pass
+    if b64_string.startswith(DATA_URI_PREFIX):
+        marker = b64_string.find(";base64,")
+        if marker != -1:
+            b64_string = b64_string[marker + len(";base64,"):]
+
+    # Only copy the string when it actually contains whitespace
+    if "\n" in b64_string or " " in b64_string:
+        b64_string = b64_string.replace("\n", "").replace(" ", "")
+    return b64_string
 
 def decode_base64_audio(b64_string):
-    b64_string = re.sub(r"^data:audio/.+;base64,", "", b64_string)
-    b64_string = b64_string.replace("\n", "").replace(" ", "")
+    b64_string = normalize_base64(b64_string)
 
     missing_padding = len(b64_string) % 4
     if missing_padding:
         b64_string += "=" * (4 - missing_padding)
 
     return base64.b64decode(b64_string)
+
+def base64_reader(b64_string):
+    """
+    (read(offset, n), decoded size) over a normalized base64 payload
+    (normalize_base64) without decoding all of it: read decodes only the
+    4-character groups covering the requested bytes.
+    """
+    padding = 2 if b64_string.endswith("==") else 1 if b64_string.endswith("=") else 0
+    size = (len(b64_string) - padding) * 3 // 4
+
+    def read(offset, n):
+        first = offset // 3
+        chunk = b64_string[first * 4:-(-(offset + n) // 3) * 4]
+        chunk += "=" * (-len(chunk) % 4)
+        skip = offset - first * 3
+        return base64.b64decode(chunk)[skip:skip + n]
+
+    return read, size
@@ -2,104 +2,215 @@
 Language Detection Module
 Uses fuzzy acoustic logic to detect language(s) from audio features.
 Restored for 45-feature format.
+
+Profiles live in a LanguageProfiles table: one row per language holding the
+mean and std of each scored feature, per-feature weights and optional bonus
+rules on single feature columns. The built-in table is the original hand-tuned
+one; LANGUAGE_PROFILES_PATH loads a JSON table instead, e.g. one written by
+training/fit_language_profiles.py. Scoring is a single (clips x languages)
+array computation, so detect_languages_batch costs about the same for one clip
+as for thousands, and adding languages only widens the table.
 """
+import json
+
 import numpy as np
 
+from config import LANGUAGE_PROFILES_PATH
+
+MIN_FEATURES = 45
+UNKNOWN_THRESHOLD = 0.25     # primary score below this -> "Unknown"
+MULTILINGUAL_MIN_SCORE = 0.4  # second language is reported above this score...
+MULTILINGUAL_MAX_GAP = 0.15   # ...when it is this close to the primary
+
+# The original hand-tuned profiles: (mean, std) per feature, and MFCC-mean
+# bonuses (feature 6 + k is the mean of MFCC k)
+DEFAULT_TABLE = {
+    "features": {"pitch": 0, "centroid": 4, "flatness": 3, "zcr": 5},
+    "weights": {"pitch": 0.4, "centroid": 0.3, "flatness": 0.2, "zcr": 0.1},
+    "languages": {
+        "Tamil": {"pitch": [210, 30], "centroid": [2800, 400], "flatness": [0.28, 0.1], "zcr": [0.07, 0.02]},
+        "English": {"pitch": [145, 30], "centroid": [2200, 500], "flatness": [0.45, 0.1], "zcr": [0.05, 0.02]},
+        "Hindi": {"pitch": [185, 30], "centroid": [2200, 300], "flatness": [0.35, 0.1], "zcr": [0.045, 0.02]},
+        "Malayalam": {"pitch": [200, 30], "centroid": [2400, 400], "flatness": [0.50, 0.1], "zcr": [0.06, 0.02]},
+        "Telugu": {"pitch": [195, 35], "centroid": [2350, 350], "flatness": [0.32, 0.1], "zcr": [0.05, 0.02]},
+    },
+    "bonuses": [
+        {"language": "English", "feature": 7, "above": -10, "bonus": 0.1},
+        {"language": "Tamil", "feature": 8, "below": -15, "bonus": 0.1},
+        {"language": "Hindi", "feature": 7, "above": -5, "below": 15, "bonus": 0.1},
+    ],
+}
+
+UNKNOWN_RESULT = {
+    "primary_language": "Unknown",
+    "detected_languages": ["Unknown"],
+    "is_multilingual": False,
+}
+
+
 def get_membership(value, mean, std):
-    if std == 0: return 1.0 if value == mean else 0.0
-    z = (value - mean) / std
-    return np.exp(-0.5 * (z**2))
+    """Gaussian membership exp(-z^2 / 2); elementwise over arrays. std == 0 means an exact match."""
+    value, mean, std = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in (value, mean, std)))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (value - mean) / std
+    return np.where(std == 0, (value == mean).astype(np.float64), np.exp(-0.5 * (z ** 2)))
 
-def detect_language_from_audio(waveform, sr, features=None):
-    languages = ['Tamil', 'English', 'Hindi', 'Malayalam', 'Telugu']
-    lang_scores = {lang: 0.0 for lang in languages}
-    
-    if features and len(features) >= 45:
-        pitch_mean = features[0]
-        pitch_var = features[1]
-        pitch_range = features[2]
-        flatness_mean = features[3]
-        centroid_mean = features[4]
-        zcr_mean = features[5]
-        mfcc_means = features[6:19]
-        
-        profiles = {
-            'Tamil': {
-                'pitch': (210, 30), 
-                'centroid': (2800, 400),
-                'flatness': (0.28, 0.1),
-                'zcr': (0.07, 0.02)
-            },
-            'English': {
-                'pitch': (145, 30), 
-                'centroid': (2200, 500),
-                'flatness': (0.45, 0.1),
-                'zcr': (0.05, 0.02)
-            },
-            'Hindi': {
-                'pitch': (185, 30), 
-                'centroid': (2200, 300),
-                'flatness': (0.35, 0.1),
-                'zcr': (0.045, 0.02)
-            },
-            'Malayalam': {
-                'pitch': (200, 30), 
-                'centroid': (2400, 400),
-                'flatness': (0.50, 0.1),
-                'zcr': (0.06, 0.02)
-            },
-            'Telugu': {
-                'pitch': (195, 35), 
-                'centroid': (2350, 350),
-                'flatness': (0.32, 0.1),
-                'zcr': (0.05, 0.02)
-            }
-        }
-        
-        for lang, profile in profiles.items():
-            p_score = get_membership(pitch_mean, profile['pitch'][0], profile['pitch'][1])
-            c_score = get_membership(centroid_mean, profile['centroid'][0], profile['centroid'][1])
-            f_score = get_membership(flatness_mean, profile['flatness'][0], profile['flatness'][1])
-            z_score = get_membership(zcr_mean, profile['zcr'][0], profile['zcr'][1])
-            
-            total_score = (p_score * 0.4) + (c_score * 0.3) + (f_score * 0.2) + (z_score * 0.1)
-            
-            if lang == 'English' and mfcc_means[1] > -10: total_score += 0.1
-            if lang == 'Tamil' and mfcc_means[2] < -15: total_score += 0.1
-            if lang == 'Hindi' and -5 < mfcc_means[1] < 15: total_score += 0.1
-            
-            lang_scores[lang] = total_score
-    else:
-        return {
-            "primary_language": "Unknown",
-            "detected_languages": ["Unknown"],
-            "is_multilingual": False,
-            "confidence": 0.2
-        }
-    
-    sorted_langs = sorted(lang_scores.items(), key=lambda x: x[1], reverse=True)
-    primary_lang, primary_score = sorted_langs[0]
-    
-    if primary_score < 0.25:
+
+class LanguageProfiles:
+    """
+    languages (L,), feature names -> feature-vector columns (K,), means and stds
+    (L, K), weights (K,), and bonus rules: +bonus to a language's score when
+    above < features[feature] < below (either bound optional).
+    """
+
+    def __init__(self, languages, features, means, stds, weights, bonuses=()):
+        self.languages = list(languages)
+        self.feature_names = list(features)
+        self.columns = np.array([features[name] for name in self.feature_names], dtype=np.intp)
+        self.means = np.asarray(means, dtype=np.float64).reshape(len(self.languages), len(self.columns))
+        self.stds = np.asarray(stds, dtype=np.float64).reshape(self.means.shape)
+        self.weights = np.asarray(weights, dtype=np.float64).reshape(len(self.columns))
+        self.bonuses = [dict(rule) for rule in bonuses]
+        index = {lang: i for i, lang in enumerate(self.languages)}
+        unknown = [rule["language"] for rule in self.bonuses if rule["language"] not in index]
+        if unknown:
+            raise ValueError(f"Bonus rules for languages without a profile: {unknown}")
+        self.bonus_language = np.array([index[rule["language"]] for rule in self.bonuses], dtype=np.intp)
+        self.bonus_column = np.array([rule["feature"] for rule in self.bonuses], dtype=np.intp)
+        self.bonus_above = np.array([rule.get("above", -np.inf) for rule in self.bonuses], dtype=np.float64)
+        self.bonus_below = np.array([rule.get("below", np.inf) for rule in self.bonuses], dtype=np.float64)
+        self.bonus_value = np.array([rule["bonus"] for rule in self.bonuses], dtype=np.float64)
+        # Precomputed for scores(): zero stds become exact-match columns, rules a (rules, languages) one-hot
+        self._zero_std = self.stds == 0
+        self._safe_stds = np.where(self._zero_std, 1.0, self.stds)
+        self._bonus_onehot = np.zeros((len(self.bonuses), len(self.languages)))
+        self._bonus_onehot[np.arange(len(self.bonuses)), self.bonus_language] = 1.0
+
+    def __len__(self):
+        return len(self.languages)
+
+    @classmethod
+    def from_dict(cls, table):
+        features = table["features"]
+        languages = list(table["languages"])
+        means = [[table["languages"][lang][name][0] for name in features] for lang in languages]
+        stds = [[table["languages"][lang][name][1] for name in features] for lang in languages]
+        weights = [table["weights"][name] for name in features]
+        return cls(languages, features, means, stds, weights, table.get("bonuses", ()))
+
+    def to_dict(self):
         return {
-            "primary_language": "Unknown",
-            "detected_languages": ["Unknown"],
-            "is_multilingual": False,
-            "confidence": 0.1
+            "features": {name: int(col) for name, col in zip(self.feature_names, self.columns)},
+            "weights": {name: float(w) for name, w in zip(self.feature_names, self.weights)},
+            "languages": {
+                lang: {name: [float(m), float(s)] for name, m, s in zip(self.feature_names, means, stds)}
+                for lang, means, stds in zip(self.languages, self.means, self.stds)
+            },
+            "bonuses": self.bonuses,
         }
-    
-    detected_languages = [primary_lang]
-    is_multilingual = False
-    
-    if len(sorted_langs) > 1:
-        second_lang, second_score = sorted_langs[1]
-        if second_score > 0.4 and (primary_score - second_score) < 0.15:
-            detected_languages.append(second_lang)
-            is_multilingual = True
-            
+
+    def scores(self, X):
+        """(clips, languages) scores for a (clips, n_features) matrix."""
+        X = np.asarray(X, dtype=np.float64)
+        values = X[:, self.columns][:, None, :]
+        membership = np.exp(-0.5 * ((values - self.means) / self._safe_stds) ** 2)
+        if self._zero_std.any():
+            membership = np.where(self._zero_std, (values == self.means).astype(np.float64), membership)
+        # Weighted sum accumulated feature by feature, in table order
+        scores = np.zeros((len(X), len(self.languages)))
+        for k, weight in enumerate(self.weights):
+            scores += membership[:, :, k] * weight
+        if len(self.bonuses):
+            rule_values = X[:, self.bonus_column]
+            hit = (self.bonus_above < rule_values) & (rule_values < self.bonus_below)
+            scores += (hit * self.bonus_value) @ self._bonus_onehot
+        return scores
+
+
+def load_language_profiles(path):
+    with open(path) as f:
+        return LanguageProfiles.from_dict(json.load(f))
+
+
+def save_language_profiles(profiles, path):
+    with open(path, "w") as f:
+        json.dump(profiles.to_dict(), f, indent=2)
+
+
+def fit_language_profiles(X, languages, features=None, weights=None, bonuses=(), min_clips=2):
+    """
+    Profiles fitted from labeled feature vectors: the per-language mean and std
+    of each scored column. features / weights default to the built-in table's;
+    languages with fewer than min_clips clips (and "unknown") are left out.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    languages = np.asarray(languages)
+    features = features or DEFAULT_TABLE["features"]
+    weights = weights or DEFAULT_TABLE["weights"]
+    columns = [features[name] for name in features]
+
+    names, means, stds = [], [], []
+    for lang in sorted(set(languages.tolist()) - {"unknown", "Unknown"}):
+        rows = X[languages == lang][:, columns]
+        if len(rows) < min_clips:
+            print(f"⚠️ WARNING: Skipping language {lang}: {len(rows)} clips")
+            continue
+        names.append(lang)
+        means.append(rows.mean(axis=0))
+        stds.append(rows.std(axis=0))
+    if not names:
+        raise ValueError("No language has enough labeled clips")
+    return LanguageProfiles(names, features, means, stds, [weights[name] for name in features], bonuses)
+
+
+DEFAULT_PROFILES = LanguageProfiles.from_dict(DEFAULT_TABLE)
+PROFILES = DEFAULT_PROFILES
+if LANGUAGE_PROFILES_PATH:
+    try:
+        PROFILES = load_language_profiles(LANGUAGE_PROFILES_PATH)
+        print(f"✅ Language profiles loaded: {len(PROFILES)} languages from {LANGUAGE_PROFILES_PATH}")
+    except Exception as e:
+        print(f"⚠️ WARNING: Could not load language profiles ({e}); using built-in profiles")
+
+
+def _result(languages, scores, order):
+    primary = order[0]
+    if scores[primary] < UNKNOWN_THRESHOLD:
+        return dict(UNKNOWN_RESULT, detected_languages=["Unknown"], confidence=0.1)
+    detected = [languages[primary]]
+    if len(order) > 1:
+        second = order[1]
+        if scores[second] > MULTILINGUAL_MIN_SCORE and (scores[primary] - scores[second]) < MULTILINGUAL_MAX_GAP:
+            detected.append(languages[second])
     return {
-        "primary_language": primary_lang,
-        "detected_languages": detected_languages,
-        "is_multilingual": is_multilingual,
-        "confidence": float(round(min(primary_score * 1.5, 0.99), 2))
+        "primary_language": languages[primary],
+        "detected_languages": detected,
+        "is_multilingual": len(detected) > 1,
+        "confidence": float(round(min(float(scores[primary]) * 1.5, 0.99), 2)),
     }
+
+
+def detect_languages_batch(features_list, profiles=None):
+    """
+    detect_language_from_audio for many clips: one result dict per feature
+    vector, scored in a single pass. Missing or short vectors get "Unknown".
+    """
+    profiles = profiles or PROFILES
+    results = [None] * len(features_list)
+    valid = [i for i, f in enumerate(features_list) if f is not None and len(f) >= MIN_FEATURES]
+    for i in set(range(len(features_list))) - set(valid):
+        results[i] = dict(UNKNOWN_RESULT, detected_languages=["Unknown"], confidence=0.2)
+    if not valid:
+        return results
+
+    X = np.array([np.asarray(features_list[i], dtype=np.float64)[:MIN_FEATURES] for i in valid])
+    scores = profiles.scores(X)
+    # Stable, so ties keep table order
+    order = np.argsort(-scores, axis=1, kind="stable")
+    for row, i in enumerate(valid):
+        results[i] = _result(profiles.languages, scores[row], order[row])
+    return results
+
+
+def detect_language_from_audio(waveform, sr, features=None):
+    return detect_languages_batch([features])[0]
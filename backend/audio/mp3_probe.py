@@ -0,0 +1,148 @@
+"""
+MP3 duration from the first frame header, without decoding.
+
+Skips an ID3v2 tag, finds the first MPEG audio frame (confirmed by a second
+frame header right after it when that is within the probed bytes) and reads:
+  - a Xing/Info header (LAME, most VBR files): total frame count
+  - a VBRI header (Fraunhofer VBR): total frame count
+  - otherwise audio bytes * 8 / bitrate, with the bitrate the median over
+    SAMPLE_WINDOWS windows spread over the file (each measured over up to
+    MAX_WALK_FRAMES consecutive frames), so a VBR file without a header (e.g.
+    a quiet, low-bitrate intro) is not judged by its first frames alone
+Input is a read(offset, n) callable plus the total size, so raw bytes and
+base64 payloads (audio.base64_handler.base64_reader) are probed by reading the
+tag header and a few windows of at most PROBE_BYTES, nothing else.
+"""
+import struct
+
+PROBE_BYTES = 64 * 1024
+MAX_SYNC_SCAN = 16 * 1024
+MAX_WALK_FRAMES = 256
+SAMPLE_WINDOWS = 8
+SAMPLE_WINDOW_BYTES = 8 * 1024
+
+# kbps by (version is MPEG-1, layer), indexed by the 4-bit bitrate index
+BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Hz by the 2-bit version field (0 = MPEG-2.5, 2 = MPEG-2, 3 = MPEG-1)
+SAMPLE_RATES = {0: (11025, 12000, 8000), 2: (22050, 24000, 16000), 3: (44100, 48000, 32000)}
+
+
+def _id3v2_size(head):
+    if len(head) < 10 or head[:3] != b"ID3":
+        return 0
+    size = (head[6] & 0x7F) << 21 | (head[7] & 0x7F) << 14 | (head[8] & 0x7F) << 7 | (head[9] & 0x7F)
+    footer = 10 if head[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def parse_frame_header(head, offset):
+    """Frame parameters of the header at offset, or None when it is not a valid MPEG audio header."""
+    if offset + 4 > len(head) or head[offset] != 0xFF or head[offset + 1] & 0xE0 != 0xE0:
+        return None
+    b1, b2, b3 = head[offset + 1], head[offset + 2], head[offset + 3]
+    version, layer_bits = (b1 >> 3) & 0x3, (b1 >> 1) & 0x3
+    bitrate_index, rate_index, padding = b2 >> 4, (b2 >> 2) & 0x3, (b2 >> 1) & 0x1
+    if version == 1 or layer_bits == 0 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    mpeg1, layer = version == 3, 4 - layer_bits
+    bitrate = BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = SAMPLE_RATES[version][rate_index]
+    if layer == 1:
+        samples, length = 384, (12 * bitrate // sample_rate + padding) * 4
+    elif layer == 3 and not mpeg1:
+        samples, length = 576, 72 * bitrate // sample_rate + padding
+    else:
+        samples, length = 1152, 144 * bitrate // sample_rate + padding
+    return {"mpeg1": mpeg1, "layer": layer, "bitrate": bitrate, "sample_rate": sample_rate,
+            "samples": samples, "length": length, "mono": b3 >> 6 == 3}
+
+
+def _first_frame(head):
+    for offset in range(min(len(head) - 3, MAX_SYNC_SCAN)):
+        frame = parse_frame_header(head, offset)
+        if frame is None:
+            continue
+        following = offset + frame["length"]
+        # A lone 0xFFE pattern inside other data is common; require the next header to line up
+        if following + 4 <= len(head) and parse_frame_header(head, following) is None:
+            continue
+        return offset, frame
+    return None, None
+
+
+def _vbr_frame_count(head, offset, frame):
+    """Total frames from a Xing/Info or VBRI header in the first frame; None for plain CBR."""
+    if frame["layer"] == 3:
+        side_info = (17 if frame["mono"] else 32) if frame["mpeg1"] else (9 if frame["mono"] else 17)
+        xing = offset + 4 + side_info
+        if head[xing:xing + 4] in (b"Xing", b"Info") and len(head) >= xing + 12:
+            flags = struct.unpack(">I", head[xing + 4:xing + 8])[0]
+            if flags & 0x1:
+                return struct.unpack(">I", head[xing + 8:xing + 12])[0]
+    vbri = offset + 36
+    if head[vbri:vbri + 4] == b"VBRI" and len(head) >= vbri + 18:
+        return struct.unpack(">I", head[vbri + 14:vbri + 18])[0]
+    return None
+
+
+def _walk(head, offset, frame):
+    """(bytes, seconds) of the consecutive frames starting at offset that fit in head."""
+    n_bytes, seconds = 0, 0.0
+    for _ in range(MAX_WALK_FRAMES):
+        if frame is None or offset + frame["length"] > len(head):
+            break
+        n_bytes += frame["length"]
+        seconds += frame["samples"] / frame["sample_rate"]
+        offset += frame["length"]
+        frame = parse_frame_header(head, offset)
+    return n_bytes, seconds
+
+
+def _sampled_duration(read, start, total_bytes, head, offset, frame):
+    """
+    Audio bytes over the median bitrate of SAMPLE_WINDOWS windows evenly spaced
+    in bytes; the median keeps a silent intro or outro from skewing the estimate.
+    """
+    audio_bytes = total_bytes - start - offset
+    rates = []
+    for k in range(SAMPLE_WINDOWS):
+        if k == 0:
+            window, w_offset, w_frame = head[:offset + SAMPLE_WINDOW_BYTES], offset, frame
+        else:
+            window = bytes(read(start + offset + audio_bytes * k // SAMPLE_WINDOWS, SAMPLE_WINDOW_BYTES))
+            w_offset, w_frame = _first_frame(window)
+        if w_frame is not None:
+            n_bytes, seconds = _walk(window, w_offset, w_frame)
+            if n_bytes:
+                rates.append(n_bytes * 8 / seconds)
+    rates.sort()
+    bitrate = (rates[(len(rates) - 1) // 2] + rates[len(rates) // 2]) / 2 if rates else frame["bitrate"]
+    return audio_bytes * 8 / bitrate
+
+
+def bytes_reader(data):
+    return lambda offset, n: data[offset:offset + n]
+
+
+def probe_mp3_duration(read, total_bytes):
+    """
+    Estimated duration in seconds of an MP3 of total_bytes bytes, given
+    read(offset, n) -> bytes. None when no MPEG audio frame is found, e.g. for
+    other containers.
+    """
+    start = _id3v2_size(bytes(read(0, 10)))
+    head = bytes(read(start, PROBE_BYTES))
+    offset, frame = _first_frame(head)
+    if frame is None:
+        return None
+    frames = _vbr_frame_count(head, offset, frame)
+    if frames:
+        return frames * frame["samples"] / frame["sample_rate"]
+    return max(_sampled_duration(read, start, total_bytes, head, offset, frame), 0.0)
@@ -0,0 +1,99 @@
+"""
+Request latency under a burst, without and with admission control.
+
+Starts gunicorn (gunicorn.conf.py, one worker with --threads threads) once
+with ADMISSION_MAX_CONCURRENT=0 (no limit) and once with --limit, then fires
+--burst concurrent requests of a --seconds clip. Every request is accepted
+without the limit, so they all queue behind each other. With the limit the
+excess gets an immediate 429 and the admitted requests keep their latency.
+
+Usage (from backend/):
+    python -m benchmarks.bench_admission [--burst 32] [--threads 16] [--limit 2] [--seconds 5]
+"""
+import argparse
+import base64
+import io
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import soundfile as sf
+
+from benchmarks.memory_report import free_port, request, API_KEY, READY_TIMEOUT_S
+from benchmarks.synthetic import synth_speech
+
+
+def timed_post(url, body):
+    data = json.dumps(body).encode()
+    req = urllib.request.Request(url, data=data, headers={"x-api-key": API_KEY, "Content-Type": "application/json"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=600) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, time.perf_counter() - start
+
+
+def run_mode(name, limit, args, body):
+    port = free_port()
+    env = {**os.environ, "API_KEY": API_KEY, "GUNICORN_BIND": f"127.0.0.1:{port}", "GUNICORN_WORKERS": "1",
+           "GUNICORN_THREADS": str(args.threads), "ADMISSION_MAX_CONCURRENT": str(limit),
+           "VERDICT_CACHE_ENABLED": "0"}
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"], env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        base = f"http://127.0.0.1:{port}/api"
+        deadline = time.time() + READY_TIMEOUT_S
+        while True:
+            try:
+                if request(base + "/health/ready", timeout=5) == 200:
+                    break
+            except Exception:
+                pass
+            if server.poll() is not None or time.time() > deadline:
+                raise SystemExit(f"❌ gunicorn ({name}) did not become ready")
+            time.sleep(0.5)
+        timed_post(base + "/voice-detection", body)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.burst) as pool:
+            results = list(pool.map(lambda _: timed_post(base + "/voice-detection", body), range(args.burst)))
+        wall = time.perf_counter() - start
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+    ok = np.array([seconds for status, seconds in results if status == 200])
+    rejected = [seconds for status, seconds in results if status == 429]
+    p50, p95 = (np.percentile(ok, [50, 95]) * 1e3) if len(ok) else (float("nan"), float("nan"))
+    print(f"{name:<16} 200: {len(ok):3d}  p50 {p50:8.0f} ms  p95 {p95:8.0f} ms  | "
+          f"429: {len(rejected):3d} (max {max(rejected, default=0) * 1e3:.0f} ms)  | burst done in {wall:.1f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--burst", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--limit", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    buf = io.BytesIO()
+    sf.write(buf, synth_speech(args.seconds), 16000, format="WAV")
+    body = {"language": "English", "audioFormat": "mp3", "audioBase64": base64.b64encode(buf.getvalue()).decode()}
+    print(f"Burst of {args.burst} x {args.seconds:g} s clips, 1 worker x {args.threads} threads")
+    run_mode("no limit", 0, args, body)
+    run_mode(f"limit {args.limit}", args.limit, args, body)
+
+
+if __name__ == "__main__":
+    main()
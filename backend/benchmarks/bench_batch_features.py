@@ -0,0 +1,68 @@
+"""
+Batched feature extraction benchmark: extract_all_features one clip at a time
+vs extract_features_batch on the same clips.
+
+Clips are the training corpus (decoded once, outside the timed region), so the
+lengths vary the way real batches do. Reports clips/s for both paths and the
+largest relative difference per feature group, which should stay at float32
+rounding.
+
+Usage (from backend/):
+    python -m benchmarks.bench_batch_features [--data ../training/data/ai] [--limit 200] [--repeats 3]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from audio.audio_decoder import decode_mp3
+from features.feature_assembler import extract_all_features
+from features.batch_features import extract_features_batch
+
+GROUPS = {"pitch": slice(0, 3), "spectral": slice(3, 6), "mfcc": slice(6, 45)}
+
+
+def best_time(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    repo_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=os.path.join(repo_root, "training", "data", "ai"))
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    clips = []
+    for name in sorted(os.listdir(args.data))[:args.limit]:
+        with open(os.path.join(args.data, name), "rb") as f:
+            try:
+                clips.append(decode_mp3(f.read()))
+            except Exception as e:
+                print(f"Skipping {name}: {e}")
+    waveforms, srs = [y for y, _ in clips], [sr for _, sr in clips]
+    audio_s = sum(len(y) / sr for y, sr in clips)
+
+    extract_features_batch(waveforms[:4], srs[:4])  # FFT plans / numba outside the timed region
+    single_s, single = best_time(lambda: [extract_all_features(y, sr) for y, sr in clips], args.repeats)
+    batch_s, batch = best_time(lambda: extract_features_batch(waveforms, srs), args.repeats)
+
+    print(f"{len(clips)} clips, {audio_s:.0f} s of audio")
+    print(f"single: {len(clips) / single_s:8.1f} clips/s")
+    print(f"batch:  {len(clips) / batch_s:8.1f} clips/s  ({single_s / batch_s:.2f}x)")
+    ok = [i for i, v in enumerate(batch) if not isinstance(v, Exception)]
+    single, batch = np.array([single[i] for i in ok], float), np.array([batch[i] for i in ok], float)
+    rel = np.abs(batch - single) / np.maximum(np.abs(single), 1e-6)
+    for name, cols in GROUPS.items():
+        print(f"{name:>9} max rel diff {rel[:, cols].max():.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Decode benchmark by input format: the legacy decoder (soundfile, float64, librosa
+fallback on failure) vs the canonical stage (sniffed backend, float32, mono)
+at the native rate and resampled to --target-sr. Reports the best time over
+--repeats and the tracemalloc peak per clip, plus the samples handed to the
+feature pipeline, which is what resampling cuts.
+
+Usage (from backend/):
+    python -m benchmarks.bench_decode [--duration 30] [--rates 16000 44100 48000] [--target-sr 16000]
+"""
+import argparse
+import io
+import time
+import tracemalloc
+
+import numpy as np
+import librosa
+import soundfile as sf
+
+from benchmarks.synthetic import synth_speech
+from audio.audio_decoder import decode_mp3
+
+FORMATS = ("MP3", "WAV", "FLAC", "OGG")
+
+
+def legacy_decode(audio_bytes):
+    audio_stream = io.BytesIO(audio_bytes)
+    try:
+        waveform, sr = sf.read(audio_stream)
+        if len(waveform.shape) > 1:
+            waveform = np.mean(waveform, axis=1)
+        return waveform, sr
+    except Exception:
+        audio_stream.seek(0)
+        return librosa.load(audio_stream, sr=None, mono=True)
+
+
+def measure(fn, audio_bytes, repeats):
+    best, peak = float("inf"), 0
+    for _ in range(repeats):
+        tracemalloc.start()
+        start = time.perf_counter()
+        waveform, _ = fn(audio_bytes)
+        best = min(best, time.perf_counter() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return best, peak, len(waveform)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--rates", type=int, nargs="+", default=[16000, 44100, 48000])
+    parser.add_argument("--target-sr", type=int, default=16000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    decoders = (
+        ("legacy", legacy_decode),
+        ("native", lambda b: decode_mp3(b, target_sr=0)),
+        (f"{args.target_sr // 1000}k", lambda b: decode_mp3(b, target_sr=args.target_sr)),
+    )
+    print(f"{'format':>6} {'rate':>6} {'ch':>3} {'decoder':>8} {'ms':>9} {'peak MB':>8} {'samples':>9}")
+    for fmt in FORMATS:
+        for rate in args.rates:
+            for channels in (1, 2):
+                y = synth_speech(args.duration, rate)
+                if channels == 2:
+                    y = np.stack([y, 0.8 * y], axis=1)
+                buf = io.BytesIO()
+                try:
+                    sf.write(buf, y, rate, format=fmt)
+                except Exception as e:
+                    print(f"{fmt:>6} {rate:>6} {channels:>3} unsupported by this libsndfile: {e}")
+                    continue
+                for name, fn in decoders:
+                    elapsed, peak, samples = measure(fn, buf.getvalue(), args.repeats)
+                    print(f"{fmt:>6} {rate:>6} {channels:>3} {name:>8} {elapsed * 1e3:>9.1f} "
+                          f"{peak / 2**20:>8.1f} {samples:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Feature extraction benchmark: legacy per-extractor STFTs vs the shared FeatureContext.
+
+Usage (from backend/):
+    python -m benchmarks.bench_features [--durations 1 5 30 120] [--sr 24000] [--repeats 3]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import synth_speech
+from features.feature_assembler import extract_all_features
+from features.pitch_features import extract_pitch_features
+from features.spectral_features import extract_spectral_features
+from features.mfcc_features import extract_mfcc_features
+
+
+def extract_all_features_legacy(y, sr):
+    # Each extractor computes its own STFT (pre-FeatureContext behaviour)
+    features = []
+    features.extend(extract_pitch_features(y, sr))
+    features.extend(extract_spectral_features(y, sr))
+    features.extend(extract_mfcc_features(y, sr))
+    return features
+
+
+def best_time(fn, repeats):
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--durations", type=float, nargs="+", default=[1, 5, 30, 120])
+    parser.add_argument("--sr", type=int, default=24000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    # Trigger numba JIT / FFT plan creation outside the timed region
+    extract_all_features(synth_speech(1, args.sr), args.sr)
+
+    print(f"{'duration':>9} {'legacy ms':>10} {'shared ms':>10} {'speedup':>8} {'max |diff|':>11}")
+    for duration in args.durations:
+        y = synth_speech(duration, args.sr)
+        t_legacy, f_legacy = best_time(lambda: extract_all_features_legacy(y, args.sr), args.repeats)
+        t_shared, f_shared = best_time(lambda: extract_all_features(y, args.sr), args.repeats)
+        diff = float(np.max(np.abs(np.array(f_legacy) - np.array(f_shared))))
+        print(f"{duration:>8.0f}s {t_legacy * 1e3:>10.1f} {t_shared * 1e3:>10.1f} "
+              f"{t_legacy / t_shared:>7.2f}x {diff:>11.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Fingerprint index benchmark: lookup latency and recall as the index grows.
+
+Indexes random sub-fingerprint sequences (one per synthetic "clip"), saves the
+index and reopens it memory-mapped the way the service does. It then queries
+trimmed copies with BIT_FLIP of their bits flipped (re-encoding noise) and
+unseen sequences (which must not match). Also times compute_fingerprint on a
+FeatureContext whose STFT is already computed, the per-request overhead.
+
+Usage (from backend/):
+    python -m benchmarks.bench_fingerprint [--clips 1000 100000] [--frames 300] [--queries 200]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from config import FINGERPRINT_MAX_BER, FINGERPRINT_MIN_MATCH_FRAMES
+from features.feature_context import FeatureContext
+from fingerprint.fingerprint import compute_fingerprint
+from fingerprint.index import FingerprintIndex
+from benchmarks.synthetic import synth_speech
+
+BIT_FLIP = 0.15
+
+
+def noisy_copy(rng, fingerprint, trim):
+    bits = np.unpackbits(fingerprint[trim:].view(np.uint8))
+    bits ^= (rng.random(len(bits)) < BIT_FLIP).astype(np.uint8)
+    return np.packbits(bits).view(np.uint32)
+
+
+def run(n_clips, n_frames, n_queries):
+    rng = np.random.default_rng(0)
+    fingerprints = rng.integers(0, 2**32, size=(n_clips, n_frames), dtype=np.uint32)
+
+    start = time.perf_counter()
+    index = FingerprintIndex()
+    for i in range(n_clips):
+        index.add(fingerprints[i], {"classification": "AI_GENERATED", "confidenceScore": 1.0})
+    with tempfile.TemporaryDirectory() as path:
+        index.save(path)
+        build_s = time.perf_counter() - start
+        size_mb = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)) / 2**20
+        index = FingerprintIndex.load(path)
+
+        known, unseen, hits, false_hits = [], [], 0, 0
+        for _ in range(n_queries):
+            clip = int(rng.integers(n_clips))
+            query = noisy_copy(rng, fingerprints[clip], int(rng.integers(0, n_frames // 4)))
+            start = time.perf_counter()
+            _, info = index.query(query, FINGERPRINT_MAX_BER, FINGERPRINT_MIN_MATCH_FRAMES)
+            known.append(time.perf_counter() - start)
+            hits += info is not None and info["clipId"] == clip
+
+            query = rng.integers(0, 2**32, size=n_frames, dtype=np.uint32)
+            start = time.perf_counter()
+            _, info = index.query(query, FINGERPRINT_MAX_BER, FINGERPRINT_MIN_MATCH_FRAMES)
+            unseen.append(time.perf_counter() - start)
+            false_hits += info is not None
+        del index
+
+    known_ms, unseen_ms = np.array(known) * 1e3, np.array(unseen) * 1e3
+    print(f"{n_clips:>9} {build_s:>8.1f} {size_mb:>8.1f} "
+          f"{np.median(known_ms):>9.3f} {np.percentile(known_ms, 99):>9.3f} "
+          f"{np.median(unseen_ms):>9.3f} {np.percentile(unseen_ms, 99):>9.3f} "
+          f"{hits / n_queries:>7.1%} {false_hits:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clips", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--frames", type=int, default=300, help="sub-fingerprints per clip (~6 s at 24 kHz)")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    sr = 24000
+    ctx = FeatureContext(synth_speech(10, sr=sr), sr)
+    _ = ctx.power
+    start = time.perf_counter()
+    for _ in range(20):
+        compute_fingerprint(ctx)
+    print(f"compute_fingerprint (10 s clip, STFT reused): {(time.perf_counter() - start) / 20 * 1e3:.2f} ms\n")
+
+    print(f"{'clips':>9} {'build s':>8} {'size MB':>8} {'hit p50':>9} {'hit p99':>9} "
+          f"{'miss p50':>9} {'miss p99':>9} {'recall':>7} {'false':>6}")
+    for n_clips in args.clips:
+        run(n_clips, args.frames, args.queries)
+
+
+if __name__ == "__main__":
+    main()
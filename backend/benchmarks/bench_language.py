@@ -0,0 +1,57 @@
+"""
+Language detector benchmark: detect_language_from_audio one clip at a time vs
+detect_languages_batch, for growing numbers of clips and languages.
+
+Feature vectors are random draws in realistic ranges; tables with more than
+the five built-in languages are fitted from those vectors with random labels,
+so only the shape of the table matters here, not its quality.
+
+Usage (from backend/):
+    python -m benchmarks.bench_language [--clips 1,100,5000] [--languages 5,50]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from audio.language_detector import DEFAULT_PROFILES, fit_language_profiles, detect_languages_batch
+
+
+def random_features(n, rng):
+    X = np.zeros((n, 45))
+    X[:, 0] = rng.uniform(80, 300, n)
+    X[:, 3] = rng.uniform(0, 0.8, n)
+    X[:, 4] = rng.uniform(1000, 4000, n)
+    X[:, 5] = rng.uniform(0, 0.12, n)
+    X[:, 6:19] = rng.uniform(-40, 30, (n, 13))
+    return X
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clips", default="1,100,5000")
+    parser.add_argument("--languages", default="5,50")
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    for n_languages in [int(n) for n in args.languages.split(",")]:
+        if n_languages == len(DEFAULT_PROFILES):
+            profiles = DEFAULT_PROFILES
+        else:
+            X = random_features(100 * n_languages, rng)
+            profiles = fit_language_profiles(X, rng.integers(n_languages, size=len(X)).astype(str))
+        for n_clips in [int(n) for n in args.clips.split(",")]:
+            features = [list(row) for row in random_features(n_clips, rng)]
+            start = time.perf_counter()
+            single = [detect_languages_batch([f], profiles)[0] for f in features]
+            single_s = time.perf_counter() - start
+            start = time.perf_counter()
+            batch = detect_languages_batch(features, profiles)
+            batch_s = time.perf_counter() - start
+            assert single == batch
+            print(f"{n_languages:3d} languages {n_clips:6d} clips: single {1e6 * single_s / n_clips:7.1f} us/clip, "
+                  f"batch {1e6 * batch_s / n_clips:7.1f} us/clip ({single_s / batch_s:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Micro-batching benchmark: concurrent single-row run_inference calls vs the scheduler.
+
+Uses the served model from assets/ when it loads, otherwise a randomly initialised
+network with the training architecture (45-64-32-1), which is enough to measure
+per-call overhead.
+
+Usage (from backend/):
+    python -m benchmarks.bench_microbatch [--threads 16] [--requests 2000] [--max-wait-ms 5]
+"""
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from model import model_loader
+from model.inference import run_inference
+from model.batch_scheduler import MicroBatchScheduler
+
+
+def ensure_model(n_features=45):
+    model_loader.load_model_and_scaler()
+    if model_loader.MODEL is not None:
+        return
+    import tensorflow as tf
+    from sklearn.preprocessing import StandardScaler
+    model_loader.MODEL = tf.keras.Sequential([
+        tf.keras.Input(shape=(n_features,)),
+        tf.keras.layers.Dense(64, activation="relu"),
+        tf.keras.layers.Dense(32, activation="relu"),
+        tf.keras.layers.Dense(1, activation="sigmoid"),
+    ])
+    model_loader.SCALER = StandardScaler().fit(np.random.default_rng(0).normal(size=(64, n_features)))
+
+
+def drive(call, rows, n_threads):
+    latencies = []
+    lock = threading.Lock()
+    per_thread = np.array_split(np.arange(len(rows)), n_threads)
+
+    def worker(indices):
+        local = []
+        for i in indices:
+            start = time.perf_counter()
+            call(rows[i])
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(idx,)) for idx in per_thread]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    lat_ms = np.array(latencies) * 1e3
+    return len(rows) / elapsed, np.percentile(lat_ms, 50), np.percentile(lat_ms, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    ensure_model()
+    rows = [list(r) for r in np.random.default_rng(1).normal(size=(args.requests, 45))]
+    run_inference(rows[0])  # build the predict function outside the timed region
+
+    scheduler = MicroBatchScheduler(args.max_batch_size, args.max_wait_ms).start()
+    for name, call in [("direct", run_inference), ("micro-batched", scheduler.infer)]:
+        rps, p50, p99 = drive(call, rows, args.threads)
+        print(f"{name:>14}: {rps:8.1f} req/s   p50 {p50:7.2f} ms   p99 {p99:7.2f} ms")
+
+    stats = scheduler.stats()
+    print(f"avg batch size {stats['avgBatchSize']:.1f}, avg queue wait {stats['avgQueueWaitMs']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
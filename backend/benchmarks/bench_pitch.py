@@ -0,0 +1,85 @@
+"""
+Pitch estimator benchmark: piptrack vs the YIN estimator (PITCH_ESTIMATOR=yin).
+
+Both estimators read the same precomputed STFT (FeatureContext), so the times
+cover only the pitch stage. Drift compares the three pitch statistics
+(mean / variance / range) per clip. piptrack reports every spectral peak
+(harmonics included) while YIN reports one F0 per frame, so the statistics
+differ by design. The drift numbers show how far a model trained on one would
+be from the other, and the correlation shows whether the ranking of clips is
+preserved.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pitch [--data ../training/data/ai] [--limit 100]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import librosa
+
+from audio.audio_decoder import decode_mp3
+from features.feature_context import FeatureContext
+from features.pitch_features import estimate_f0
+
+STATS = ("mean", "var", "range")
+
+
+def pitch_stats(values):
+    if len(values) == 0:
+        return [0.0, 0.0, 0.0]
+    return [float(np.mean(values)), float(np.var(values)), float(np.max(values) - np.min(values))]
+
+
+def main():
+    repo_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=os.path.join(repo_root, "training", "data", "ai"))
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    paths = sorted(os.path.join(args.data, f) for f in os.listdir(args.data) if f.endswith(".mp3"))[:args.limit]
+    piptrack_s, yin_s, audio_s = 0.0, 0.0, 0.0
+    piptrack_stats, yin_stats, voiced = [], [], []
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                y, sr = decode_mp3(f.read())
+        except Exception as e:
+            print(f"Skipping {path}: {e}")
+            continue
+        ctx = FeatureContext(y, sr)
+        _ = ctx.power
+        audio_s += len(y) / sr
+
+        start = time.perf_counter()
+        pitches, _ = librosa.piptrack(S=ctx.magnitude, sr=sr)
+        piptrack_values = pitches[pitches > 0]
+        piptrack_s += time.perf_counter() - start
+
+        start = time.perf_counter()
+        f0 = estimate_f0(ctx.power, sr, ctx.n_fft)
+        yin_values = f0[f0 > 0]
+        yin_s += time.perf_counter() - start
+
+        piptrack_stats.append(pitch_stats(piptrack_values))
+        yin_stats.append(pitch_stats(yin_values))
+        voiced.append(len(yin_values) / max(len(f0), 1))
+
+    piptrack_stats, yin_stats = np.array(piptrack_stats), np.array(yin_stats)
+    n = len(piptrack_stats)
+    print(f"{n} clips, {audio_s:.0f} s of audio")
+    print(f"piptrack: {piptrack_s * 1e3 / n:8.2f} ms/clip")
+    print(f"yin:      {yin_s * 1e3 / n:8.2f} ms/clip  ({piptrack_s / yin_s:.1f}x faster, "
+          f"{np.mean(voiced):.0%} of frames voiced)")
+    print(f"\n{'stat':>6} {'piptrack':>12} {'yin':>12} {'median rel drift':>17} {'correlation':>12}")
+    for i, name in enumerate(STATS):
+        a, b = piptrack_stats[:, i], yin_stats[:, i]
+        drift = np.median(np.abs(b - a) / np.maximum(np.abs(a), 1e-9))
+        corr = np.corrcoef(a, b)[0, 1] if np.std(a) > 0 and np.std(b) > 0 else float("nan")
+        print(f"{name:>6} {np.median(a):>12.1f} {np.median(b):>12.1f} {drift:>17.1%} {corr:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Segmented analysis benchmark: one feature vector for the whole call vs
+runtime.segments window scoring, without and with early exit.
+
+Calls are synthetic speech (benchmarks/synthetic.py) of each --durations
+length. "whole" is extract_all_features + run_inference on the full waveform;
+"segmented" scores every window; "early exit" stops at the configured
+confidence. Without a model the mock verdicts are far from 0.5, so early exit
+triggers after SEGMENT_MIN_SEGMENTS windows, which is the best case.
+
+Usage (from backend/):
+    python -m benchmarks.bench_segments [--durations 60 300 600] [--workers 1 4] [--repeats 2]
+"""
+import argparse
+import os
+import time
+
+
+def best_time(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--durations", type=float, nargs="+", default=[60, 300, 600])
+    parser.add_argument("--workers", type=int, default=None, help="SEGMENT_WORKERS (default: from config)")
+    parser.add_argument("--sr", type=int, default=16000)
+    parser.add_argument("--repeats", type=int, default=2)
+    args = parser.parse_args()
+    if args.workers:
+        # Read by config at import time
+        os.environ["SEGMENT_WORKERS"] = str(args.workers)
+
+    from benchmarks.synthetic import synth_speech
+    from features.feature_assembler import extract_all_features
+    from model.inference import run_inference
+    from runtime import segments
+
+    early_exit = segments.SEGMENT_EARLY_EXIT_CONFIDENCE
+
+    def segmented(y, threshold):
+        segments.SEGMENT_EARLY_EXIT_CONFIDENCE = threshold
+        return segments.score_segments(iter([y]), args.sr)
+
+    print(f"{segments.SEGMENT_THREADS} segment threads, {segments.SEGMENT_SECONDS:g} s windows, "
+          f"overlap {segments.SEGMENT_OVERLAP:g}, early exit at {early_exit:g}")
+    extract_all_features(synth_speech(2, args.sr), args.sr)  # librosa / numba warm-up
+    for duration in args.durations:
+        y = synth_speech(duration, args.sr, seed=int(duration)).astype("float32")
+        whole_s, _ = best_time(lambda: run_inference(extract_all_features(y, args.sr)), args.repeats)
+        full_s, full = best_time(lambda: segmented(y, 1.0), args.repeats)
+        early_s, early = best_time(lambda: segmented(y, early_exit), args.repeats)
+        print(f"{duration:5.0f}s  whole {whole_s:6.2f}s  segmented {full_s:6.2f}s ({len(full['timeline'])} windows)  "
+              f"early exit {early_s:6.2f}s ({len(early['timeline'])} windows, {early['stoppedEarly']})")
+
+
+if __name__ == "__main__":
+    main()
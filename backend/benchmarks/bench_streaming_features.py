@@ -0,0 +1,67 @@
+"""
+Long-recording benchmark: whole-clip decode + extract_all_features vs block-wise
+decode + online accumulators. Reports time, tracemalloc peak and the max relative
+difference between the two 45-element vectors.
+
+Usage (from backend/):
+    python -m benchmarks.bench_streaming_features [--durations 60 300 900] [--sr 16000]
+"""
+import argparse
+import io
+import time
+import tracemalloc
+
+import numpy as np
+import soundfile as sf
+
+from benchmarks.synthetic import synth_speech
+from audio.audio_decoder import decode_mp3, open_audio_blocks
+from features.feature_assembler import extract_all_features
+from features.streaming_features import extract_features_from_blocks
+from config import STREAMING_BLOCK_SECONDS
+
+
+def batch_path(audio_bytes):
+    waveform, sr = decode_mp3(audio_bytes)
+    return extract_all_features(waveform, sr)
+
+
+def streaming_path(audio_bytes):
+    sr, blocks = open_audio_blocks(audio_bytes, STREAMING_BLOCK_SECONDS)
+    return extract_features_from_blocks(blocks, sr)[0]
+
+
+def profile(fn, audio_bytes):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(audio_bytes)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return np.array(result), elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--durations", type=float, nargs="+", default=[60, 300, 900])
+    parser.add_argument("--sr", type=int, default=16000)
+    args = parser.parse_args()
+
+    # Trigger numba JIT / FFT plan creation outside the timed region
+    extract_all_features(synth_speech(1, args.sr), args.sr)
+
+    print(f"{'duration':>9} {'batch s':>8} {'batch MB':>9} {'stream s':>9} {'stream MB':>10} {'max rel diff':>13}")
+    for duration in args.durations:
+        buf = io.BytesIO()
+        sf.write(buf, synth_speech(duration, args.sr), args.sr, format="FLAC")
+        audio_bytes = buf.getvalue()
+
+        batch, t_batch, m_batch = profile(batch_path, audio_bytes)
+        stream, t_stream, m_stream = profile(streaming_path, audio_bytes)
+        rel = np.max(np.abs(batch - stream) / (np.abs(batch) + 1e-12))
+        print(f"{duration:>8.0f}s {t_batch:>8.2f} {m_batch / 2**20:>9.1f} {t_stream:>9.2f} "
+              f"{m_stream / 2**20:>10.1f} {rel:>13.2e}")
+
+
+if __name__ == "__main__":
+    main()
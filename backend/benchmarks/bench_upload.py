@@ -0,0 +1,69 @@
+"""
+Upload path benchmark: base64-in-JSON vs raw audio/mpeg body vs multipart upload.
+
+Times the request handling up to the point where decode_mp3 receives its bytes
+(body read, JSON parse, base64 decode) and records the Python peak memory of
+that stage with tracemalloc.
+
+Usage (from backend/):
+    python -m benchmarks.bench_upload [--sizes-mb 1 5 20] [--repeats 5]
+"""
+import argparse
+import base64
+import io
+import json
+import time
+import tracemalloc
+
+import numpy as np
+from flask import Flask, request
+
+from routes import _read_payload, _payload_audio_bytes
+
+APP = Flask(__name__)
+
+
+def request_kwargs(kind, audio_bytes):
+    if kind == "json-base64":
+        body = json.dumps({"audioFormat": "mp3", "audioBase64": base64.b64encode(audio_bytes).decode()})
+        return {"data": body, "content_type": "application/json"}
+    if kind == "raw":
+        return {"data": audio_bytes, "content_type": "audio/mpeg"}
+    return {"data": {"file": (io.BytesIO(audio_bytes), "clip.mp3", "audio/mpeg")},
+            "content_type": "multipart/form-data"}
+
+
+def measure(kind, audio_bytes, repeats):
+    best, peak = float("inf"), 0
+    for _ in range(repeats):
+        kwargs = request_kwargs(kind, audio_bytes)
+        with APP.test_request_context("/api/voice-detection", method="POST", **kwargs):
+            tracemalloc.start()
+            start = time.perf_counter()
+            payload, error = _read_payload(request)
+            decoded = _payload_audio_bytes(payload)
+            elapsed = time.perf_counter() - start
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        assert error is None and len(decoded) == len(audio_bytes)
+        best = min(best, elapsed)
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'size':>7} {'path':>12} {'ms':>9} {'peak MB':>9}")
+    for size_mb in args.sizes_mb:
+        # Random bytes stand in for an MP3 body; this stage never parses the audio
+        audio_bytes = np.random.default_rng(0).bytes(int(size_mb * 1024 * 1024))
+        for kind in ("json-base64", "raw", "multipart"):
+            elapsed, peak = measure(kind, audio_bytes, args.repeats)
+            print(f"{size_mb:>5.0f}MB {kind:>12} {elapsed * 1e3:>9.2f} {peak / 2**20:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Voice-activity trimming benchmark: extract_all_features on whole call-length
+recordings vs trim_silence followed by extract_all_features on the speech.
+
+Calls are synthetic speech turns (benchmarks/synthetic.py, 2-10 s each)
+separated by line-noise pauses, with the pause lengths scaled so that roughly
+--silence of each call is non-speech. Reports the VAD's own cost, the speech
+ratio it found and the end-to-end saving.
+
+Usage (from backend/):
+    python -m benchmarks.bench_vad [--durations 60 300 600] [--silence 0.5] [--sr 16000] [--repeats 2]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import synth_speech
+from features.feature_assembler import extract_all_features
+from quality.vad import trim_silence
+
+NOISE_LEVEL = 0.002  # line noise in the pauses, ~-54 dBFS
+
+
+def synth_call(duration_s, sr, silence, seed=0):
+    rng = np.random.default_rng(seed)
+    parts, total, turn = [], 0, 0
+    while total < duration_s * sr:
+        speech = synth_speech(rng.uniform(2, 10), sr, f0=rng.uniform(100, 220), seed=seed + turn)
+        pause_s = len(speech) / sr * silence / (1 - silence) * rng.uniform(0.5, 1.5)
+        parts += [speech, NOISE_LEVEL * rng.standard_normal(int(pause_s * sr))]
+        total += len(parts[-2]) + len(parts[-1])
+        turn += 1
+    return np.concatenate(parts)[:int(duration_s * sr)].astype(np.float32)
+
+
+def best_time(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--durations", type=float, nargs="+", default=[60, 300, 600])
+    parser.add_argument("--silence", type=float, default=0.5, help="target non-speech fraction")
+    parser.add_argument("--sr", type=int, default=16000)
+    parser.add_argument("--repeats", type=int, default=2)
+    args = parser.parse_args()
+
+    extract_all_features(synth_speech(2, args.sr), args.sr)  # librosa / numba warm-up
+    print(f"{'call':>6} {'speech':>7} {'snr':>6} {'vad':>8} {'full':>8} {'trimmed':>8} {'saved':>6}")
+    for duration in args.durations:
+        y = synth_call(duration, args.sr, args.silence)
+        vad_s, (speech, report) = best_time(lambda: trim_silence(y, args.sr), args.repeats)
+        full_s, _ = best_time(lambda: extract_all_features(y, args.sr), args.repeats)
+        trimmed_s, _ = best_time(lambda: extract_all_features(speech, args.sr), args.repeats)
+        saved = 1 - (vad_s + trimmed_s) / full_s
+        print(f"{duration:5.0f}s {report['speech_ratio']:7.2f} {report['snr_db']:5.1f}dB "
+              f"{vad_s * 1000:6.1f}ms {full_s:7.2f}s {trimmed_s:7.2f}s {saved:6.0%}")
+
+
+if __name__ == "__main__":
+    main()
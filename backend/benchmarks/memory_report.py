@@ -0,0 +1,134 @@
+"""
+Per-process memory of the gunicorn deployment without and with preload.
+
+Starts gunicorn (gunicorn.conf.py) once per mode with --workers workers:
+
+  per-worker  GUNICORN_PRELOAD=0, MODEL_BACKEND=--backend (default keras):
+              every worker imports the app and loads its own model
+  preload     GUNICORN_PRELOAD=1, MODEL_BACKEND=mmap: the master loads the
+              app once and the workers share it; assets/model.weights is one
+              read-only mapping (python -m model.flat_weights creates it)
+
+After readiness, --requests analysis requests are sent so every worker has
+run the pipeline. Then RSS, PSS and private memory are read from
+/proc/<pid>/smaps_rollup for the master and each worker. PSS splits shared
+pages between the processes that map them, so the PSS total is the
+deployment's real footprint. Linux only.
+
+Usage (from backend/):
+    python -m benchmarks.memory_report [--workers 4] [--backend keras] [--assets assets] [--requests 16]
+"""
+import argparse
+import base64
+import io
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import soundfile as sf
+
+from benchmarks.synthetic import synth_speech
+
+API_KEY = "memory-report-key"
+READY_TIMEOUT_S = 300
+FIELDS = ("Rss", "Pss", "Private_Clean", "Private_Dirty")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def smaps_rollup(pid):
+    """{field: MiB} for FIELDS from /proc/<pid>/smaps_rollup."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0].rstrip(":") in FIELDS:
+                values[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return values
+
+
+def children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(p) for p in f.read().split()]
+
+
+def request(url, body=None, timeout=60):
+    data = None if body is None else json.dumps(body).encode()
+    req = urllib.request.Request(url, data=data, headers={"x-api-key": API_KEY, "Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        return response.status
+
+
+def run_mode(name, env, args, clip_b64):
+    port = free_port()
+    env = {**os.environ, **env, "API_KEY": API_KEY, "GUNICORN_BIND": f"127.0.0.1:{port}",
+           "GUNICORN_WORKERS": str(args.workers), "MODEL_ASSETS_DIR": os.path.abspath(args.assets)}
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"], env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        base = f"http://127.0.0.1:{port}/api"
+        deadline = time.time() + READY_TIMEOUT_S
+        while True:
+            try:
+                if request(base + "/health/ready", timeout=5) == 200 and len(children(server.pid)) == args.workers:
+                    break
+            except Exception:
+                pass
+            if server.poll() is not None or time.time() > deadline:
+                raise SystemExit(f"❌ gunicorn ({name}) did not become ready")
+            time.sleep(0.5)
+        body = {"language": "English", "audioFormat": "mp3", "audioBase64": clip_b64}
+        for _ in range(args.requests):
+            request(base + "/voice-detection", body)
+        time.sleep(1.0)
+
+        rows = [("master", server.pid)] + [(f"worker {i}", pid) for i, pid in enumerate(children(server.pid))]
+        print(f"\n{name}")
+        print(f"  {'process':<10} {'RSS MiB':>9} {'PSS MiB':>9} {'private MiB':>12}")
+        totals = {"Rss": 0.0, "Pss": 0.0, "private": 0.0}
+        for label, pid in rows:
+            m = smaps_rollup(pid)
+            private = m["Private_Clean"] + m["Private_Dirty"]
+            print(f"  {label:<10} {m['Rss']:9.1f} {m['Pss']:9.1f} {private:12.1f}")
+            totals["Rss"] += m["Rss"]
+            totals["Pss"] += m["Pss"]
+            totals["private"] += private
+        print(f"  {'total':<10} {totals['Rss']:9.1f} {totals['Pss']:9.1f} {totals['private']:12.1f}")
+        return totals
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--backend", default="keras", help="MODEL_BACKEND of the per-worker run")
+    parser.add_argument("--assets", default="assets", help="MODEL_ASSETS_DIR for both runs")
+    parser.add_argument("--requests", type=int, default=16)
+    args = parser.parse_args()
+
+    buf = io.BytesIO()
+    sf.write(buf, synth_speech(4.0), 16000, format="WAV")
+    clip_b64 = base64.b64encode(buf.getvalue()).decode()
+    # Verdict cache off so every request runs the pipeline
+    common = {"VERDICT_CACHE_ENABLED": "0"}
+    before = run_mode(f"per-worker ({args.backend})",
+                      {**common, "GUNICORN_PRELOAD": "0", "MODEL_BACKEND": args.backend}, args, clip_b64)
+    after = run_mode("preload (mmap)", {**common, "GUNICORN_PRELOAD": "1", "MODEL_BACKEND": "mmap"}, args, clip_b64)
+    print(f"\nPSS total: {before['Pss']:.0f} MiB -> {after['Pss']:.0f} MiB "
+          f"({before['Pss'] / max(after['Pss'], 1e-9):.1f}x less); "
+          f"per worker ~{(before['Pss'] - after['Pss']) / args.workers:.0f} MiB saved")
+
+
+if __name__ == "__main__":
+    main()
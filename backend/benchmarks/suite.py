@@ -0,0 +1,231 @@
+"""
+Pipeline benchmark suite with regression tracking.
+
+Generates synthetic speech-like clips (benchmarks/synthetic.py) for every
+format x sample rate x duration and times each stage on its own:
+
+  decode_base64_audio, decode_mp3, feature_context (the shared STFT),
+  extract_pitch_features, extract_spectral_features, extract_mfcc_features,
+  extract_all_features, compute_quality_factor, run_inference, route
+
+"route" is a full POST /api/voice-detection through the Flask test client,
+with the verdict cache and fingerprint index disabled so every request does
+the work, and without the admission size limits (a 600 s 44.1 kHz WAV is about
+70 MB of base64, over the default MAX_REQUEST_BYTES). Each stage reports its best wall time over --repeats, plus the
+tracemalloc peak from one extra traced run (traced runs are never timed).
+
+Results are written as JSON (--out). With --baseline, every stage is compared
+against the stored run: a stage regresses when it is more than --threshold
+slower (relative) and more than --min-delta-ms slower (absolute, to ignore
+timer noise on tiny stages). A case or stage of the baseline that failed or is
+missing from this run counts as a regression too. A failed case is recorded
+with its error and makes the exit code 1 even without a baseline, as does any
+regression.
+Baselines are machine-specific; record one on the machine that runs the
+comparison (--save-baseline).
+
+Usage (from backend/):
+    python -m benchmarks.suite [--quick] [--durations 1 10 60 600] [--rates 16000 44100]
+                               [--formats MP3 WAV] [--repeats 3] [--out benchmark_results.json]
+                               [--baseline benchmarks/baseline.json] [--threshold 0.2]
+                               [--save-baseline benchmarks/baseline.json]
+"""
+import os
+
+# Measure the full pipeline on every route call, not cached verdicts
+os.environ["VERDICT_CACHE_ENABLED"] = "0"
+os.environ["FINGERPRINT_ENABLED"] = "0"
+# Long clips are part of the suite; the route stage must not be rejected with 413
+os.environ["MAX_REQUEST_BYTES"] = "0"
+os.environ["MAX_AUDIO_SECONDS"] = "0"
+os.environ.setdefault("API_KEY", "benchmark-key")
+os.environ.setdefault("WARMUP_ENABLED", "0")
+
+import argparse
+import base64
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import librosa
+import soundfile as sf
+
+from benchmarks.synthetic import synth_speech
+from audio.base64_handler import decode_base64_audio
+from audio.audio_decoder import decode_mp3
+from features.feature_context import FeatureContext
+from features.feature_assembler import extract_all_features
+from features.pitch_features import extract_pitch_features
+from features.spectral_features import extract_spectral_features
+from features.mfcc_features import extract_mfcc_features
+from quality.quality_score import compute_quality_factor
+from model import model_loader
+from model.inference import run_inference
+
+QUICK_DURATIONS = [1, 10]
+
+
+def measure(fn, repeats):
+    """Best wall time over repeats (untraced), then one traced run for the Python peak."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"seconds": best, "peakMB": peak / 2**20}
+
+
+def encode_clip(y, sr, fmt):
+    buf = io.BytesIO()
+    sf.write(buf, y, sr, format=fmt)
+    return buf.getvalue()
+
+
+def bench_case(client, headers, fmt, sr, duration, repeats):
+    audio_bytes = encode_clip(synth_speech(duration, sr), sr, fmt)
+    audio_b64 = base64.b64encode(audio_bytes).decode()
+    waveform, decoded_sr = decode_mp3(audio_bytes)
+    features = extract_all_features(waveform, decoded_sr)
+
+    def with_stft(extract):
+        ctx = FeatureContext(waveform, decoded_sr)
+        _ = ctx.magnitude
+        return lambda: extract(waveform, decoded_sr, FeatureContext(waveform, decoded_sr, magnitude=ctx.magnitude))
+
+    def route():
+        response = client.post("/api/voice-detection", headers=headers, json={
+            "language": "English", "audioFormat": "mp3", "audioBase64": audio_b64
+        })
+        assert response.status_code == 200, response.get_json()
+
+    stages = {
+        "decode_base64_audio": lambda: decode_base64_audio(audio_b64),
+        "decode_mp3": lambda: decode_mp3(audio_bytes),
+        "feature_context": lambda: FeatureContext(waveform, decoded_sr).magnitude,
+        "extract_pitch_features": with_stft(extract_pitch_features),
+        "extract_spectral_features": with_stft(extract_spectral_features),
+        "extract_mfcc_features": with_stft(extract_mfcc_features),
+        "extract_all_features": lambda: extract_all_features(waveform, decoded_sr),
+        "compute_quality_factor": lambda: compute_quality_factor(waveform),
+        "run_inference": lambda: run_inference(features),
+        "route": route,
+    }
+    result = {"bytes": len(audio_bytes), "stages": {}}
+    for name, fn in stages.items():
+        result["stages"][name] = measure(fn, repeats)
+    return result
+
+
+def compare(results, baseline, threshold, min_delta_s):
+    """
+    Prints stage-by-stage ratios against the baseline; returns the number of
+    regressions. Baseline cases and stages that failed or are missing now count.
+    """
+    regressions = 0
+    print(f"\n{'case':>18} {'stage':>26} {'baseline ms':>12} {'now ms':>10} {'ratio':>7}")
+    for case, previous in baseline.get("cases", {}).items():
+        if "stages" not in previous:
+            continue
+        current = results["cases"].get(case)
+        if current is None or "stages" not in current:
+            regressions += 1
+            reason = current["error"] if current else "not run"
+            print(f"{case:>18} {'(all)':>26} {'':>12} {'':>10} {'':>7}  REGRESSION: {reason}")
+            continue
+        for stage, before in previous["stages"].items():
+            now = current["stages"].get(stage)
+            if now is None:
+                regressions += 1
+                print(f"{case:>18} {stage:>26} {before['seconds'] * 1e3:>12.2f} {'':>10} {'':>7}  REGRESSION: missing")
+                continue
+            ratio = now["seconds"] / before["seconds"] if before["seconds"] > 0 else float("inf")
+            regressed = ratio > 1 + threshold and now["seconds"] - before["seconds"] > min_delta_s
+            regressions += regressed
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{case:>18} {stage:>26} {before['seconds'] * 1e3:>12.2f} "
+                  f"{now['seconds'] * 1e3:>10.2f} {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--durations", type=float, nargs="+", default=[1, 10, 60, 600])
+    parser.add_argument("--rates", type=int, nargs="+", default=[16000, 44100])
+    parser.add_argument("--formats", nargs="+", default=["MP3", "WAV"])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--quick", action="store_true", help=f"only {QUICK_DURATIONS} second clips")
+    parser.add_argument("--out", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative slowdown (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="ignore slowdowns smaller than this")
+    parser.add_argument("--save-baseline", help="also write the results to this baseline path")
+    args = parser.parse_args()
+    durations = QUICK_DURATIONS if args.quick else args.durations
+
+    from app import app
+    client = app.test_client()
+    headers = {"x-api-key": os.environ["API_KEY"]}
+    model_loader.load_model_and_scaler()
+
+    # numba JIT, FFT plans and the Keras predict function outside the timed region
+    warm = synth_speech(1, 16000)
+    run_inference(extract_all_features(warm, 16000))
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "librosa": librosa.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "modelBackend": model_loader.BACKEND,
+            "repeats": args.repeats,
+        },
+        "cases": {},
+    }
+    print(f"{'case':>18} {'stage':>26} {'ms':>10} {'peak MB':>9}")
+    failed = 0
+    for fmt in args.formats:
+        for sr in args.rates:
+            for duration in durations:
+                case = f"{fmt}/{sr}/{duration:g}s"
+                try:
+                    results["cases"][case] = bench_case(client, headers, fmt, sr, duration, args.repeats)
+                except Exception as e:
+                    failed += 1
+                    results["cases"][case] = {"error": f"{type(e).__name__}: {e}"}
+                    print(f"{case:>18} ❌ FAILED: {results['cases'][case]['error']}")
+                    continue
+                for stage, r in results["cases"][case]["stages"].items():
+                    print(f"{case:>18} {stage:>26} {r['seconds'] * 1e3:>10.2f} {r['peakMB']:>9.1f}")
+
+    for path in filter(None, [args.out, args.save_baseline]):
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"📁 Results written to {path}")
+
+    if failed:
+        print(f"\n❌ {failed} case(s) failed")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms / 1000.0)
+        if regressions:
+            print(f"\n❌ {regressions} stage(s) regressed by more than {args.threshold:.0%}, failed or are missing")
+            sys.exit(1)
+        print(f"\n✅ No stage regressed by more than {args.threshold:.0%}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Content-addressed verdict cache.
+
+Replayed robocall audio is looked up by the SHA-256 of its decoded audio bytes
+before any decoding or feature work. Entries hold the classification,
+confidence and explanation. The memory tier is an LRU bounded by entry count,
+total bytes and a TTL. An optional SQLite tier keeps verdicts across restarts.
+Every entry is tagged with model_loader.MODEL_VERSION plus a digest of the
+settings that change the features (FEATURE_SETTINGS), so changing the model
+artifacts or, say, VAD_ENABLED invalidates both tiers.
+
+Nothing is cached while no model is loaded (MODEL_VERSION "mock"): mock
+verdicts are random. SQLite never runs under the cache lock. put() only
+updates the memory tier and queues the row, and a writer thread (one per
+process) commits the queued rows in one transaction, together with the
+expiry sweep. The disk tier therefore trails the memory tier by one commit.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import config
+from config import (
+    VERDICT_CACHE_ENABLED, VERDICT_CACHE_MAX_ENTRIES, VERDICT_CACHE_MAX_BYTES,
+    VERDICT_CACHE_TTL_SECONDS, VERDICT_CACHE_DISK_PATH
+)
+from model import model_loader
+
+# Settings that change what the same audio is scored on; a verdict computed
+# under other values must not be served
+FEATURE_SETTINGS = (
+    "CANONICAL_SAMPLE_RATE", "PITCH_ESTIMATOR",
+    "VAD_ENABLED", "VAD_THRESHOLD_DB", "VAD_HANGOVER_MS", "VAD_MIN_SPEECH_SECONDS",
+    "SEGMENTED_ANALYSIS", "SEGMENT_MIN_SECONDS", "SEGMENT_SECONDS", "SEGMENT_OVERLAP",
+    "SEGMENT_MIN_SEGMENTS", "SEGMENT_EARLY_EXIT_CONFIDENCE", "SEGMENT_MAX_SEGMENTS",
+)
+
+
+def audio_cache_key(audio_bytes):
+    return hashlib.sha256(audio_bytes).hexdigest()
+
+
+def settings_digest(names=FEATURE_SETTINGS):
+    settings = json.dumps({name: getattr(config, name) for name in names}, sort_keys=True)
+    return hashlib.sha256(settings.encode()).hexdigest()[:12]
+
+
+SETTINGS_DIGEST = settings_digest()
+
+
+def cache_version():
+    return f"{model_loader.MODEL_VERSION}+{SETTINGS_DIGEST}"
+
+
+class VerdictCache:
+    def __init__(self, max_entries=VERDICT_CACHE_MAX_ENTRIES, max_bytes=VERDICT_CACHE_MAX_BYTES,
+                 ttl_seconds=VERDICT_CACHE_TTL_SECONDS, disk_path=VERDICT_CACHE_DISK_PATH,
+                 version_fn=cache_version):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.version_fn = version_fn
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._version = None
+        self.disk_path = disk_path or None
+        self._connection = None
+        self._connection_pid = None
+        self._pending = []  # (key, model_version, expires_at, value JSON) rows not yet on disk
+        self._purge_version = None
+        self._write_requested = threading.Event()
+        self._writer_pid = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def _db(self):
+        # Opened lazily, once per process: SQLite connections must not cross fork().
+        # Used with _db_lock held, never _lock
+        if self.disk_path is None:
+            return None
+        if self._connection_pid != os.getpid():
+            self._connection = sqlite3.connect(self.disk_path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts ("
+                "key TEXT PRIMARY KEY, model_version TEXT, expires_at REAL, value TEXT)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS verdicts_expiry ON verdicts (expires_at)")
+            self._connection.commit()
+            self._connection_pid = os.getpid()
+        return self._connection
+
+    def _check_version(self):
+        # Called with the lock held: drop everything computed by a different model
+        version = self.version_fn()
+        if version == self._version:
+            return version
+        if self._version is not None:
+            self.invalidations += 1
+        self._entries.clear()
+        self._bytes = 0
+        self._pending = []
+        if self.disk_path is not None:
+            # The writer deletes the old model's rows; lookups filter on the version meanwhile
+            self._purge_version = version
+            self._queue_write_locked()
+        self._version = version
+        return version
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            version = self._check_version()
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, size, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return dict(value)
+                self._remove(key)
+                self.expirations += 1
+
+        row = None
+        if self.disk_path is not None:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT expires_at, value FROM verdicts WHERE key = ? AND model_version = ?",
+                    (key, version)
+                ).fetchone()
+
+        with self._lock:
+            if row is not None and row[0] > now and version == self._version:
+                value = json.loads(row[1])
+                self._store(key, value, row[0])
+                self.hits += 1
+                self.disk_hits += 1
+                return dict(value)
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        if model_loader.MODEL_VERSION == "mock":
+            # No model loaded: the verdict is random and must not be replayed
+            return
+        expires_at = time.time() + self.ttl_seconds
+        encoded = json.dumps(value)
+        with self._lock:
+            version = self._check_version()
+            self._store(key, value, expires_at, size=len(key) + len(encoded))
+            if self.disk_path is not None:
+                self._pending.append((key, version, expires_at, encoded))
+                self._queue_write_locked()
+
+    def _queue_write_locked(self):
+        if self._writer_pid != os.getpid():
+            self._writer_pid = os.getpid()
+            threading.Thread(target=self._write_loop, name="verdict-cache-writer", daemon=True).start()
+        self._write_requested.set()
+
+    def _write_loop(self):
+        while True:
+            self._write_requested.wait()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"⚠️ WARNING: Verdict cache disk write failed ({e})")
+
+    def flush(self):
+        """Commits the queued verdicts (and any version purge) to the SQLite tier."""
+        with self._lock:
+            self._write_requested.clear()
+            rows, self._pending = self._pending, []
+            purge_version, self._purge_version = self._purge_version, None
+        if self.disk_path is None or not (rows or purge_version):
+            return
+        with self._db_lock:
+            db = self._db
+            if purge_version is not None:
+                db.execute("DELETE FROM verdicts WHERE model_version != ?", (purge_version,))
+            db.executemany(
+                "INSERT OR REPLACE INTO verdicts (key, model_version, expires_at, value) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            db.execute("DELETE FROM verdicts WHERE expires_at <= ?", (time.time(),))
+            db.commit()
+
+    def _store(self, key, value, expires_at, size=None):
+        if size is None:
+            size = len(key) + len(json.dumps(value))
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (expires_at, size, dict(value))
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._pending = []
+        if self.disk_path is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM verdicts")
+                self._db.commit()
+
+    def stats(self):
+        disk_entries = None
+        if self.disk_path is not None:
+            with self._db_lock:
+                disk_entries = self._db.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": True,
+                "modelVersion": self._version,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "diskEntries": disk_entries,
+                "pendingDiskWrites": len(self._pending),
+                "hits": self.hits,
+                "diskHits": self.disk_hits,
+                "misses": self.misses,
+                "hitRatio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+VERDICT_CACHE = VerdictCache() if VERDICT_CACHE_ENABLED else None
+
+def cache_stats():
+    if VERDICT_CACHE is None:
+        return {"enabled": False}
+    return VERDICT_CACHE.stats()
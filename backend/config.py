@@ -1,3 +1,5 @@
+import os
+
 SUPPORTED_LANGUAGES = ["Tamil", "English", "Hindi", "Malayalam", "Telugu"]
 
 CLASS_AI = "AI_GENERATED"
@@ -5,3 +7,147 @@ CLASS_HUMAN = "HUMAN"
 
 CONFIDENCE_MIN = 0.05
 CONFIDENCE_MAX = 0.99
+
+# Maximum number of clips accepted by /api/voice-detection/batch
+BATCH_MAX_ITEMS = 64
+
+# Micro-batching: concurrent single-clip requests share one model call.
+# A batch is flushed when it reaches MAX_SIZE or its oldest request has waited MAX_WAIT_MS.
+MICROBATCH_ENABLED = os.getenv("MICROBATCH_ENABLED", "0") == "1"
+MICROBATCH_MAX_SIZE = int(os.getenv("MICROBATCH_MAX_SIZE", "32"))
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("MICROBATCH_MAX_WAIT_MS", "5"))
+
+# Inference backend: "keras" (assets/model.h5 + scaler.pkl), "numpy" (assets/model.npz),
+# "mmap" (assets/model.weights, memory-mapped read-only so every process shares one
+# copy), "int8" / "float16" (assets/model.int8.weights / model.float16.weights,
+# written by training/quantize_model.py once they pass its accuracy gate; never
+# picked by "auto") or "auto" (the first of mmap, numpy, keras whose artifacts exist)
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "auto").lower()
+MODEL_ASSETS_DIR = os.getenv(
+    "MODEL_ASSETS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+)
+
+# Set by gunicorn.conf.py when the app is preloaded in the gunicorn master: the
+# model, fingerprint index and warm-up run once before fork and are shared
+# copy-on-write; the pipeline pool, SQLite and TensorFlow (not fork-safe) are
+# set up in each worker by runtime.startup.after_fork.
+PREFORK_PRELOAD = os.getenv("PREFORK_PRELOAD", "0") == "1"
+
+# Worker startup: "eager" loads the model and warms up inside create_app,
+# "background" does both on a thread and reports readiness on /api/health/ready
+STARTUP_MODE = os.getenv("STARTUP_MODE", "eager").lower()
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") == "1"
+
+# Admission control for /api/voice-detection and /api/voice-detection/batch. Bodies
+# over MAX_REQUEST_BYTES get 413 before they are read or parsed, and MP3 clips whose
+# duration estimated from the frame headers (audio/mp3_probe.py) exceeds
+# MAX_AUDIO_SECONDS get 413 before decoding (0 = no limit for either). At most
+# ADMISSION_MAX_CONCURRENT analysis requests run at once per process (0 = no
+# limit); one that gets no slot within ADMISSION_QUEUE_TIMEOUT_MS is answered 429
+# with Retry-After: ADMISSION_RETRY_AFTER_SECONDS. Under gunicorn's gthread workers
+# keep the limit below GUNICORN_THREADS, or requests queue in the worker instead.
+MAX_REQUEST_BYTES = int(os.getenv("MAX_REQUEST_BYTES", str(64 * 1024 * 1024)))
+MAX_AUDIO_SECONDS = float(os.getenv("MAX_AUDIO_SECONDS", "1800"))
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", str(os.cpu_count() or 1)))
+ADMISSION_QUEUE_TIMEOUT_MS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", "50"))
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1"))
+
+# Request Content-Types accepted as a raw MP3 body on /api/voice-detection
+BINARY_AUDIO_MIMETYPES = ("audio/mpeg", "audio/mp3")
+
+# Live-call streaming (/api/voice-detection/stream): features are computed over the
+# last WINDOW seconds every UPDATE seconds once MIN_SPEECH seconds of speech arrived.
+# Each open stream holds a server thread for its whole life, so under gunicorn's
+# gthread workers MAX_SESSIONS (per process) must stay below GUNICORN_THREADS or
+# further connections wait for a thread instead of getting the "too many streams"
+# error; gunicorn.conf.py defaults it to half the threads. Raise GUNICORN_THREADS
+# for more concurrent calls.
+STREAM_WINDOW_SECONDS = float(os.getenv("STREAM_WINDOW_SECONDS", "8"))
+STREAM_UPDATE_SECONDS = float(os.getenv("STREAM_UPDATE_SECONDS", "1"))
+STREAM_MIN_SPEECH_SECONDS = float(os.getenv("STREAM_MIN_SPEECH_SECONDS", "2"))
+STREAM_SMOOTHING = float(os.getenv("STREAM_SMOOTHING", "0.5"))
+STREAM_MAX_SESSIONS = int(os.getenv("STREAM_MAX_SESSIONS", "200"))
+STREAM_IDLE_TIMEOUT_SECONDS = float(os.getenv("STREAM_IDLE_TIMEOUT_SECONDS", "30"))
+
+# Long recordings: payloads above STREAMING_DECODE_MIN_BYTES are decoded block-wise
+# and reduced with online accumulators instead of materializing the waveform.
+STREAMING_DECODE_MIN_BYTES = int(os.getenv("STREAMING_DECODE_MIN_BYTES", str(8 * 1024 * 1024)))
+STREAMING_BLOCK_SECONDS = float(os.getenv("STREAMING_BLOCK_SECONDS", "10"))
+STREAMING_DB_PRELUDE_SECONDS = float(os.getenv("STREAMING_DB_PRELUDE_SECONDS", "30"))
+
+# Verdict cache keyed by SHA-256 of the audio bytes (LRU + TTL, optional SQLite tier)
+VERDICT_CACHE_ENABLED = os.getenv("VERDICT_CACHE_ENABLED", "1") == "1"
+VERDICT_CACHE_MAX_ENTRIES = int(os.getenv("VERDICT_CACHE_MAX_ENTRIES", "10000"))
+VERDICT_CACHE_MAX_BYTES = int(os.getenv("VERDICT_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+VERDICT_CACHE_TTL_SECONDS = float(os.getenv("VERDICT_CACHE_TTL_SECONDS", "86400"))
+VERDICT_CACHE_DISK_PATH = os.getenv("VERDICT_CACHE_DISK_PATH", "")
+
+# Near-duplicate lookup: requests are matched against a fingerprint index of known
+# clips (built with `python -m fingerprint.build_index`) before running the model.
+FINGERPRINT_ENABLED = os.getenv("FINGERPRINT_ENABLED", "1") == "1"
+FINGERPRINT_INDEX_PATH = os.getenv(
+    "FINGERPRINT_INDEX_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "fingerprint_index")
+)
+FINGERPRINT_MAX_BER = float(os.getenv("FINGERPRINT_MAX_BER", "0.30"))
+FINGERPRINT_MIN_MATCH_FRAMES = int(os.getenv("FINGERPRINT_MIN_MATCH_FRAMES", "32"))
+
+# Language detector profiles: a JSON table written by training/fit_language_profiles.py.
+# Empty uses the built-in hand-tuned profiles.
+LANGUAGE_PROFILES_PATH = os.getenv("LANGUAGE_PROFILES_PATH", "")
+
+# Pitch statistics: "piptrack" (librosa peak picking, what the shipped model was
+# trained on) or "yin" (one F0 per frame from the shared STFT, much faster;
+# requires a model trained with the same estimator)
+PITCH_ESTIMATOR = os.getenv("PITCH_ESTIMATOR", "piptrack").lower()
+
+# Decoded audio is downmixed and resampled once to this rate (Hz) with a polyphase
+# filter. 0 keeps each file's native rate, which is what the shipped model was
+# trained on; 16000 cuts the feature work on 44.1/48 kHz uploads by ~3x but needs
+# a model trained at that rate.
+CANONICAL_SAMPLE_RATE = int(os.getenv("CANONICAL_SAMPLE_RATE", "0"))
+
+# Voice-activity trimming (quality/vad.py): 20 ms frames more than VAD_THRESHOLD_DB
+# above the clip's noise floor are speech, kept with VAD_HANGOVER_MS of context;
+# the rest is dropped before feature extraction. Clips with less than
+# VAD_MIN_SPEECH_SECONDS of speech are analyzed whole. Off by default: the shipped
+# model was trained on untrimmed clips (training uses the same setting).
+VAD_ENABLED = os.getenv("VAD_ENABLED", "0") == "1"
+VAD_THRESHOLD_DB = float(os.getenv("VAD_THRESHOLD_DB", "12"))
+VAD_HANGOVER_MS = int(os.getenv("VAD_HANGOVER_MS", "200"))
+VAD_MIN_SPEECH_SECONDS = float(os.getenv("VAD_MIN_SPEECH_SECONDS", "1.0"))
+
+# Segmented analysis (runtime/segments.py): with SEGMENTED_ANALYSIS=1, clips of at
+# least SEGMENT_MIN_SECONDS are scored as SEGMENT_SECONDS windows overlapping by
+# SEGMENT_OVERLAP, featurized on SEGMENT_WORKERS threads (0 = one per core; use 1
+# with the process pool). The verdict is the mean window AI probability, returned
+# with a per-window timeline. Scoring stops once SEGMENT_MIN_SEGMENTS windows are
+# in and the mean is SEGMENT_EARLY_EXIT_CONFIDENCE sure either way (1 = never), or
+# after SEGMENT_MAX_SEGMENTS windows (0 = no limit), which bounds latency.
+SEGMENTED_ANALYSIS = os.getenv("SEGMENTED_ANALYSIS", "0") == "1"
+SEGMENT_MIN_SECONDS = float(os.getenv("SEGMENT_MIN_SECONDS", "30"))
+SEGMENT_SECONDS = float(os.getenv("SEGMENT_SECONDS", "10"))
+SEGMENT_OVERLAP = float(os.getenv("SEGMENT_OVERLAP", "0.5"))
+SEGMENT_WORKERS = int(os.getenv("SEGMENT_WORKERS", "0"))
+SEGMENT_MIN_SEGMENTS = int(os.getenv("SEGMENT_MIN_SEGMENTS", "4"))
+SEGMENT_EARLY_EXIT_CONFIDENCE = float(os.getenv("SEGMENT_EARLY_EXIT_CONFIDENCE", "0.9"))
+SEGMENT_MAX_SEGMENTS = int(os.getenv("SEGMENT_MAX_SEGMENTS", "0"))
+
+# Process pool for decode/features/inference. 0 runs the pipeline in the request
+# thread; N > 0 spawns N pre-warmed workers (roughly one per core). Tasks slower
+# than TASK_TIMEOUT_S return 504, and workers are replaced after
+# MAX_TASKS_PER_CHILD tasks (0 = never).
+PIPELINE_POOL_WORKERS = int(os.getenv("PIPELINE_POOL_WORKERS", "0"))
+PIPELINE_TASK_TIMEOUT_S = float(os.getenv("PIPELINE_TASK_TIMEOUT_S", "30"))
+PIPELINE_MAX_TASKS_PER_CHILD = int(os.getenv("PIPELINE_MAX_TASKS_PER_CHILD", "500"))
+
+# Per-stage latency metrics are always collected and served at GET /metrics
+# (Prometheus text format). STAGE_TIMING_HEADER=1 also returns each request's
+# stage timings in a Server-Timing response header.
+STAGE_TIMING_HEADER = os.getenv("STAGE_TIMING_HEADER", "0") == "1"
+
+# Several server processes (gunicorn workers): each writes its counters and
+# histograms to METRICS_MULTIPROC_DIR after every request and /metrics sums every
+# process's file, so a scrape sees the whole server whichever worker answers it.
+# gunicorn.conf.py sets a fresh directory; empty = this process only.
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
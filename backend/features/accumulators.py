@@ -0,0 +1,43 @@
+import numpy as np
+
+
+class RunningStats:
+    """
+    Constant-memory mean / population variance / min / max over a stream of
+    values. Blocks are merged with Chan's parallel form of Welford's update, so
+    feeding N values in any chunking gives the same result as np.mean / np.var
+    (ddof=0) over all of them, up to float rounding.
+    """
+
+    def __init__(self, dim=None):
+        shape = () if dim is None else (dim,)
+        self.count = 0
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+
+    def update(self, values):
+        """values: shape (n,) for scalar stats or (n, dim) for vector stats."""
+        values = np.asarray(values, dtype=np.float64)
+        n = values.shape[0]
+        if n == 0:
+            return
+        block_mean = values.mean(axis=0)
+        block_m2 = ((values - block_mean) ** 2).sum(axis=0)
+
+        total = self.count + n
+        delta = block_mean - self.mean
+        self.mean = self.mean + delta * (n / total)
+        self.m2 = self.m2 + block_m2 + delta ** 2 * (self.count * n / total)
+        self.count = total
+        self.min = np.minimum(self.min, values.min(axis=0))
+        self.max = np.maximum(self.max, values.max(axis=0))
+
+    @property
+    def var(self):
+        return self.m2 / self.count if self.count else np.zeros_like(self.m2)
+
+    @property
+    def range(self):
+        return self.max - self.min if self.count else np.zeros_like(self.m2)
@@ -1,10 +1,17 @@
+from features.feature_context import FeatureContext
 from features.pitch_features import extract_pitch_features
 from features.spectral_features import extract_spectral_features
 from features.mfcc_features import extract_mfcc_features
 
-def extract_all_features(y, sr):
+def extract_all_features(y, sr, ctx=None):
+    """
+    Builds the 45-element feature vector. All extractors share one FeatureContext,
+    so the clip is transformed with a single STFT and a single mel projection.
+    """
+    if ctx is None:
+        ctx = FeatureContext(y, sr)
     features = []
-    features.extend(extract_pitch_features(y, sr))
-    features.extend(extract_spectral_features(y, sr))
-    features.extend(extract_mfcc_features(y, sr))
+    features.extend(extract_pitch_features(y, sr, ctx))
+    features.extend(extract_spectral_features(y, sr, ctx))
+    features.extend(extract_mfcc_features(y, sr, ctx))
     return features
@@ -0,0 +1,57 @@
+import numpy as np
+import librosa
+
+# librosa defaults shared by piptrack, spectral_* and mfcc
+N_FFT = 2048
+HOP_LENGTH = 512
+N_MFCC = 13
+
+
+class FeatureContext:
+    """
+    Per-clip cache of the spectral representations used by the feature extractors.
+    The magnitude STFT is computed once and shared by pitch, spectral and MFCC
+    extraction; derived views (power, mel, log-mel) are built lazily on first use.
+    """
+
+    def __init__(self, y, sr, n_fft=N_FFT, hop_length=HOP_LENGTH, magnitude=None):
+        # magnitude may be supplied by callers that maintain their own STFT frames (streaming)
+        self.y = y
+        self.sr = sr
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self._magnitude = magnitude
+        self._power = None
+        self._mel = None
+        self._log_mel = None
+
+    @property
+    def magnitude(self):
+        if self._magnitude is None:
+            self._magnitude = np.abs(
+                librosa.stft(self.y, n_fft=self.n_fft, hop_length=self.hop_length)
+            )
+        return self._magnitude
+
+    @property
+    def has_magnitude(self):
+        """True once the STFT exists (computed or supplied), so batch extraction can reuse it."""
+        return self._magnitude is not None
+
+    @property
+    def power(self):
+        if self._power is None:
+            self._power = self.magnitude ** 2
+        return self._power
+
+    @property
+    def mel(self):
+        if self._mel is None:
+            self._mel = librosa.feature.melspectrogram(S=self.power, sr=self.sr)
+        return self._mel
+
+    @property
+    def log_mel(self):
+        if self._log_mel is None:
+            self._log_mel = librosa.power_to_db(self.mel)
+        return self._log_mel
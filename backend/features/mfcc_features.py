@@ -1,8 +1,11 @@
 import numpy as np
 import librosa
 
-def extract_mfcc_features(y, sr):
-    mfcc = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
+def extract_mfcc_features(y, sr, ctx=None):
+    if ctx is not None:
+        mfcc = librosa.feature.mfcc(S=ctx.log_mel, n_mfcc=13)
+    else:
+        mfcc = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
     delta = librosa.feature.delta(mfcc)
 
     features = []
@@ -1,15 +1,113 @@
+from functools import lru_cache
+
 import numpy as np
 import librosa
 
-def extract_pitch_features(y, sr):
-    pitches, magnitudes = librosa.piptrack(y=y, sr=sr)
-    pitch_values = pitches[pitches > 0]
+from config import PITCH_ESTIMATOR
+
+# Speech F0 search range and YIN voicing threshold
+YIN_FMIN = 60.0
+YIN_FMAX = 500.0
+YIN_THRESHOLD = 0.15
+# The autocorrelation only needs the band below this cutoff, so the power
+# spectrum is truncated before the inverse FFT (decimation in the frequency domain)
+YIN_BAND_HZ = 4000.0
+
+
+@lru_cache(maxsize=16)
+def _yin_plan(sr, n_fft):
+    """Kept bins, decimated FFT size and the Hann window's autocorrelation for (sr, n_fft)."""
+    n_bins = min(n_fft // 2 + 1, int(np.ceil(YIN_BAND_HZ * n_fft / sr)) + 1)
+    n_lag_fft = 2 * (n_bins - 1)
+    window = librosa.filters.get_window("hann", n_fft, fftbins=True)
+    window_power = np.abs(np.fft.rfft(window)[:n_bins]) ** 2
+    window_acf = np.fft.irfft(window_power, n=n_lag_fft)
+    return n_bins, n_lag_fft, window_acf / window_acf[0]
+
+
+def estimate_f0(power, sr, n_fft):
+    """
+    YIN-style F0 per STFT frame from a power spectrogram (bins x frames).
+
+    The autocorrelation of each windowed frame is the inverse FFT of its power
+    spectrum; only the band below YIN_BAND_HZ is kept, which is equivalent to
+    working on decimated audio and shrinks the transform 3x at 24 kHz. The window's
+    own autocorrelation is divided out (Boersma), then the cumulative mean
+    normalized difference d'(tau) is searched for the first dip below
+    YIN_THRESHOLD in the speech range and refined by parabolic interpolation.
+    Returns one value per frame in Hz, 0 for unvoiced frames.
+    """
+    n_bins, n_lag_fft, window_acf = _yin_plan(sr, n_fft)
+    lag_sr = sr * n_lag_fft / n_fft
+    max_lag = min(int(lag_sr / YIN_FMIN) + 2, n_lag_fft // 2)
+    min_lag = max(2, int(lag_sr / YIN_FMAX))
+    if power.shape[1] == 0 or max_lag <= min_lag + 1:
+        return np.zeros(power.shape[1])
+
+    acf = np.fft.irfft(power[:n_bins], n=n_lag_fft, axis=0)[:max_lag + 1]
+    acf = acf / np.maximum(window_acf[:max_lag + 1, None], 1e-3)
+    energy = acf[0]
+
+    # Difference function under the stationarity approximation, then CMNDF
+    diff = np.maximum(2.0 * (energy[None, :] - acf), 0.0)
+    lags = np.arange(max_lag + 1)[:, None]
+    cumulative = np.cumsum(diff[1:], axis=0)
+    cmndf = np.ones_like(diff)
+    cmndf[1:] = diff[1:] * lags[1:] / np.maximum(cumulative, 1e-12)
+
+    search = cmndf[min_lag:max_lag]
+    below = search < YIN_THRESHOLD
+    voiced = below.any(axis=0) & (energy > 0)
+    tau = np.argmax(below, axis=0) + min_lag
+
+    # Walk down to the bottom of the first dip (a few lags at most)
+    cols = np.arange(power.shape[1])
+    for _ in range(8):
+        step = (tau + 1 < max_lag) & (cmndf[np.minimum(tau + 1, max_lag), cols] < cmndf[tau, cols])
+        if not step.any():
+            break
+        tau = tau + step
+
+    # Parabolic interpolation around the minimum
+    left, centre, right = cmndf[tau - 1, cols], cmndf[tau, cols], cmndf[tau + 1, cols]
+    denom = left - 2 * centre + right
+    offset = np.where(np.abs(denom) > 1e-12, 0.5 * (left - right) / np.where(denom == 0, 1, denom), 0.0)
+    period = tau + np.clip(offset, -1, 1)
+
+    return np.where(voiced, lag_sr / period, 0.0)
+
+
+def pitch_track(magnitude, sr, n_fft, power=None):
+    """
+    Pitch (Hz) per bin and frame (piptrack) or one row per frame (YIN), 0 where
+    unvoiced, using the configured PITCH_ESTIMATOR. Accepts stacked
+    (clips, bins, frames) spectrograms; both estimators work frame by frame.
+    """
+    if PITCH_ESTIMATOR == "yin":
+        power = magnitude ** 2 if power is None else power
+        frames = np.moveaxis(power, -2, 0).reshape(power.shape[-2], -1)
+        return estimate_f0(frames, sr, n_fft).reshape(power.shape[:-2] + (1, power.shape[-1]))
+    pitches, magnitudes = librosa.piptrack(S=magnitude, sr=sr, n_fft=n_fft)
+    return pitches
+
+
+def pitch_values(magnitude, sr, n_fft, power=None):
+    """Voiced pitch values (Hz) from a magnitude STFT, using the configured PITCH_ESTIMATOR."""
+    track = pitch_track(magnitude, sr, n_fft, power)
+    return track[track > 0]
+
+
+def extract_pitch_features(y, sr, ctx=None):
+    if ctx is not None:
+        values = pitch_values(ctx.magnitude, sr, ctx.n_fft, ctx.power if PITCH_ESTIMATOR == "yin" else None)
+    else:
+        values = pitch_values(np.abs(librosa.stft(y)), sr, 2048)
 
-    if len(pitch_values) == 0:
+    if len(values) == 0:
         return [0, 0, 0]
 
     return [
-        float(np.mean(pitch_values)),
-        float(np.var(pitch_values)),
-        float(np.max(pitch_values) - np.min(pitch_values))
+        float(np.mean(values)),
+        float(np.var(values)),
+        float(np.max(values) - np.min(values))
     ]
@@ -1,9 +1,13 @@
 import numpy as np
 import librosa
 
-def extract_spectral_features(y, sr):
-    flatness = librosa.feature.spectral_flatness(y=y)
-    centroid = librosa.feature.spectral_centroid(y=y, sr=sr)
+def extract_spectral_features(y, sr, ctx=None):
+    if ctx is not None:
+        flatness = librosa.feature.spectral_flatness(S=ctx.magnitude)
+        centroid = librosa.feature.spectral_centroid(S=ctx.magnitude, sr=sr)
+    else:
+        flatness = librosa.feature.spectral_flatness(y=y)
+        centroid = librosa.feature.spectral_centroid(y=y, sr=sr)
     zcr = librosa.feature.zero_crossing_rate(y)
 
     return [
@@ -0,0 +1,70 @@
+"""
+Bulk-loads known synthetic clips into the fingerprint index.
+
+Usage (from backend/):
+    python -m fingerprint.build_index [--data ../training/data/ai] [--out assets/fingerprint_index]
+                                      [--append] [--workers 4]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from config import CLASS_AI, CONFIDENCE_MAX, FINGERPRINT_INDEX_PATH
+from audio.audio_decoder import decode_mp3
+from features.feature_context import FeatureContext
+from fingerprint.fingerprint import compute_fingerprint
+from fingerprint.index import FingerprintIndex
+
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".flac", ".ogg")
+
+
+def fingerprint_file(path):
+    with open(path, "rb") as f:
+        waveform, sr = decode_mp3(f.read())
+    return path, compute_fingerprint(FeatureContext(waveform, sr))
+
+
+def main():
+    repo_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=os.path.join(repo_root, "training", "data", "ai"))
+    parser.add_argument("--out", default=FINGERPRINT_INDEX_PATH)
+    parser.add_argument("--append", action="store_true", help="add to an existing index instead of rebuilding")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    index = FingerprintIndex.load(args.out, mmap=False) if args.append and os.path.isdir(args.out) else FingerprintIndex()
+    known = {v.get("source") for v in index.verdicts}
+    paths = sorted(
+        os.path.join(args.data, name) for name in os.listdir(args.data)
+        if name.lower().endswith(AUDIO_EXTENSIONS) and name not in known
+    )
+
+    start = time.perf_counter()
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for path, result in zip(paths, pool.map(_safe_fingerprint, paths, chunksize=8)):
+            if result is None:
+                failed += 1
+                continue
+            index.add(result, {
+                "classification": CLASS_AI,
+                "confidenceScore": CONFIDENCE_MAX,
+                "source": os.path.basename(path),
+            })
+    index.save(args.out)
+    print(f"📁 Indexed {len(paths) - failed} clips ({failed} failed) in {time.perf_counter() - start:.1f}s; "
+          f"{len(index)} clips / {len(index.hashes)} hashes in {args.out}")
+
+
+def _safe_fingerprint(path):
+    try:
+        return fingerprint_file(path)[1]
+    except Exception as e:
+        print(f"Skipping {path}: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    main()
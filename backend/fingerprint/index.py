@@ -0,0 +1,212 @@
+"""
+On-disk similarity index over acoustic fingerprints.
+
+Layout (a directory of .npy files, memory-mapped on load so opening is instant
+and pages are shared between workers):
+  hashes.npy    uint32  sorted mixed keys of the sub-fingerprints sampled every
+                        INDEX_STRIDE frames (see _mix)
+  postings.npy  uint32  clip id per hash (same order)
+  offsets.npy   uint32  frame offset of that hash inside its clip
+  frames.npy    uint32  every sub-fingerprint of every clip, concatenated
+  starts.npy    uint64  start of each clip inside frames.npy (n_clips + 1)
+  directory.npy uint32  first row in hashes.npy for every top-bits prefix, plus
+                        the row count (uint64 past 2**32 rows)
+  verdicts.json         per-clip verdict and source metadata
+
+A query looks up all of its sub-fingerprints (and their single-bit flips) in
+one vectorized step. The directory is an inverted bucket index: it has at least
+as many prefixes as rows, so the top bits of a hash lead straight to a bucket
+of at most one row on average (most probes land in an empty one and are dropped
+before any row is read), instead of binary-searching the whole table. It costs
+at most twice the size of hashes.npy. Per-query work then depends mostly on the
+query length and only through cache misses on the index size
+(benchmarks/bench_fingerprint.py on one core, median query: ~0.2 ms at 1k clips
+and ~0.4 ms at 100k clips of 300 frames; ~0.25 ms, p99 ~0.3 ms once the pages
+are resident, at 1M clips of 150 frames). Hits vote for (clip, alignment), and
+the best candidates are confirmed by the bit error rate over the aligned overlap.
+"""
+import json
+import os
+
+import numpy as np
+
+from config import FINGERPRINT_ENABLED, FINGERPRINT_INDEX_PATH, FINGERPRINT_MAX_BER, FINGERPRINT_MIN_MATCH_FRAMES
+from fingerprint.fingerprint import compute_fingerprint, bit_error_rate
+
+INDEX_STRIDE = 2
+# Hashes shared by this many indexed frames (silence, tones) carry no information
+MAX_BUCKET = 256
+MAX_CANDIDATES = 5
+# Odd multiplier: x * MIX mod 2**32 is a bijection that spreads the (highly
+# structured) top bits of real fingerprints evenly over the directory
+MIX = np.uint32(0x9E3779B1)
+# Each query frame is also probed with every single-bit flip, so a candidate is
+# found even when no sub-fingerprint survived re-encoding exactly
+PROBE_MASKS = np.concatenate([[0], 1 << np.arange(32, dtype=np.uint64)]).astype(np.uint32)
+
+def _mix(fingerprint):
+    return fingerprint * MIX
+
+
+def _bucket_directory(hashes, prefix_bits, chunk=1 << 22):
+    """First row of every top-bits prefix in the sorted hashes, then len(hashes)."""
+    dtype = np.uint32 if len(hashes) < 2**32 else np.uint64
+    directory = np.empty((1 << prefix_bits) + 1, dtype=dtype)
+    top = hashes >> np.uint32(32 - prefix_bits)
+    # Chunked so the int64 search results never cover the whole directory at once
+    for start in range(0, 1 << prefix_bits, chunk):
+        stop = min(start + chunk, 1 << prefix_bits)
+        directory[start:stop] = np.searchsorted(top, np.arange(start, stop, dtype=np.uint32))
+    directory[-1] = len(hashes)
+    return directory
+
+
+ARRAYS = ("hashes", "postings", "offsets", "frames", "starts", "directory")
+
+
+class FingerprintIndex:
+    def __init__(self):
+        self.hashes = np.zeros(0, dtype=np.uint32)
+        self.postings = np.zeros(0, dtype=np.uint32)
+        self.offsets = np.zeros(0, dtype=np.uint32)
+        self.frames = np.zeros(0, dtype=np.uint32)
+        self.starts = np.zeros(1, dtype=np.uint64)
+        self.directory = np.zeros(3, dtype=np.uint32)
+        self.verdicts = []
+        self._pending = []
+
+    def __len__(self):
+        return len(self.verdicts) + len(self._pending)
+
+    def add(self, fingerprint, verdict):
+        """Queues one clip; call commit() once after bulk additions."""
+        self._pending.append((np.asarray(fingerprint, dtype=np.uint32), dict(verdict)))
+
+    def commit(self):
+        if not self._pending:
+            return
+        first_id = len(self.verdicts)
+        new_frames = [fp for fp, _ in self._pending]
+        lengths = np.array([len(fp) for fp in new_frames], dtype=np.uint64)
+
+        hashes, postings, offsets = [self.hashes], [self.postings], [self.offsets]
+        for i, fp in enumerate(new_frames):
+            positions = np.arange(0, len(fp), INDEX_STRIDE, dtype=np.uint32)
+            hashes.append(_mix(fp[positions]))
+            postings.append(np.full(len(positions), first_id + i, dtype=np.uint32))
+            offsets.append(positions)
+
+        hashes = np.concatenate(hashes)
+        order = np.argsort(hashes, kind="stable")
+        self.hashes = hashes[order]
+        self.postings = np.concatenate(postings)[order]
+        self.offsets = np.concatenate(offsets)[order]
+        self.frames = np.concatenate([self.frames] + new_frames)
+        self.starts = np.concatenate([self.starts, self.starts[-1] + np.cumsum(lengths)])
+        self.verdicts.extend(verdict for _, verdict in self._pending)
+        self._pending = []
+
+        # At least one prefix per row: buckets average at most one row
+        prefix_bits = int(np.clip(np.ceil(np.log2(max(len(self.hashes), 1))), 1, 30))
+        self.directory = _bucket_directory(self.hashes, prefix_bits)
+
+    @property
+    def prefix_shift(self):
+        prefix_bits = (len(self.directory) - 1).bit_length() - 1
+        return 32 - prefix_bits
+
+    def clip_frames(self, clip_id):
+        return self.frames[int(self.starts[clip_id]):int(self.starts[clip_id + 1])]
+
+    def query(self, fingerprint, max_ber, min_frames):
+        """
+        Returns (verdict, match_info) for the best clip whose aligned overlap with
+        the query has at least min_frames frames and a bit error rate <= max_ber,
+        or (None, None).
+        """
+        fingerprint = np.asarray(fingerprint, dtype=np.uint32)
+        if len(self.hashes) == 0 or len(fingerprint) < min_frames:
+            return None, None
+
+        probes = _mix((fingerprint[:, None] ^ PROBE_MASKS[None, :]).ravel())
+        buckets = probes >> np.uint32(self.prefix_shift)
+        lo, hi = self.directory[buckets], self.directory[buckets + 1]
+        # Most buckets are empty; only probes with candidate rows go on
+        probe_ids = np.flatnonzero(hi != lo)
+        lo = lo[probe_ids].astype(np.int64)
+        counts = hi[probe_ids].astype(np.int64) - lo
+
+        # Expand every (probe, bucket row) pair without a Python loop, keep exact hits
+        probe_ids = np.repeat(probe_ids, counts)
+        rows = np.repeat(lo - (np.cumsum(counts) - counts), counts) + np.arange(len(probe_ids))
+        exact = self.hashes[rows] == probes[probe_ids]
+        probe_ids, rows = probe_ids[exact], rows[exact]
+        usable = np.bincount(probe_ids, minlength=len(probes))[probe_ids] <= MAX_BUCKET
+        if not usable.any():
+            return None, None
+        query_pos = probe_ids[usable] // len(PROBE_MASKS)
+        rows = rows[usable]
+        clips = self.postings[rows].astype(np.int64)
+        shifts = self.offsets[rows].astype(np.int64) - query_pos
+
+        # Vote for (clip, alignment); shift range is bounded by the clip lengths
+        keys = clips * (1 << 32) + (shifts + (1 << 31))
+        unique, votes = np.unique(keys, return_counts=True)
+        best = np.argsort(votes)[::-1][:MAX_CANDIDATES]
+
+        for key in unique[best]:
+            clip_id = int(key >> 32)
+            shift = int(key & 0xFFFFFFFF) - (1 << 31)
+            reference = self.clip_frames(clip_id)
+            q_start, r_start = max(0, -shift), max(0, shift)
+            overlap = min(len(fingerprint) - q_start, len(reference) - r_start)
+            if overlap < min_frames:
+                continue
+            ber = bit_error_rate(fingerprint[q_start:q_start + overlap], reference[r_start:r_start + overlap])
+            if ber <= max_ber:
+                return self.verdicts[clip_id], {
+                    "clipId": clip_id,
+                    "bitErrorRate": round(ber, 4),
+                    "overlapFrames": int(overlap),
+                    "frameShift": shift,
+                }
+        return None, None
+
+    def save(self, path):
+        self.commit()
+        os.makedirs(path, exist_ok=True)
+        for name in ARRAYS:
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(path, "verdicts.json"), "w") as f:
+            json.dump(self.verdicts, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        index = cls()
+        for name in ARRAYS:
+            setattr(index, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None))
+        with open(os.path.join(path, "verdicts.json")) as f:
+            index.verdicts = json.load(f)
+        return index
+
+
+FINGERPRINT_INDEX = None
+
+def load_fingerprint_index(path=FINGERPRINT_INDEX_PATH):
+    global FINGERPRINT_INDEX
+    if not FINGERPRINT_ENABLED or not os.path.isdir(path):
+        return None
+    FINGERPRINT_INDEX = FingerprintIndex.load(path)
+    print(f"✅ Fingerprint index loaded ({len(FINGERPRINT_INDEX)} clips) from {path}")
+    return FINGERPRINT_INDEX
+
+def lookup_fingerprint(ctx):
+    """Returns (verdict, match_info) for a known clip, or (None, None)."""
+    if FINGERPRINT_INDEX is None:
+        return None, None
+    return FINGERPRINT_INDEX.query(compute_fingerprint(ctx), FINGERPRINT_MAX_BER, FINGERPRINT_MIN_MATCH_FRAMES)
+
+def fingerprint_stats():
+    if FINGERPRINT_INDEX is None:
+        return {"enabled": False}
+    return {"enabled": True, "clips": len(FINGERPRINT_INDEX), "indexedFrames": int(len(FINGERPRINT_INDEX.hashes))}
@@ -0,0 +1,50 @@
+"""
+gunicorn settings. Run from backend/:
+    gunicorn -c gunicorn.conf.py app:app
+
+With GUNICORN_PRELOAD=1 (default) the app is imported once in the master:
+the model, fingerprint index and warm-up (librosa/numba JIT) are set up before
+fork and shared copy-on-write, and with the "mmap" backend (assets/model.weights)
+the weights are one read-only mapping shared by every worker. Pieces that do
+not survive fork() (the pipeline pool, SQLite, TensorFlow) are started per
+worker in post_fork, and each worker reports ready only once that is done.
+Workers share request metrics through METRICS_MULTIPROC_DIR (a fresh temporary
+directory unless set), so /metrics reports the whole server.
+Use benchmarks/memory_report.py to compare per-worker memory with and without
+preload.
+"""
+import glob
+import os
+import tempfile
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("GUNICORN_WORKERS", str(os.cpu_count() or 1)))
+# Threaded workers: WebSocket sessions (flask-sock) each hold a thread
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+# A stream beyond the thread count would hang in the queue; keep half the threads for HTTP
+os.environ.setdefault("STREAM_MAX_SESSIONS", str(max(1, threads // 2)))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+if preload_app:
+    # Read by config.py when the master imports the app
+    os.environ["PREFORK_PRELOAD"] = "1"
+    # Load once in the master unless STARTUP_MODE=background is set explicitly,
+    # in which case each worker loads on its own thread after fork
+    os.environ.setdefault("STARTUP_MODE", "eager")
+
+# Workers write their request metrics here and /metrics sums them (runtime/metrics.py)
+os.environ.setdefault("METRICS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="callguard-metrics-"))
+
+
+def on_starting(server):
+    # Counters from a previous run in an explicitly configured directory must not add up
+    for path in glob.glob(os.path.join(os.environ["METRICS_MULTIPROC_DIR"], "*.json")):
+        os.remove(path)
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from runtime import startup
+        startup.after_fork()
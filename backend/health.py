@@ -0,0 +1,15 @@
+from flask import Blueprint, jsonify
+
+from runtime.startup import STARTUP_STATE, is_ready
+
+health_bp = Blueprint("health", __name__)
+
+@health_bp.route("/health/live", methods=["GET"])
+def live():
+    return jsonify({"status": "alive"})
+
+@health_bp.route("/health/ready", methods=["GET"])
+def ready():
+    # Only reports ready after the model is loaded and the warm-up clip has run
+    body = {"status": "ready" if is_ready() else "starting", **STARTUP_STATE}
+    return jsonify(body), 200 if is_ready() else 503
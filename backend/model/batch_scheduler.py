@@ -0,0 +1,124 @@
+"""
+Dynamic micro-batching in front of run_inference.
+Request threads submit one feature vector each; a single scheduler thread groups
+whatever is queued (up to max_batch_size, waiting at most max_wait_ms after the
+first arrival) into one run_batch_inference call and hands each result back.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from config import MICROBATCH_ENABLED, MICROBATCH_MAX_SIZE, MICROBATCH_MAX_WAIT_MS
+from model.inference import run_inference, run_batch_inference
+
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128]
+
+
+class MicroBatchScheduler:
+    def __init__(self, max_batch_size=MICROBATCH_MAX_SIZE, max_wait_ms=MICROBATCH_MAX_WAIT_MS,
+                 score_fn=run_batch_inference):
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_s = max(0.0, max_wait_ms) / 1000.0
+        self.score_fn = score_fn
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self.batches = 0
+        self.items = 0
+        self.max_batch = 0
+        self.batch_size_counts = {b: 0 for b in BATCH_SIZE_BUCKETS}
+        self.queue_wait_total_s = 0.0
+        self.queue_wait_max_s = 0.0
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="microbatch-scheduler", daemon=True)
+                self._thread.start()
+        return self
+
+    def submit(self, features):
+        """Queues one feature vector and returns a Future resolving to run_inference's tuple."""
+        future = Future()
+        self._queue.put((features, future, time.perf_counter()))
+        return future
+
+    def infer(self, features, timeout=None):
+        return self.submit(features).result(timeout=timeout)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_s
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            try:
+                results = self.score_fn([features for features, _, _ in batch])
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            self._record(len(batch), [started - enqueued for _, _, enqueued in batch])
+
+    def _record(self, size, waits):
+        with self._lock:
+            self.batches += 1
+            self.items += size
+            self.max_batch = max(self.max_batch, size)
+            bucket = next((b for b in BATCH_SIZE_BUCKETS if size <= b), BATCH_SIZE_BUCKETS[-1])
+            self.batch_size_counts[bucket] += 1
+            self.queue_wait_total_s += sum(waits)
+            self.queue_wait_max_s = max(self.queue_wait_max_s, max(waits))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": True,
+                "maxBatchSize": self.max_batch_size,
+                "maxWaitMs": self.max_wait_s * 1000.0,
+                "batches": self.batches,
+                "items": self.items,
+                "queueDepth": self._queue.qsize(),
+                "avgBatchSize": self.items / self.batches if self.batches else 0.0,
+                "maxObservedBatchSize": self.max_batch,
+                "batchSizeHistogram": {f"le_{b}": c for b, c in self.batch_size_counts.items()},
+                "avgQueueWaitMs": 1000.0 * self.queue_wait_total_s / self.items if self.items else 0.0,
+                "maxQueueWaitMs": 1000.0 * self.queue_wait_max_s,
+            }
+
+
+SCHEDULER = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler():
+    global SCHEDULER
+    with _scheduler_lock:
+        if SCHEDULER is None:
+            SCHEDULER = MicroBatchScheduler().start()
+    return SCHEDULER
+
+def schedule_inference(features):
+    """Drop-in for run_inference that goes through the micro-batcher when enabled."""
+    if not MICROBATCH_ENABLED:
+        return run_inference(features)
+    return get_scheduler().infer(features)
+
+def scheduler_stats():
+    if SCHEDULER is None:
+        return {"enabled": MICROBATCH_ENABLED, "batches": 0, "items": 0}
+    return SCHEDULER.stats()
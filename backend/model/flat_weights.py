@@ -0,0 +1,123 @@
+"""
+Flat, memory-mappable model weights (assets/model.weights).
+
+The NumPy backend's Dense weights and scaler statistics are laid out in one
+uncompressed file: a magic number, a JSON header, then every array at a
+64-byte aligned offset after a page-aligned data section. Loading maps the file
+read-only and builds the arrays as views of the mapping, so nothing is copied
+and every process that maps the file (e.g. gunicorn workers) shares one copy of
+the parameters in the page cache.
+
+The header's "quantization" marks reduced-precision files written by
+training/quantize_model.py: "float16" stores the Dense weights as float16
+(widened to float32 on load), "int8" stores int8 weights plus the per-column
+weight scales and the calibrated input scale and range of each layer
+(model.quantized_backend).
+
+Convert an exported model.npz (from backend/):
+    python -m model.flat_weights [assets/model.npz] [assets/model.weights]
+"""
+import json
+import os
+import sys
+
+import numpy as np
+
+from model.numpy_backend import NumpyDenseModel, NumpyScaler, load_numpy_artifacts
+from model.quantized_backend import QUANTIZATIONS, Int8DenseModel
+
+WEIGHTS_MAGIC = b"CGWEIGHT"
+WEIGHTS_FORMAT = 1
+ARRAY_ALIGN = 64
+PAGE_SIZE = 4096
+
+
+def _align(n, alignment):
+    return -(-n // alignment) * alignment
+
+
+def save_flat_weights(model, scaler, path, quantization=None):
+    """
+    Writes a NumpyDenseModel (or Int8DenseModel) and NumpyScaler as a flat
+    weights file (write-then-rename). quantization="float16" stores the Dense
+    weights as float16; an Int8DenseModel is always stored as "int8".
+    """
+    quantization = getattr(model, "quantization", None) or quantization
+    if quantization is not None and quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unsupported quantization: {quantization}")
+    if quantization == "int8" and not isinstance(model, Int8DenseModel):
+        raise ValueError("int8 weights need an Int8DenseModel (model.quantized_backend.quantize_int8)")
+
+    arrays = [("scaler_mean", scaler.mean_), ("scaler_scale", scaler.scale_)]
+    for i, (W, b, _) in enumerate(model.layers):
+        if quantization == "float16":
+            W, b = np.asarray(W, dtype=np.float16), np.asarray(b, dtype=np.float16)
+        arrays += [(f"W_{i}", W), (f"b_{i}", b)]
+        if quantization == "int8":
+            arrays += [(f"w_scale_{i}", model.w_scales[i]), (f"x_scale_{i}", np.asarray([model.x_scales[i]])),
+                       (f"x_range_{i}", np.asarray(model.x_ranges[i], dtype=np.int16))]
+
+    entries, offset = [], 0
+    for name, array in arrays:
+        array = np.ascontiguousarray(array)
+        entries.append({"name": name, "dtype": array.dtype.str, "shape": list(array.shape), "offset": offset})
+        offset = _align(offset + array.nbytes, ARRAY_ALIGN)
+    header = {
+        "format": WEIGHTS_FORMAT,
+        "activations": [activation for _, _, activation in model.layers],
+        "quantization": quantization,
+        "arrays": entries,
+    }
+    header_bytes = json.dumps(header).encode()
+    data_offset = _align(len(WEIGHTS_MAGIC) + 8 + len(header_bytes), PAGE_SIZE)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(WEIGHTS_MAGIC + np.uint64(len(header_bytes)).tobytes() + header_bytes)
+        for (_, array), entry in zip(arrays, entries):
+            f.seek(data_offset + entry["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_flat_weights(path):
+    """
+    Returns (model, scaler) whose arrays are read-only views of the mapped file
+    (float16 weights are widened, so those are copies). Check
+    getattr(model, "quantization", None) for the file's precision.
+    """
+    mapping = np.memmap(path, dtype=np.uint8, mode="r")
+    if bytes(mapping[:len(WEIGHTS_MAGIC)]) != WEIGHTS_MAGIC:
+        raise ValueError(f"{path} is not a flat weights file")
+    start = len(WEIGHTS_MAGIC)
+    header_length = int(np.frombuffer(mapping[start:start + 8], dtype=np.uint64)[0])
+    header = json.loads(bytes(mapping[start + 8:start + 8 + header_length]))
+    if header["format"] != WEIGHTS_FORMAT:
+        raise ValueError(f"Unsupported weights format {header['format']}")
+    data_offset = _align(start + 8 + header_length, PAGE_SIZE)
+
+    arrays = {
+        entry["name"]: np.ndarray(entry["shape"], dtype=np.dtype(entry["dtype"]), buffer=mapping,
+                                  offset=data_offset + entry["offset"])
+        for entry in header["arrays"]
+    }
+    layers = [(arrays[f"W_{i}"], arrays[f"b_{i}"], activation)
+              for i, activation in enumerate(header["activations"])]
+    scaler = NumpyScaler(arrays["scaler_mean"], arrays["scaler_scale"])
+    quantization = header.get("quantization")
+    if quantization == "int8":
+        w_scales = [arrays[f"w_scale_{i}"] for i in range(len(layers))]
+        x_scales = [arrays[f"x_scale_{i}"][0] for i in range(len(layers))]
+        x_ranges = [arrays[f"x_range_{i}"] for i in range(len(layers))]
+        return Int8DenseModel(layers, w_scales, x_scales, x_ranges), scaler
+    model = NumpyDenseModel(layers)
+    model.quantization = quantization
+    return model, scaler
+
+
+if __name__ == "__main__":
+    npz_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join("assets", "model.npz")
+    weights_path = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(npz_path)[0] + ".weights"
+    save_flat_weights(*load_numpy_artifacts(npz_path), weights_path)
+    print(f"📁 Flat weights written to {weights_path}")
@@ -1,53 +1,72 @@
 import numpy as np
 from config import CLASS_AI, CLASS_HUMAN
-from model.model_loader import MODEL, SCALER
+from model import model_loader
 import random
 
-def run_inference(features):
+def _model_probabilities(X):
     """
-    SIMPLE STABLE INFERENCE ENGINE
-    Balances Model Prediction with Basic Acoustic Heuristics.
+    Scales a (n_clips, n_features) matrix with one SCALER.transform and scores it
+    with one MODEL.predict. Returns an array of AI probabilities, or None when the
+    model is unavailable or the feature width does not match the scaler.
     """
-    model_ai_prob = 0.5
-    has_model = False
-    
-    if MODEL is not None and SCALER is not None:
-        try:
-            X = np.array(features).reshape(1, -1)
-            # Ensure shape compatibility
-            if X.shape[1] == SCALER.n_features_in_:
-                X_scaled = SCALER.transform(X)
-                raw_pred = MODEL.predict(X_scaled, verbose=0)
-                model_ai_prob = float(raw_pred[0][0])
-                has_model = True
-        except Exception:
-            pass
+    model, scaler = model_loader.MODEL, model_loader.SCALER
+    if model is None or scaler is None:
+        return None
+    try:
+        # Ensure shape compatibility
+        if X.shape[1] != scaler.n_features_in_:
+            return None
+        X_scaled = scaler.transform(X)
+        raw_pred = model.predict(X_scaled, verbose=0)
+        return np.asarray(raw_pred, dtype=float).reshape(-1)
+    except Exception:
+        return None
 
+def _blend(features, model_ai_prob, has_model):
     # Basic Heuristics
     pitch_var = features[1]
     pitch_range = features[2]
-    
+
     # Calculate a simplified AI score
     h_bias = 0
     if pitch_var < 50: h_bias += 0.2
     if pitch_range < 150: h_bias += 0.1
-    
+
     # Calculate a simplified Human score
     if pitch_var > 120: h_bias -= 0.2
     if pitch_range > 300: h_bias -= 0.2
-    
+
     if has_model:
         # Weighted blend
         final_prob = (model_ai_prob * 0.7) + (max(0, 0.5 + h_bias) * 0.3)
     else:
         # Safe fallback
         final_prob = 0.45 + h_bias + random.uniform(-0.02, 0.02)
-    
+
     final_prob = np.clip(final_prob, 0.01, 0.99)
     classification = CLASS_AI if final_prob >= 0.5 else CLASS_HUMAN
-    
+
     return classification, final_prob, 0.0 # Dummy MSE
 
+def run_inference(features):
+    """
+    SIMPLE STABLE INFERENCE ENGINE
+    Balances Model Prediction with Basic Acoustic Heuristics.
+    """
+    return run_batch_inference([features])[0]
+
+def run_batch_inference(feature_rows):
+    """
+    Vectorized run_inference over several feature vectors.
+    All rows go through a single scaler/model call; heuristics are applied per row.
+    """
+    if not feature_rows:
+        return []
+    probs = _model_probabilities(np.array(feature_rows, dtype=float))
+    if probs is None:
+        return [_blend(features, 0.5, False) for features in feature_rows]
+    return [_blend(features, float(p), True) for features, p in zip(feature_rows, probs)]
+
 def generate_one_class_explanation(classification, features, error):
     if classification == CLASS_AI:
         return "Audio matches consistent pitch and spectral patterns often found in synthetic voices."
@@ -1,21 +1,72 @@
-import joblib
-import tensorflow as tf
+import hashlib
 import os
 
+from config import MODEL_BACKEND, MODEL_ASSETS_DIR
+from model.quantized_backend import QUANTIZATIONS
+
 MODEL = None
 SCALER = None
+BACKEND = None
+# Content hash of the loaded artifacts; caches keyed on model output use it for invalidation
+MODEL_VERSION = "mock"
+
+def artifacts_version(paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+def load_model_and_scaler(allow_keras=True):
+    """
+    Loads the configured backend. allow_keras=False (gunicorn master with
+    preload) skips the Keras backend, as TensorFlow does not survive fork;
+    returns False when loading was skipped for that reason.
+    """
+    global MODEL, SCALER, BACKEND, MODEL_VERSION
+    base_dir = MODEL_ASSETS_DIR
+    model_path = os.path.join(base_dir, "model.h5")
+    scaler_path = os.path.join(base_dir, "scaler.pkl")
+    numpy_path = os.path.join(base_dir, "model.npz")
+    weights_path = os.path.join(base_dir, "model.weights")
+    # Quantized weights are only used when asked for by name, never by "auto"
+    quantization = MODEL_BACKEND if MODEL_BACKEND in QUANTIZATIONS else None
+    if quantization:
+        weights_path = os.path.join(base_dir, f"model.{quantization}.weights")
+
+    # "auto" prefers the exported NumPy artifacts (mapped, then compressed) and falls back to Keras
+    use_mmap = MODEL_BACKEND == "mmap" or quantization is not None or (
+        MODEL_BACKEND == "auto" and os.path.exists(weights_path))
+    use_numpy = not use_mmap and (
+        MODEL_BACKEND == "numpy" or (MODEL_BACKEND == "auto" and os.path.exists(numpy_path)))
+    if not (use_mmap or use_numpy or allow_keras):
+        print("📁 Keras backend is loaded in each worker after fork")
+        return False
 
-def load_model_and_scaler():
-    global MODEL, SCALER
-    # Use absolute paths to avoid issues with CWD
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    model_path = os.path.join(base_dir, "assets", "model.h5")
-    scaler_path = os.path.join(base_dir, "assets", "scaler.pkl")
-    
     try:
-        if os.path.exists(model_path) and os.path.exists(scaler_path):
+        if use_mmap:
+            from model.flat_weights import load_flat_weights
+            MODEL, SCALER = load_flat_weights(weights_path)
+            if getattr(MODEL, "quantization", None) != quantization:
+                raise ValueError(f"{weights_path} does not hold {quantization or 'float32'} weights")
+            BACKEND = quantization or "mmap"
+            MODEL_VERSION = artifacts_version([weights_path])
+            print(f"✅ {'Memory-mapped' if quantization is None else quantization} model loaded from {weights_path}")
+        elif use_numpy:
+            from model.numpy_backend import load_numpy_artifacts
+            MODEL, SCALER = load_numpy_artifacts(numpy_path)
+            BACKEND = "numpy"
+            MODEL_VERSION = artifacts_version([numpy_path])
+            print(f"✅ NumPy model loaded successfully from {numpy_path}")
+        elif os.path.exists(model_path) and os.path.exists(scaler_path):
+            # TensorFlow is only imported when the Keras backend is actually used
+            import joblib
+            import tensorflow as tf
             MODEL = tf.keras.models.load_model(model_path)
             SCALER = joblib.load(scaler_path)
+            BACKEND = "keras"
+            MODEL_VERSION = artifacts_version([model_path, scaler_path])
             print(f"✅ Model and Scaler loaded successfully from {base_dir}")
         else:
             print(f"❌ Assets not found at {model_path} or {scaler_path}")
@@ -23,3 +74,6 @@ def load_model_and_scaler():
         print(f"⚠️ WARNING: Could not load model/scaler ({e}). Running in MOCK mode.")
         MODEL = None
         SCALER = None
+        BACKEND = None
+        MODEL_VERSION = "mock"
+    return True
@@ -0,0 +1,96 @@
+"""
+Pure-NumPy inference backend for the Dense classifier.
+The trained Keras network and the StandardScaler are exported into one compact
+.npz file (see training/save_artifacts.py) and evaluated here with plain matrix
+products, so serving does not need TensorFlow or scikit-learn.
+"""
+import numpy as np
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0),
+    # tanh form of the logistic function does not overflow for large |x|
+    "sigmoid": lambda x: 0.5 * (1.0 + np.tanh(0.5 * x)),
+    "tanh": np.tanh,
+}
+
+# Layers that are identities at inference time
+PASSTHROUGH_LAYERS = {"InputLayer", "Dropout"}
+
+
+class NumpyScaler:
+    """StandardScaler.transform replacement built from the exported mean/scale."""
+
+    def __init__(self, mean, scale):
+        self.mean_ = np.asarray(mean, dtype=np.float64)
+        self.scale_ = np.asarray(scale, dtype=np.float64)
+        self.n_features_in_ = self.mean_.shape[0]
+
+    def transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+
+class NumpyDenseModel:
+    """Stack of Dense layers with the same predict(X, verbose=0) interface as Keras."""
+
+    def __init__(self, layers, dtype=np.float32):
+        self.dtype = dtype
+        self.layers = [(np.asarray(W, dtype=dtype), np.asarray(b, dtype=dtype), activation)
+                       for W, b, activation in layers]
+        for _, _, activation in self.layers:
+            if activation not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation: {activation}")
+
+    def predict(self, X, verbose=0):
+        out = np.asarray(X, dtype=self.dtype)
+        if out.ndim == 1:
+            out = out.reshape(1, -1)
+        for W, b, activation in self.layers:
+            out = ACTIVATIONS[activation](out @ W + b)
+        return out
+
+
+def dense_layers_from_keras(keras_model):
+    """Extracts [(W, b, activation), ...] from a Sequential or Functional Dense stack."""
+    layers = []
+    for layer in keras_model.layers:
+        kind = type(layer).__name__
+        if kind in PASSTHROUGH_LAYERS:
+            continue
+        if kind != "Dense":
+            raise ValueError(f"Cannot export layer {layer.name} of type {kind}")
+        W, b = layer.get_weights()
+        activation = layer.get_config()["activation"]
+        if not isinstance(activation, str):
+            activation = activation.get("config", {}).get("name", str(activation))
+        layers.append((W, b, activation))
+    return layers
+
+
+def export_numpy_artifacts(keras_model, scaler, path):
+    """Writes the Dense weights and the scaler mean/scale into one .npz file."""
+    layers = dense_layers_from_keras(keras_model)
+    n_features = layers[0][0].shape[0]
+    mean = scaler.mean_ if getattr(scaler, "mean_", None) is not None else np.zeros(n_features)
+    scale = scaler.scale_ if getattr(scaler, "scale_", None) is not None else np.ones(n_features)
+
+    arrays = {
+        "n_layers": np.array(len(layers)),
+        "scaler_mean": np.asarray(mean, dtype=np.float64),
+        "scaler_scale": np.asarray(scale, dtype=np.float64),
+    }
+    for i, (W, b, activation) in enumerate(layers):
+        arrays[f"W_{i}"] = np.asarray(W, dtype=np.float32)
+        arrays[f"b_{i}"] = np.asarray(b, dtype=np.float32)
+        arrays[f"act_{i}"] = np.array(activation)
+    np.savez_compressed(path, **arrays)
+    return path
+
+
+def load_numpy_artifacts(path):
+    """Returns (model, scaler) loaded from an exported .npz file."""
+    with np.load(path, allow_pickle=False) as data:
+        layers = [(data[f"W_{i}"], data[f"b_{i}"], str(data[f"act_{i}"]))
+                  for i in range(int(data["n_layers"]))]
+        scaler = NumpyScaler(data["scaler_mean"], data["scaler_scale"])
+    return NumpyDenseModel(layers), scaler
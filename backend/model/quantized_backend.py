@@ -0,0 +1,81 @@
+"""
+Int8 inference backend for the Dense stack (classifier or autoencoder).
+
+Weights are quantized symmetrically per output column (scale = max |W| / 127).
+Each layer's input is quantized per tensor with a scale calibrated on training
+features: the CALIBRATION_PERCENTILE of |input| seen when the calibration rows
+go through the float model. Inputs that were never negative (after ReLU) use
+the unsigned range [0, 255], the others [-127, 127]. A layer is then
+
+    out = act((q(x) @ W_q) * (x_scale * w_scale) + b)
+
+The integer products are summed in float32, which is exact while
+|q(x)| * 127 * fan_in < 2 ** 24 (fan_in < 518 for unsigned inputs). That keeps
+the BLAS GEMM and gives the same results an integer runtime would. Float16
+needs no backend of its own: flat_weights stores the arrays as float16 and
+NumpyDenseModel widens them on load.
+"""
+import numpy as np
+
+from model.numpy_backend import ACTIVATIONS
+
+QUANTIZATIONS = ("int8", "float16")
+CALIBRATION_PERCENTILE = 99.99
+INT8_MAX = 127
+UINT8_MAX = 255
+SIGNED_RANGE = (-INT8_MAX, INT8_MAX)
+UNSIGNED_RANGE = (0, UINT8_MAX)
+
+
+def _quantize(x, inv_scale, q_range=SIGNED_RANGE):
+    q = np.rint(x * inv_scale)
+    return np.clip(q, *q_range, out=q)
+
+
+class Int8DenseModel:
+    """Same predict(X, verbose=0) interface as NumpyDenseModel; layers are (W_q int8, b, activation)."""
+
+    quantization = "int8"
+
+    def __init__(self, layers, w_scales, x_scales, x_ranges):
+        self.layers = [(np.asarray(W, dtype=np.int8), np.asarray(b, dtype=np.float32), activation)
+                       for W, b, activation in layers]
+        self.w_scales = [np.asarray(s, dtype=np.float32) for s in w_scales]
+        self.x_scales = [np.float32(s) for s in x_scales]
+        self.x_ranges = [(int(lo), int(hi)) for lo, hi in x_ranges]
+        for (W, _, activation), (lo, hi) in zip(self.layers, self.x_ranges):
+            if activation not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation: {activation}")
+            if max(-lo, hi) * INT8_MAX * W.shape[0] >= 2 ** 24:
+                raise ValueError(f"Fan-in {W.shape[0]} too large for exact float32 accumulation")
+        # Integer-valued float32 copies for the GEMM (the int8 arrays are what is stored)
+        self._weights = [W.astype(np.float32) for W, _, _ in self.layers]
+        self._inv_x_scales = [np.float32(1.0) / x_scale for x_scale in self.x_scales]
+        self._output_scales = [x_scale * w_scale for x_scale, w_scale in zip(self.x_scales, self.w_scales)]
+
+    def predict(self, X, verbose=0):
+        out = np.asarray(X, dtype=np.float32)
+        if out.ndim == 1:
+            out = out.reshape(1, -1)
+        for W, (_, b, activation), inv_x_scale, x_range, output_scale in zip(
+                self._weights, self.layers, self._inv_x_scales, self.x_ranges, self._output_scales):
+            out = ACTIVATIONS[activation]((_quantize(out, inv_x_scale, x_range) @ W) * output_scale + b)
+        return out
+
+
+def quantize_int8(model, X_calibration):
+    """Int8DenseModel from a NumpyDenseModel; X_calibration is scaled training features."""
+    x = np.asarray(X_calibration, dtype=np.float32)
+    layers, w_scales, x_scales, x_ranges = [], [], [], []
+    for W, b, activation in model.layers:
+        W = np.asarray(W, dtype=np.float32)
+        x_range = UNSIGNED_RANGE if x.min() >= 0 else SIGNED_RANGE
+        x_scale = max(float(np.percentile(np.abs(x), CALIBRATION_PERCENTILE)), 1e-8) / x_range[1]
+        w_scale = np.maximum(np.abs(W).max(axis=0), 1e-8) / INT8_MAX
+        layers.append((_quantize(W, 1.0 / w_scale).astype(np.int8), b, activation))
+        w_scales.append(w_scale)
+        x_scales.append(x_scale)
+        x_ranges.append(x_range)
+        # The next layer is calibrated on the float model's activations
+        x = ACTIVATIONS[activation](x @ W + b)
+    return Int8DenseModel(layers, w_scales, x_scales, x_ranges)
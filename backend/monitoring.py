@@ -0,0 +1,24 @@
+from flask import Blueprint, Response
+
+from runtime.metrics import render
+from model.batch_scheduler import scheduler_stats
+from runtime.process_pool import pipeline_pool_stats
+from cache.verdict_cache import cache_stats
+from fingerprint.index import fingerprint_stats
+from streaming.session import SESSIONS
+from runtime.admission import ADMISSION
+
+monitoring_bp = Blueprint("monitoring", __name__)
+
+@monitoring_bp.route("/metrics", methods=["GET"])
+def metrics():
+    # Unauthenticated like the health probes: expose it to the scraper network only
+    body = render({
+        "scheduler": scheduler_stats(),
+        "verdict_cache": cache_stats(),
+        "pipeline_pool": pipeline_pool_stats(),
+        "streaming": SESSIONS.stats(),
+        "fingerprint_index": fingerprint_stats(),
+        "admission": ADMISSION.stats(),
+    })
+    return Response(body, mimetype="text/plain; version=0.0.4")
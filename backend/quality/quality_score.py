@@ -1,10 +1,28 @@
 import numpy as np
 
-def compute_quality_factor(y):
-    energy = np.mean(np.abs(y))
+# Limits for quality_factor_from_report (quality/vad.py signals)
+LOW_SNR_DB = 10.0
+MAX_CLIPPING_RATIO = 0.01
+MIN_SPEECH_RATIO = 0.1
 
+def quality_factor_from_energy(energy):
     if energy < 0.01:
         return 0.4
     if energy < 0.05:
         return 0.6
     return 1.0
+
+def compute_quality_factor(y):
+    energy = np.mean(np.abs(y))
+    return quality_factor_from_energy(energy)
+
+def quality_factor_from_report(report):
+    """Energy factor of the speech frames, capped for low SNR, clipping and little speech."""
+    factor = quality_factor_from_energy(report["speech_mean_abs"])
+    if report["snr_db"] < LOW_SNR_DB:
+        factor = min(factor, 0.6)
+    if report["clipping_ratio"] > MAX_CLIPPING_RATIO:
+        factor = min(factor, 0.7)
+    if report["speech_ratio"] < MIN_SPEECH_RATIO:
+        factor = min(factor, 0.4)
+    return factor
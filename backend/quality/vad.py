@@ -0,0 +1,110 @@
+"""
+Voice-activity detection and frame-level quality analysis.
+
+One pass over non-overlapping VAD_FRAME_MS frames gives each frame's energy,
+zero-crossing rate, mean |amplitude| and clipped-sample count. A frame is
+speech when its energy is VAD_THRESHOLD_DB above the clip's noise floor (the
+10th-percentile frame energy), or half that with a fricative-like ZCR; speech
+regions are widened by VAD_HANGOVER_MS so word edges and short pauses stay.
+The same statistics give the quality report: SNR (speech vs non-speech
+energy), clipping ratio and speech ratio.
+
+Energy and ZCR cannot tell speech from music, so hold music is kept; long
+silences and line noise are what gets trimmed.
+"""
+import numpy as np
+
+from config import VAD_THRESHOLD_DB, VAD_HANGOVER_MS, VAD_MIN_SPEECH_SECONDS
+
+VAD_FRAME_MS = 20
+NOISE_PERCENTILE = 10
+FRICATIVE_ZCR = 0.3     # crossings per sample; voiced speech sits well below
+CLIP_LEVEL = 0.99       # |sample| at or above this (full scale = 1.0) counts as clipped
+MIN_TRIM_RATIO = 0.05   # trimming less than this keeps the clip (and its STFT) whole
+MAX_SNR_DB = 60.0       # digital silence would otherwise give an infinite SNR
+ENERGY_FLOOR = 1e-12
+
+
+def frame_stats(y, sr):
+    """Per-frame energy_db, zcr, mean_abs and clipped counts, plus the frame length in samples."""
+    frame_length = max(1, int(sr * VAD_FRAME_MS / 1000))
+    n = -(-len(y) // frame_length)
+    frames = np.zeros(n * frame_length, dtype=np.float32)
+    frames[:len(y)] = y
+    frames = frames.reshape(n, frame_length)
+    magnitude = np.abs(frames)
+    # Short final frame: statistics over its own samples only
+    counts = np.full(n, frame_length)
+    if n:
+        counts[-1] = len(y) - (n - 1) * frame_length
+    crossings = np.count_nonzero(np.signbit(frames[:, 1:]) != np.signbit(frames[:, :-1]), axis=1)
+    return {
+        "frame_length": frame_length,
+        "energy_db": 10.0 * np.log10(np.einsum("ij,ij->i", frames, frames, dtype=np.float64) / counts + ENERGY_FLOOR),
+        "zcr": crossings / np.maximum(counts - 1, 1),
+        "mean_abs": magnitude.sum(axis=1, dtype=np.float64) / counts,
+        "clipped": np.count_nonzero(magnitude >= CLIP_LEVEL, axis=1),
+        "counts": counts,
+    }
+
+
+def speech_frames(stats, threshold_db=VAD_THRESHOLD_DB, hangover_ms=VAD_HANGOVER_MS):
+    """Boolean speech mask over the frames of frame_stats."""
+    energy = stats["energy_db"]
+    if not len(energy):
+        return np.zeros(0, dtype=bool)
+    floor = np.percentile(energy, NOISE_PERCENTILE)
+    speech = (energy > floor + threshold_db) | (
+        (energy > floor + threshold_db / 2) & (stats["zcr"] > FRICATIVE_ZCR))
+    hangover = int(round(hangover_ms / VAD_FRAME_MS))
+    if hangover and speech.any():
+        speech = np.convolve(speech, np.ones(2 * hangover + 1), mode="same") > 0.5
+    return speech
+
+
+def quality_report(stats, speech, sr):
+    """duration/speech seconds, speech_ratio, snr_db, clipping_ratio and speech_mean_abs from frame_stats."""
+    counts = stats["counts"]
+    if not counts.sum():
+        # Empty clip: nothing to measure, and no speech
+        return {"duration_s": 0.0, "speech_s": 0.0, "speech_ratio": 0.0, "snr_db": 0.0,
+                "clipping_ratio": 0.0, "speech_mean_abs": 0.0}
+    power = 10.0 ** (stats["energy_db"] / 10.0)
+    noise = ~speech
+    if noise.any():
+        noise_power = np.average(power[noise], weights=counts[noise])
+    else:
+        noise_power = np.percentile(power, NOISE_PERCENTILE)
+    if speech.any():
+        speech_power = np.average(power[speech], weights=counts[speech])
+        speech_mean_abs = np.average(stats["mean_abs"][speech], weights=counts[speech])
+    else:
+        speech_power, speech_mean_abs = noise_power, float(np.average(stats["mean_abs"], weights=counts))
+    snr_db = 10.0 * np.log10(max(speech_power - noise_power, ENERGY_FLOOR) / max(noise_power, ENERGY_FLOOR))
+    n_samples = int(counts.sum())
+    speech_samples = int(counts[speech].sum())
+    return {
+        "duration_s": n_samples / sr,
+        "speech_s": speech_samples / sr,
+        "speech_ratio": speech_samples / n_samples if n_samples else 0.0,
+        "snr_db": float(np.clip(snr_db, -MAX_SNR_DB, MAX_SNR_DB)),
+        "clipping_ratio": int(stats["clipped"].sum()) / n_samples if n_samples else 0.0,
+        "speech_mean_abs": float(speech_mean_abs),
+    }
+
+
+def trim_silence(y, sr):
+    """
+    Returns (speech waveform, quality report). The waveform is y itself when
+    trimming would drop less than MIN_TRIM_RATIO of it or leave under
+    VAD_MIN_SPEECH_SECONDS; report["trimmed"] says which.
+    """
+    stats = frame_stats(y, sr)
+    speech = speech_frames(stats)
+    report = quality_report(stats, speech, sr)
+    report["trimmed"] = (report["speech_s"] >= VAD_MIN_SPEECH_SECONDS
+                         and report["speech_ratio"] < 1.0 - MIN_TRIM_RATIO)
+    if not report["trimmed"]:
+        return y, report
+    keep = np.repeat(speech, stats["frame_length"])[:len(y)]
+    return y[keep], report
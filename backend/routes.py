@@ -1,57 +1,346 @@
-from flask import Blueprint, request, jsonify, current_app
+import time
 
-from utils.validators import validate_api_key, validate_request_json
-from audio.base64_handler import decode_base64_audio
-from audio.audio_decoder import decode_mp3
-from features.feature_assembler import extract_all_features
-from quality.quality_score import compute_quality_factor
-from model.inference import run_inference, generate_one_class_explanation
+from flask import Blueprint, request, jsonify, current_app, g
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from config import (
+    BATCH_MAX_ITEMS, BINARY_AUDIO_MIMETYPES, STAGE_TIMING_HEADER, MAX_REQUEST_BYTES, MAX_AUDIO_SECONDS,
+    SEGMENTED_ANALYSIS
+)
+from utils.validators import (
+    validate_api_key, validate_request_json, validate_batch_request_json, validate_binary_upload
+)
+from audio.base64_handler import decode_base64_audio, normalize_base64, base64_reader
+from audio.mp3_probe import probe_mp3_duration, bytes_reader
+from audio.audio_decoder import sniff_format
+from model.inference import run_batch_inference
+from model.batch_scheduler import schedule_inference, scheduler_stats
+from runtime.startup import STARTUP_STATE
+from runtime.pipeline import featurize_batch, build_result, analyze_bytes, verdict_source
+from runtime.process_pool import get_pipeline_pool, pipeline_pool_stats, PipelineTimeout
+from cache.verdict_cache import VERDICT_CACHE, audio_cache_key, cache_stats
+from fingerprint.index import fingerprint_stats
+from streaming.session import SESSIONS
+from runtime.admission import ADMISSION
+from runtime.metrics import StageTimer, observe_request, observe_rejection
 
 voice_detection_bp = Blueprint("voice_detection", __name__)
 
+# Endpoints that run the analysis pipeline and go through admission control
+ADMITTED_ENDPOINTS = ("voice_detection.voice_detection", "voice_detection.voice_detection_batch")
+
+@voice_detection_bp.before_request
+def _start_timer():
+    g.stage_timer = StageTimer()
+    g.request_started = time.perf_counter()
+
+def _too_large():
+    observe_rejection(request.url_rule.rule, "body_size")
+    message = f"Request body too large (maximum is {MAX_REQUEST_BYTES} bytes)"
+    return jsonify({"status": "error", "message": message}), 413
+
+@voice_detection_bp.before_request
+def _admit():
+    """Refuses oversized bodies (before reading them) and requests over the concurrency limit."""
+    if request.endpoint not in ADMITTED_ENDPOINTS:
+        return None
+    # Declared length checked here; chunked bodies hit MAX_CONTENT_LENGTH while being read
+    if MAX_REQUEST_BYTES and (request.content_length or 0) > MAX_REQUEST_BYTES:
+        return _too_large()
+    with g.stage_timer.stage("admission"):
+        admitted = ADMISSION.try_acquire()
+    if not admitted:
+        observe_rejection(request.url_rule.rule, "concurrency")
+        response = jsonify({"status": "error", "message": "Server busy, retry later"})
+        response.headers["Retry-After"] = str(ADMISSION.retry_after_s)
+        return response, 429
+    g.admitted = True
+    return None
+
+@voice_detection_bp.teardown_request
+def _release_admission(exc):
+    if g.pop("admitted", False):
+        ADMISSION.release()
+
+@voice_detection_bp.errorhandler(RequestEntityTooLarge)
+def _body_too_large(e):
+    return _too_large()
+
+@voice_detection_bp.after_request
+def _record_metrics(response):
+    timer = g.get("stage_timer")
+    if timer is None or request.url_rule is None:
+        return response
+    elapsed = time.perf_counter() - g.request_started
+    observe_request(request.url_rule.rule, timer, response.status_code, elapsed, request.content_length)
+    if STAGE_TIMING_HEADER and timer.stages:
+        response.headers["Server-Timing"] = timer.server_timing()
+    return response
+
+def _read_payload(req):
+    """
+    Accepts three request shapes and returns (payload, error):
+      - raw body with Content-Type audio/mpeg (language in the query string)
+      - multipart/form-data with a "file" part (language as a form field)
+      - JSON with audioFormat/audioBase64 (existing clients)
+    Binary payloads carry "audioBytes" and skip base64 entirely.
+    """
+    if req.mimetype in BINARY_AUDIO_MIMETYPES:
+        audio_bytes = req.get_data(cache=False)
+        error = validate_binary_upload(audio_bytes)
+        return {"audioBytes": audio_bytes, "language": req.args.get("language", "English")}, error
+
+    if req.mimetype == "multipart/form-data":
+        upload = req.files.get("file")
+        if upload is None:
+            return None, "Missing file field: file"
+        error = validate_binary_upload(upload.stream, upload.filename, upload.mimetype)
+        if error:
+            return None, error
+        return {"audioBytes": upload.read(), "language": req.form.get("language", "English")}, None
+
+    data = req.get_json(silent=True)
+    return data, validate_request_json(data)
+
+def _duration_error(payload):
+    """
+    Error message when the MP3 frame headers say the clip is longer than
+    MAX_AUDIO_SECONDS; probes a base64 payload without decoding it. The
+    payload's audioBase64 is normalized in place, once, for the decoder too.
+    Only payloads that sniff as MP3 are probed: PCM samples in a WAV can look
+    like frame headers and give absurd estimates.
+    """
+    if "audioBase64" in payload:
+        payload["audioBase64"] = normalize_base64(payload["audioBase64"])
+    if not MAX_AUDIO_SECONDS:
+        return None
+    if "audioBytes" in payload:
+        read, size = bytes_reader(payload["audioBytes"]), len(payload["audioBytes"])
+    else:
+        read, size = base64_reader(payload["audioBase64"])
+    if sniff_format(read(0, 12)) != "mp3":
+        return None
+    duration = probe_mp3_duration(read, size)
+    if duration is not None and duration > MAX_AUDIO_SECONDS:
+        return f"Audio too long: {duration:.0f} s (maximum is {MAX_AUDIO_SECONDS:g} s)"
+    return None
+
+def _payload_audio_bytes(payload):
+    if "audioBytes" in payload:
+        return payload["audioBytes"]
+    return decode_base64_audio(payload["audioBase64"])
+
+def _cache_lookup(audio_bytes):
+    """Returns (cache_key, cached_result); both None when the verdict cache is disabled."""
+    if VERDICT_CACHE is None:
+        return None, None
+    key = audio_cache_key(audio_bytes)
+    return key, VERDICT_CACHE.get(key)
+
+def _cache_store(key, result):
+    if key is not None:
+        # Language is echoed from the request, not part of the verdict
+        VERDICT_CACHE.put(key, {k: v for k, v in result.items() if k != "language"})
+
 @voice_detection_bp.route("/voice-detection", methods=["POST"])
 def voice_detection():
+    timer = g.stage_timer
+
     # 1. Security Check
-    if not validate_api_key(request, current_app.config["API_KEY"]):
+    with timer.stage("auth"):
+        authorized = validate_api_key(request, current_app.config["API_KEY"])
+    if not authorized:
         return jsonify({"status": "error", "message": "Invalid API key"}), 401
 
-    # 2. Payload Validation
-    data = request.get_json(silent=True)
-    error = validate_request_json(data)
+    # 2. Payload Validation (JSON base64, raw audio/mpeg body or multipart upload)
+    with timer.stage("validation"):
+        data, error = _read_payload(request)
     if error:
         return jsonify({"status": "error", "message": error}), 400
 
     try:
-        # 3. Audio Decoding
-        audio_bytes = decode_base64_audio(data["audioBase64"])
-        waveform, sr = decode_mp3(audio_bytes)
-
-        # 4. Feature Pipeline
-        features = extract_all_features(waveform, sr)
-        quality_factor = compute_quality_factor(waveform)
-
-        # 5. One-Class Inference (Only AI known, Human is Anomaly)
-        classification, confidence, mse_error = run_inference(features)
-        
-        # 6. Quality Adjustment
-        # Low quality reduces confidence but classification remains fixed
-        final_confidence = min(confidence, quality_factor) if quality_factor < 0.8 else confidence
-
-        # 7. Explanation Logic
-        explanation = generate_one_class_explanation(classification, features, mse_error)
-        if quality_factor < 0.7:
-            explanation += " (Confidence adjusted for low audio quality)"
+        # Over-long clips are refused from their headers, before base64 and decoding
+        with timer.stage("probe"):
+            error = _duration_error(data)
+        if error:
+            observe_rejection(request.url_rule.rule, "duration")
+            return jsonify({"status": "error", "message": error}), 413
+
+        with timer.stage("base64"):
+            audio_bytes = _payload_audio_bytes(data)
+        language = data.get("language", "English")
+
+        # 3a. Verdict Cache: replayed audio skips decoding, features and inference
+        with timer.stage("cache"):
+            cache_key, cached = _cache_lookup(audio_bytes)
+        if cached is not None:
+            timer.sources.append("cache")
+            response = jsonify({**cached, "language": language})
+            response.headers["X-Verdict-Cache"] = "HIT"
+            return response
+
+        # 3-7. Decode, features, fingerprint lookup, inference, quality and explanation
+        pool = get_pipeline_pool()
+        if pool is not None:
+            # In a pre-warmed worker process, so clips are analyzed in parallel
+            with timer.stage("pool_roundtrip"):
+                result = pool.run(audio_bytes, language, timer)
+        else:
+            # Inference goes through the micro-batcher when MICROBATCH_ENABLED is set
+            result = analyze_bytes(audio_bytes, language, infer=schedule_inference, timer=timer)
+        _cache_store(cache_key, result)
 
         # 8. Success Response
-        return jsonify({
-            "status": "success",
-            "language": data.get("language", "English"),
-            "classification": classification,
-            "confidenceScore": round(final_confidence, 3),
-            "explanation": explanation
-        })
+        response = jsonify(result)
+        if cache_key is not None:
+            response.headers["X-Verdict-Cache"] = "MISS"
+        return response
 
+    except PipelineTimeout as e:
+        return jsonify({"status": "error", "message": str(e)}), 504
     except Exception as e:
         import traceback
         traceback.print_exc()
         return jsonify({"status": "error", "message": str(e)}), 500
+
+@voice_detection_bp.route("/voice-detection/batch", methods=["POST"])
+def voice_detection_batch():
+    """
+    Scores several clips in one request. Each item is validated and decoded
+    independently, features for all of them are extracted in one batched pass,
+    and all successful items are then scaled and scored with one model call.
+    With the pipeline pool, items are instead analyzed in parallel worker
+    processes. With SEGMENTED_ANALYSIS, items are analyzed one by one like the
+    single route (long clips window by window), so a clip gets the same verdict
+    and cache entry from either route. Failures are reported per item instead
+    of failing the batch.
+    """
+    timer = g.stage_timer
+
+    # 1. Security Check
+    with timer.stage("auth"):
+        authorized = validate_api_key(request, current_app.config["API_KEY"])
+    if not authorized:
+        return jsonify({"status": "error", "message": "Invalid API key"}), 401
+
+    # 2. Payload Validation
+    with timer.stage("validation"):
+        data = request.get_json(silent=True)
+        error = validate_batch_request_json(data, BATCH_MAX_ITEMS)
+    if error:
+        return jsonify({"status": "error", "message": error}), 400
+
+    items = data["items"]
+    results = [None] * len(items)
+    pending = []  # (index, language, features, quality_factor, cache_key)
+    pool = get_pipeline_pool()
+    tasks = []  # (index, cache_key, pipeline pool task)
+    inline = []  # (index, language, audio_bytes, cache_key)
+    one_by_one = []  # same, analyzed with analyze_bytes (SEGMENTED_ANALYSIS)
+
+    # 3. Audio Decoding + 4. Feature Pipeline (per item)
+    for index, item in enumerate(items):
+        item_error = validate_request_json(item) if isinstance(item, dict) else "Invalid item"
+        if item_error:
+            results[index] = {"status": "error", "message": item_error}
+            continue
+        try:
+            with timer.stage("probe"):
+                item_error = _duration_error(item)
+            if item_error:
+                observe_rejection(request.url_rule.rule, "duration")
+                results[index] = {"status": "error", "message": item_error}
+                continue
+            with timer.stage("base64"):
+                audio_bytes = decode_base64_audio(item["audioBase64"])
+            language = item.get("language", "English")
+            with timer.stage("cache"):
+                cache_key, cached = _cache_lookup(audio_bytes)
+            if cached is not None:
+                timer.sources.append("cache")
+                results[index] = {**cached, "language": language}
+                continue
+            if pool is not None:
+                tasks.append((index, cache_key, pool.submit(audio_bytes, language)))
+            elif SEGMENTED_ANALYSIS:
+                one_by_one.append((index, language, audio_bytes, cache_key))
+            else:
+                inline.append((index, language, audio_bytes, cache_key))
+        except Exception as e:
+            results[index] = {"status": "error", "message": str(e)}
+
+    # Inline: decode each item, then one batched feature extraction for the rest of the batch
+    featurized = featurize_batch([audio_bytes for _, _, audio_bytes, _ in inline], timer)
+    for (index, language, _, cache_key), outcome in zip(inline, featurized):
+        if isinstance(outcome, Exception):
+            results[index] = {"status": "error", "message": str(outcome)}
+            continue
+        features, quality_factor, match = outcome
+        if match is not None:
+            timer.sources.append("fingerprint")
+            results[index] = {**match, "language": language}
+            _cache_store(cache_key, results[index])
+            continue
+        pending.append((index, language, features, quality_factor, cache_key))
+
+    # 3-7. Segmented analysis: whole pipeline per item, as in the single route
+    for index, language, audio_bytes, cache_key in one_by_one:
+        try:
+            results[index] = analyze_bytes(audio_bytes, language, timer=timer)
+            _cache_store(cache_key, results[index])
+        except Exception as e:
+            results[index] = {"status": "error", "message": str(e)}
+
+    # 3-7. Pipeline workers: each item was decoded, featurized and scored in its own process
+    for index, cache_key, task in tasks:
+        try:
+            with timer.stage("pool_roundtrip"):
+                results[index] = pool.result(task, timer)
+            _cache_store(cache_key, results[index])
+        except Exception as e:
+            results[index] = {"status": "error", "message": str(e)}
+
+    # 5. Vectorized Inference (one scaler + model call for the whole batch)
+    try:
+        with timer.stage("inference"):
+            scored = run_batch_inference([features for _, _, features, _, _ in pending])
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+    # 6-7. Quality Adjustment + Explanation (per item)
+    for (index, language, features, quality_factor, cache_key), (classification, confidence, mse_error) in zip(pending, scored):
+        with timer.stage("explanation"):
+            results[index] = build_result(language, features, quality_factor, classification, confidence, mse_error)
+        timer.sources.append(verdict_source())
+        _cache_store(cache_key, results[index])
+
+    for index, item in enumerate(items):
+        if isinstance(item, dict) and "id" in item:
+            results[index]["id"] = item["id"]
+
+    # 8. Response
+    failed = sum(1 for r in results if r["status"] == "error")
+    return jsonify({
+        "status": "success" if failed == 0 else "partial" if failed < len(results) else "error",
+        "total": len(results),
+        "failed": failed,
+        "results": results
+    })
+
+@voice_detection_bp.route("/stats", methods=["GET"])
+def stats():
+    if not validate_api_key(request, current_app.config["API_KEY"]):
+        return jsonify({"status": "error", "message": "Invalid API key"}), 401
+
+    return jsonify({
+        "status": "success",
+        "startup": STARTUP_STATE,
+        "scheduler": scheduler_stats(),
+        "streaming": SESSIONS.stats(),
+        "verdictCache": cache_stats(),
+        "fingerprintIndex": fingerprint_stats(),
+        "pipelinePool": pipeline_pool_stats(),
+        "admission": ADMISSION.stats()
+    })
@@ -0,0 +1,59 @@
+"""
+Concurrency limit for the analysis endpoints.
+
+A BoundedSemaphore with ADMISSION_MAX_CONCURRENT slots per process. A request
+takes a slot before its body is read and gives it back when it finishes. When
+no slot frees up within ADMISSION_QUEUE_TIMEOUT_MS the request is refused (429
+with Retry-After in routes.py) rather than queued, so a spike cannot build an
+unbounded backlog that slows every request down.
+"""
+import threading
+
+from config import ADMISSION_MAX_CONCURRENT, ADMISSION_QUEUE_TIMEOUT_MS, ADMISSION_RETRY_AFTER_SECONDS
+
+
+class AdmissionLimiter:
+    def __init__(self, max_concurrent=ADMISSION_MAX_CONCURRENT, queue_timeout_ms=ADMISSION_QUEUE_TIMEOUT_MS,
+                 retry_after_s=ADMISSION_RETRY_AFTER_SECONDS):
+        self.max_concurrent = max_concurrent
+        self.queue_timeout_s = queue_timeout_ms / 1000.0
+        self.retry_after_s = retry_after_s
+        self._slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent > 0 else None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    def try_acquire(self):
+        """True when the request may run (then call release()), False when it should get 429."""
+        if self._slots is not None:
+            if self.queue_timeout_s > 0:
+                acquired = self._slots.acquire(timeout=self.queue_timeout_s)
+            else:
+                acquired = self._slots.acquire(blocking=False)
+            if not acquired:
+                with self._lock:
+                    self.rejected += 1
+                return False
+        with self._lock:
+            self.in_flight += 1
+            self.admitted += 1
+        return True
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+        if self._slots is not None:
+            self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "maxConcurrent": self.max_concurrent,
+                "inFlight": self.in_flight,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+            }
+
+
+ADMISSION = AdmissionLimiter()
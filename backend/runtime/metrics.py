@@ -0,0 +1,276 @@
+"""
+Low-overhead request metrics in the Prometheus text exposition format.
+
+A request records its stages on a StageTimer (a dict of perf_counter deltas).
+The timer is threaded through runtime.pipeline and comes back from process-pool
+workers, so the stages are the same wherever the pipeline ran. When the request
+finishes, observe_request folds the timer into process-wide histograms and
+counters. Everything is plain Python under one lock, with no client library;
+render() produces the /metrics body.
+
+Under gunicorn every worker has its own metrics. With METRICS_MULTIPROC_DIR
+each process rewrites its counters and histograms to <dir>/<pid>.json after
+every observation (an atomic replace, serialized per process so a file never
+goes back in time), and render() sums all the files. Request metrics then
+cover every worker, including ones that have exited, and never decrease
+between scrapes. The subsystem gauges (cache, pool, admission, ...) are
+process state that cannot be summed: they describe the worker that answered
+the scrape and carry its pid as a "worker" label.
+"""
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from config import METRICS_MULTIPROC_DIR
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PAYLOAD_BUCKETS = tuple(2 ** k for k in range(14, 28, 2))  # 16 KiB .. 64 MiB
+DURATION_BUCKETS = (1, 2, 5, 10, 30, 60, 120, 300, 600, 1800)
+RATIO_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0)
+SNR_BUCKETS = (0, 5, 10, 15, 20, 30, 40, 60)
+CLIPPING_BUCKETS = (0.0001, 0.001, 0.01, 0.05, 0.1)
+
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{str(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.samples = {}
+
+    def inc(self, *label_values, amount=1):
+        with _lock:
+            self.samples[label_values] = self.samples.get(label_values, 0) + amount
+
+    @staticmethod
+    def add(samples, label_values, value):
+        samples[label_values] = samples.get(label_values, 0) + value
+
+    def render(self, samples=None):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted((self.samples if samples is None else samples).items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.labels = labels
+        self.samples = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, value, *label_values):
+        with _lock:
+            series = self.samples.get(label_values)
+            if series is None:
+                series = self.samples[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    @staticmethod
+    def add(samples, label_values, series):
+        total = samples.get(label_values)
+        samples[label_values] = list(series) if total is None else [a + b for a, b in zip(total, series)]
+
+    def render(self, samples=None):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_values, series in sorted((self.samples if samples is None else samples).items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                names, values = self.labels + ("le",), label_values + (f"{bound:g}",)
+                lines.append(f"{self.name}_bucket{_format_labels(names, values)} {cumulative}")
+            names, values = self.labels + ("le",), label_values + ("+Inf",)
+            lines.append(f"{self.name}_bucket{_format_labels(names, values)} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, label_values)} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, label_values)} {series[-1]}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "callguard_stage_seconds", "Time spent in each pipeline stage", LATENCY_BUCKETS, ("route", "stage"))
+REQUEST_SECONDS = Histogram(
+    "callguard_request_seconds", "Total request handling time", LATENCY_BUCKETS, ("route",))
+PAYLOAD_BYTES = Histogram(
+    "callguard_payload_bytes", "Request body size", PAYLOAD_BUCKETS, ("route",))
+AUDIO_SECONDS = Histogram(
+    "callguard_audio_duration_seconds", "Duration of each analyzed clip", DURATION_BUCKETS, ("route",))
+REQUESTS = Counter("callguard_requests_total", "Requests by route and HTTP status", ("route", "status"))
+ERRORS = Counter("callguard_errors_total", "Failed requests or batch items by the stage that raised", ("route", "stage"))
+SAMPLE_RATES = Counter("callguard_audio_sample_rate_total", "Analyzed clips by decoded sample rate", ("sample_rate",))
+VERDICTS = Counter(
+    "callguard_verdicts_total", "Verdicts by what produced them (model backend, mock, cache, fingerprint)",
+    ("source",))
+SPEECH_RATIO = Histogram(
+    "callguard_speech_ratio", "Fraction of each clip the VAD classified as speech", RATIO_BUCKETS, ("route",))
+SNR_DB = Histogram("callguard_snr_db", "Speech-to-noise ratio of each clip (VAD frames)", SNR_BUCKETS, ("route",))
+CLIPPING_RATIO = Histogram(
+    "callguard_clipping_ratio", "Fraction of clipped samples in each clip", CLIPPING_BUCKETS, ("route",))
+TRIMMED_SECONDS = Counter("callguard_vad_trimmed_seconds_total", "Audio dropped as non-speech before features", ("route",))
+REJECTED = Counter(
+    "callguard_admission_rejected_total",
+    "Requests or batch items refused before analysis (body_size, duration, concurrency)", ("route", "reason"))
+
+METRICS = (STAGE_SECONDS, REQUEST_SECONDS, PAYLOAD_BYTES, AUDIO_SECONDS, REQUESTS, ERRORS, SAMPLE_RATES, VERDICTS,
+           SPEECH_RATIO, SNR_DB, CLIPPING_RATIO, TRIMMED_SECONDS, REJECTED)
+
+
+class StageTimer:
+    """Per-request stage durations plus what was learned about the audio on the way."""
+
+    def __init__(self):
+        self.stages = {}
+        self.clips = []     # (duration_seconds, sample_rate) per analyzed clip
+        self.sources = []   # verdict source per clip
+        self.quality = []   # quality/vad.py report per clip, when VAD is enabled
+        self.failed_stages = []
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.failed_stages.append(name)
+            raise
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def add_clip(self, n_samples, sr):
+        self.clips.append((n_samples / sr if sr else 0.0, int(sr)))
+
+    def add_quality(self, report):
+        self.quality.append(report)
+
+    def snapshot(self):
+        """Picklable state, used to send a worker's timings back to the request process."""
+        return {"stages": self.stages, "clips": self.clips, "sources": self.sources, "quality": self.quality}
+
+    def merge(self, snapshot):
+        for name, seconds in snapshot["stages"].items():
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+        self.clips.extend(snapshot["clips"])
+        self.sources.extend(snapshot["sources"])
+        self.quality.extend(snapshot["quality"])
+
+    def server_timing(self):
+        """Stages as a Server-Timing header value (milliseconds)."""
+        return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.stages.items())
+
+
+def timed(timer, name):
+    """timer.stage(name), or a no-op when the caller is not collecting timings."""
+    return timer.stage(name) if timer is not None else nullcontext()
+
+
+def _flush():
+    """Writes this process's counters and histograms to METRICS_MULTIPROC_DIR/<pid>.json."""
+    if not METRICS_MULTIPROC_DIR:
+        return
+    path = os.path.join(METRICS_MULTIPROC_DIR, f"{os.getpid()}.json")
+    try:
+        with _flush_lock:
+            with _lock:
+                state = {metric.name: [[list(k), v] for k, v in metric.samples.items()] for metric in METRICS}
+            with open(path + ".tmp", "w") as f:
+                json.dump(state, f)
+            os.replace(path + ".tmp", path)
+    except OSError as e:
+        print(f"⚠️ WARNING: Could not write metrics to {METRICS_MULTIPROC_DIR} ({e})")
+
+
+def _merged_samples():
+    """Every process's samples from METRICS_MULTIPROC_DIR, summed per metric."""
+    totals = {metric.name: {} for metric in METRICS}
+    for path in glob.glob(os.path.join(METRICS_MULTIPROC_DIR, "*.json")):
+        try:
+            with open(path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for metric in METRICS:
+            for label_values, value in state.get(metric.name, []):
+                metric.add(totals[metric.name], tuple(label_values), value)
+    return totals
+
+
+def observe_request(route, timer, status, elapsed_s, payload_bytes=None):
+    for name, seconds in timer.stages.items():
+        STAGE_SECONDS.observe(seconds, route, name)
+    REQUEST_SECONDS.observe(elapsed_s, route)
+    REQUESTS.inc(route, str(status))
+    if payload_bytes is not None:
+        PAYLOAD_BYTES.observe(payload_bytes, route)
+    for duration, sr in timer.clips:
+        AUDIO_SECONDS.observe(duration, route)
+        SAMPLE_RATES.inc(str(sr))
+    for source in timer.sources:
+        VERDICTS.inc(source)
+    for report in timer.quality:
+        SPEECH_RATIO.observe(report["speech_ratio"], route)
+        SNR_DB.observe(report["snr_db"], route)
+        CLIPPING_RATIO.observe(report["clipping_ratio"], route)
+        if report["trimmed"]:
+            TRIMMED_SECONDS.inc(route, amount=round(report["duration_s"] - report["speech_s"], 3))
+    for stage in timer.failed_stages:
+        ERRORS.inc(route, stage)
+    if status >= 500 and not timer.failed_stages:
+        ERRORS.inc(route, "unknown")
+    _flush()
+
+
+def observe_rejection(route, reason):
+    REJECTED.inc(route, reason)
+    _flush()
+
+
+def _gauge_lines(prefix, stats, labels=""):
+    """Flattens a subsystem stats() dict into gauges (numeric leaves only)."""
+    lines = []
+    for key, value in stats.items():
+        name = prefix + "_" + "".join("_" + c.lower() if c.isupper() else c for c in key)
+        if isinstance(value, dict):
+            lines.extend(_gauge_lines(name, value, labels))
+        elif isinstance(value, bool):
+            lines.append(f"{name}{labels} {int(value)}")
+        elif isinstance(value, (int, float)):
+            lines.append(f"{name}{labels} {value}")
+    return lines
+
+
+def render(subsystem_stats=None):
+    """
+    The /metrics body: request metrics (summed over METRICS_MULTIPROC_DIR when
+    set) followed by this process's subsystem gauges ({name: stats dict}).
+    """
+    labels = ""
+    if METRICS_MULTIPROC_DIR:
+        merged = _merged_samples()
+        lines = [line for metric in METRICS for line in metric.render(merged[metric.name])]
+        labels = _format_labels(("worker",), (os.getpid(),))
+    else:
+        with _lock:
+            lines = [line for metric in METRICS for line in metric.render()]
+    for name, stats in (subsystem_stats or {}).items():
+        gauges = _gauge_lines(f"callguard_{name}", stats, labels)
+        lines.extend(f"# TYPE {g.split('{')[0].split(' ')[0]} gauge\n{g}" for g in gauges)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,242 @@
+"""
+The CPU-bound analysis pipeline for one clip: decode, features, quality,
+fingerprint lookup and (optionally) inference. It runs inline in the request
+thread or inside a runtime.process_pool worker, so it must not touch Flask.
+Stages are recorded on an optional runtime.metrics.StageTimer.
+
+With VAD_ENABLED, non-speech regions are cut out before feature extraction
+(quality/vad.py) and the quality factor comes from the VAD's frame statistics.
+The fingerprint lookup still sees the whole clip, as the index was built from
+whole clips. Long recordings on the block-decoding path are not trimmed.
+
+With SEGMENTED_ANALYSIS, clips of SEGMENT_MIN_SECONDS or more are scored window
+by window instead (runtime.segments) and the result carries a timeline.
+"""
+import itertools
+
+import numpy as np
+
+from config import (
+    CLASS_AI, CLASS_HUMAN, STREAMING_DECODE_MIN_BYTES, STREAMING_BLOCK_SECONDS, VAD_ENABLED,
+    SEGMENTED_ANALYSIS, SEGMENT_MIN_SECONDS, SEGMENT_SECONDS, SEGMENT_OVERLAP
+)
+from audio.audio_decoder import decode_mp3, open_audio_blocks
+from features.feature_context import FeatureContext
+from features.feature_assembler import extract_all_features
+from features.streaming_features import StreamingFeatureExtractor
+from features.batch_features import extract_features_batch
+from quality.quality_score import compute_quality_factor, quality_factor_from_report
+from quality.vad import trim_silence
+from model.inference import run_inference, generate_one_class_explanation
+from fingerprint.index import lookup_fingerprint
+from model import model_loader
+from runtime.metrics import timed
+from runtime.segments import score_segments
+
+
+def featurize_bytes(audio_bytes, timer=None):
+    """
+    Returns (features, quality_factor, match). match is the stored verdict of a
+    known clip found in the fingerprint index, in which case features is None.
+    """
+    if len(audio_bytes) >= STREAMING_DECODE_MIN_BYTES:
+        # Long recording: bounded-memory block decode + online accumulators
+        try:
+            sr, blocks = open_audio_blocks(audio_bytes, STREAMING_BLOCK_SECONDS)
+        except Exception as e:
+            print(f"Block decoding unavailable, decoding whole clip: {e}")
+        else:
+            extractor = StreamingFeatureExtractor(sr)
+            with timed(timer, "decode_features"):
+                for block in blocks:
+                    extractor.update(block)
+                features, quality_factor = extractor.finalize()
+            if timer is not None:
+                timer.add_clip(extractor.n_samples, sr)
+            return features, quality_factor, None
+
+    with timed(timer, "decode"):
+        waveform, sr = decode_mp3(audio_bytes)
+    return featurize_waveform(waveform, sr, timer)
+
+
+def featurize_waveform(waveform, sr, timer=None):
+    """featurize_bytes for an already decoded clip."""
+    waveform, sr, ctx, quality_factor, match = _prepare(waveform, sr, timer)
+    if match is not None:
+        return None, quality_factor, match
+
+    with timed(timer, "features"):
+        features = extract_all_features(waveform, sr, ctx)
+    return features, quality_factor, None
+
+
+def _decode_and_match(audio_bytes, timer):
+    """Decode, quality and fingerprint lookup: see _prepare."""
+    with timed(timer, "decode"):
+        waveform, sr = decode_mp3(audio_bytes)
+    return _prepare(waveform, sr, timer)
+
+
+def _prepare(waveform, sr, timer):
+    """
+    Quality and fingerprint lookup: (waveform, sr, ctx, quality_factor, match).
+    waveform and ctx are what feature extraction should use, i.e. the
+    speech-only waveform when VAD trimmed the clip.
+    """
+    if timer is not None:
+        timer.add_clip(len(waveform), sr)
+    ctx = FeatureContext(waveform, sr)
+    speech = waveform
+    if VAD_ENABLED:
+        with timed(timer, "vad"):
+            speech, report = trim_silence(waveform, sr)
+            quality_factor = quality_factor_from_report(report)
+        if timer is not None:
+            timer.add_quality(report)
+    else:
+        with timed(timer, "quality"):
+            quality_factor = compute_quality_factor(waveform)
+
+    # Near-duplicate of a known clip: reuse its verdict, skip features and model
+    with timed(timer, "fingerprint"):
+        verdict, match_info = lookup_fingerprint(ctx)
+    match = fingerprint_result(verdict, match_info) if verdict is not None else None
+    if speech is not waveform:
+        return speech, sr, FeatureContext(speech, sr), quality_factor, match
+    return waveform, sr, ctx, quality_factor, match
+
+
+def featurize_batch(audio_list, timer=None):
+    """
+    featurize_bytes for several clips, with one batched feature extraction
+    (features.batch_features) for every clip that needs features. Returns a
+    (features, quality_factor, match) tuple or the raised exception per clip.
+    """
+    results = [None] * len(audio_list)
+    decoded = []  # (index, waveform, sr, ctx, quality_factor)
+    for index, audio_bytes in enumerate(audio_list):
+        try:
+            if len(audio_bytes) >= STREAMING_DECODE_MIN_BYTES:
+                results[index] = featurize_bytes(audio_bytes, timer)
+                continue
+            waveform, sr, ctx, quality_factor, match = _decode_and_match(audio_bytes, timer)
+        except Exception as e:
+            results[index] = e
+            continue
+        if match is not None:
+            results[index] = (None, quality_factor, match)
+        else:
+            decoded.append((index, waveform, sr, ctx, quality_factor))
+
+    if decoded:
+        with timed(timer, "features"):
+            vectors = extract_features_batch(
+                [d[1] for d in decoded], [d[2] for d in decoded], [d[3] for d in decoded])
+        for (index, _, _, _, quality_factor), features in zip(decoded, vectors):
+            if isinstance(features, Exception):
+                results[index] = features
+                if timer is not None:
+                    timer.failed_stages.append("features")
+            else:
+                results[index] = (features, quality_factor, None)
+    return results
+
+
+def fingerprint_result(verdict, match_info):
+    return {
+        "status": "success",
+        "classification": verdict["classification"],
+        "confidenceScore": verdict["confidenceScore"],
+        "explanation": "Audio matches a known recording in the fingerprint index "
+                       f"(bit error rate {match_info['bitErrorRate']:.2f}).",
+        "fingerprintMatch": {**match_info, "source": verdict.get("source")}
+    }
+
+
+def build_result(language, features, quality_factor, classification, confidence, mse_error):
+    # Low quality reduces confidence but classification remains fixed
+    final_confidence = min(confidence, quality_factor) if quality_factor < 0.8 else confidence
+
+    explanation = generate_one_class_explanation(classification, features, mse_error)
+    if quality_factor < 0.7:
+        explanation += " (Confidence adjusted for low audio quality)"
+
+    return {
+        "status": "success",
+        "language": language,
+        "classification": classification,
+        "confidenceScore": round(float(final_confidence), 3),
+        "explanation": explanation
+    }
+
+
+def verdict_source():
+    """Metrics label for verdicts produced by the model: its backend, or "mock" without one."""
+    return model_loader.BACKEND if model_loader.MODEL is not None else "mock"
+
+
+def _open_blocks(audio_bytes, timer):
+    """(sr, decoded blocks): block-wise for long recordings, else the whole clip as one block."""
+    if len(audio_bytes) >= STREAMING_DECODE_MIN_BYTES:
+        try:
+            return open_audio_blocks(audio_bytes, STREAMING_BLOCK_SECONDS)
+        except Exception as e:
+            print(f"Block decoding unavailable, decoding whole clip: {e}")
+    with timed(timer, "decode"):
+        waveform, sr = decode_mp3(audio_bytes)
+    return sr, iter([waveform])
+
+
+def analyze_segmented(sr, blocks, language, timer=None):
+    """Window-by-window verdict (runtime.segments) with the timeline under "segments"."""
+    summary = score_segments(blocks, sr, timer)
+    if timer is not None:
+        timer.sources.append(verdict_source())
+    probability = summary["aiProbability"]
+    classification = CLASS_AI if probability >= 0.5 else CLASS_HUMAN
+    with timed(timer, "explanation"):
+        result = build_result(language, None, summary["qualityFactor"], classification, probability, 0.0)
+    result["segments"] = {
+        "windowSeconds": SEGMENT_SECONDS,
+        "overlap": SEGMENT_OVERLAP,
+        "analyzedSeconds": summary["analyzedSeconds"],
+        "stoppedEarly": summary["stoppedEarly"],
+        "timeline": summary["timeline"],
+    }
+    return result
+
+
+def analyze_bytes(audio_bytes, language, infer=run_inference, timer=None):
+    """Full single-clip analysis; infer maps a feature vector to (classification, confidence, mse_error)."""
+    if SEGMENTED_ANALYSIS:
+        # Read up to SEGMENT_MIN_SECONDS: longer clips go window by window, shorter ones the usual way
+        sr, blocks = _open_blocks(audio_bytes, timer)
+        head, n = [], 0
+        with timed(timer, "decode"):
+            for block in blocks:
+                head.append(block)
+                n += len(block)
+                if n >= SEGMENT_MIN_SECONDS * sr:
+                    break
+        if n >= SEGMENT_MIN_SECONDS * sr:
+            return analyze_segmented(sr, itertools.chain(head, blocks), language, timer)
+        waveform = head[0] if len(head) == 1 else np.concatenate(head) if head else np.zeros(0, dtype=np.float32)
+        features, quality_factor, match = featurize_waveform(waveform, sr, timer)
+    else:
+        # 3. Audio Decoding + 4. Feature Pipeline (with fingerprint lookup)
+        features, quality_factor, match = featurize_bytes(audio_bytes, timer)
+    if match is not None:
+        if timer is not None:
+            timer.sources.append("fingerprint")
+        return {**match, "language": language}
+
+    # 5. One-Class Inference (Only AI known, Human is Anomaly)
+    with timed(timer, "inference"):
+        classification, confidence, mse_error = infer(features)
+    if timer is not None:
+        timer.sources.append(verdict_source())
+
+    # 6. Quality Adjustment + 7. Explanation Logic
+    with timed(timer, "explanation"):
+        return build_result(language, features, quality_factor, classification, confidence, mse_error)
@@ -0,0 +1,245 @@
+"""
+Process pool for the CPU-bound pipeline (decode, features, quality, inference).
+
+librosa work holds the GIL, so a threaded server runs one clip at a time per
+process. With PIPELINE_POOL_WORKERS > 0 each clip is analyzed by one of N
+spawned worker processes instead:
+  - workers start eagerly and each loads the model, the fingerprint index and
+    runs the warm-up clip once, in the pool initializer;
+  - the request audio travels through a SharedMemory segment, and only its name
+    and size are pickled; the worker decodes straight from the segment;
+  - every task has a deadline (PIPELINE_TASK_TIMEOUT_S); a late task is
+    abandoned and the request gets a PipelineTimeout. If every worker is busy
+    with abandoned tasks, the pool is torn down and rebuilt. Each pool is a new
+    generation: tasks lost with an old pool never count against the new one.
+    The rebuilt pool warms up on a watcher thread, not the request's; a pool
+    that fails to warm up is stopped and the next submit starts another;
+  - workers are recycled after PIPELINE_MAX_TASKS_PER_CHILD tasks, which bounds
+    slow leaks in native decoders.
+"""
+import multiprocessing
+import threading
+import time
+from multiprocessing import shared_memory
+
+from config import (
+    PIPELINE_POOL_WORKERS, PIPELINE_TASK_TIMEOUT_S, PIPELINE_MAX_TASKS_PER_CHILD, WARMUP_ENABLED
+)
+
+POOL_START_TIMEOUT_S = 300
+
+
+class PipelineTimeout(Exception):
+    pass
+
+
+def _init_worker(warm_workers):
+    from model import model_loader
+    from fingerprint.index import load_fingerprint_index
+    from runtime.startup import warm_up
+
+    model_loader.load_model_and_scaler()
+    load_fingerprint_index()
+    if WARMUP_ENABLED:
+        warm_up()
+    with warm_workers.get_lock():
+        warm_workers.value += 1
+
+
+def _run_task(shm_name, size, language):
+    from runtime.pipeline import analyze_bytes
+    from runtime.metrics import StageTimer
+
+    # Spawned workers share the parent's resource tracker; the parent unlinks the segment
+    shm = shared_memory.SharedMemory(name=shm_name)
+    timer = StageTimer()
+    try:
+        with shm.buf[:size] as audio_view:
+            result = analyze_bytes(audio_view, language, timer=timer)
+    finally:
+        try:
+            shm.close()
+        except BufferError:
+            # A failed decode's traceback still references the view; the mapping goes with it
+            pass
+    return result, timer.snapshot()
+
+
+class _Task:
+    def __init__(self, shm, async_result, deadline, generation):
+        self.shm = shm
+        self.async_result = async_result
+        self.deadline = deadline
+        self.generation = generation
+
+    def release(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+
+class PipelinePool:
+    def __init__(self, workers=PIPELINE_POOL_WORKERS, task_timeout_s=PIPELINE_TASK_TIMEOUT_S,
+                 max_tasks_per_child=PIPELINE_MAX_TASKS_PER_CHILD):
+        self.workers = int(workers)
+        self.task_timeout_s = task_timeout_s
+        self.max_tasks_per_child = max_tasks_per_child or None
+        self._ctx = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._pool = None
+        self._generation = 0
+        self._abandoned = []
+        self.warm_workers = self._ctx.Value("i", 0)
+        self.tasks = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self.busy_seconds = 0.0
+
+    def start(self):
+        """Spawns the workers and blocks until each has loaded the model and warmed up."""
+        with self._lock:
+            target, generation = self._start_locked()
+        self._wait_warm(target, generation)
+        return self
+
+    def _start_locked(self):
+        """
+        Starts a fresh pool generation; returns the warm_workers count at which
+        all of its workers are warm, and the generation.
+        """
+        target = self.warm_workers.value + self.workers
+        self._pool = self._ctx.Pool(
+            self.workers, initializer=_init_worker, initargs=(self.warm_workers,),
+            maxtasksperchild=self.max_tasks_per_child
+        )
+        self._generation += 1
+        self._abandoned = []
+        return target, self._generation
+
+    def _start_in_background_locked(self):
+        # Tasks queue behind the workers' initializers; the watcher only stops a pool that never warms up
+        target, generation = self._start_locked()
+        threading.Thread(target=self._watch_warm, args=(target, generation),
+                         name="pipeline-pool-warmup", daemon=True).start()
+
+    def _wait_warm(self, target, generation):
+        deadline = time.perf_counter() + POOL_START_TIMEOUT_S
+        while self.warm_workers.value < target:
+            if time.perf_counter() > deadline:
+                with self._lock:
+                    if generation == self._generation:
+                        self._stop_locked()
+                raise RuntimeError(f"Pipeline pool workers not ready after {POOL_START_TIMEOUT_S}s")
+            time.sleep(0.05)
+
+    def _watch_warm(self, target, generation):
+        try:
+            self._wait_warm(target, generation)
+            print(f"✅ Pipeline pool restarted ({self.workers} workers)")
+        except RuntimeError as e:
+            print(f"❌ {e}; the next request starts a new pool")
+
+    def submit(self, audio_bytes, language):
+        shm = shared_memory.SharedMemory(create=True, size=max(1, len(audio_bytes)))
+        shm.buf[:len(audio_bytes)] = audio_bytes
+        try:
+            with self._lock:
+                if self._pool is None:
+                    # The last pool failed to warm up (or was shut down): start another one
+                    self.restarts += 1
+                    self._start_in_background_locked()
+                async_result = self._pool.apply_async(_run_task, (shm.name, len(audio_bytes), language))
+                generation = self._generation
+        except Exception:
+            shm.close()
+            shm.unlink()
+            raise
+        return _Task(shm, async_result, time.perf_counter() + self.task_timeout_s, generation)
+
+    def result(self, task, timer=None):
+        """
+        Waits for a submitted task until its deadline; raises PipelineTimeout or the
+        worker's error. The worker's stage timings are merged into timer.
+        """
+        started = task.deadline - self.task_timeout_s
+        try:
+            result, timings = task.async_result.get(timeout=max(0.0, task.deadline - time.perf_counter()))
+            if timer is not None:
+                timer.merge(timings)
+            return result
+        except multiprocessing.TimeoutError:
+            self._abandon(task)
+            raise PipelineTimeout(f"Analysis did not finish within {self.task_timeout_s:g}s")
+        except Exception:
+            with self._lock:
+                self.failures += 1
+            raise
+        finally:
+            task.release()
+            with self._lock:
+                self.tasks += 1
+                self.busy_seconds += time.perf_counter() - started
+
+    def run(self, audio_bytes, language, timer=None):
+        return self.result(self.submit(audio_bytes, language), timer)
+
+    def _abandon(self, task):
+        with self._lock:
+            self.timeouts += 1
+            if task.generation != self._generation:
+                # Lost with a pool that was already replaced; says nothing about the current one
+                return
+            self._abandoned = [r for r in self._abandoned if not r.ready()] + [task.async_result]
+            if len(self._abandoned) < self.workers:
+                return
+            # Every worker is stuck on a task nobody waits for: rebuild the pool
+            print(f"⚠️ WARNING: {len(self._abandoned)} pipeline tasks stuck, restarting worker pool")
+            self._pool.terminate()
+            self.restarts += 1
+            self._start_in_background_locked()
+
+    def _stop_locked(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def shutdown(self):
+        with self._lock:
+            self._stop_locked()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": True,
+                "workers": self.workers,
+                "warmWorkerStarts": self.warm_workers.value,
+                "tasks": self.tasks,
+                "failures": self.failures,
+                "timeouts": self.timeouts,
+                "restarts": self.restarts,
+                "stuckTasks": sum(1 for r in self._abandoned if not r.ready()),
+                "avgTaskSeconds": self.busy_seconds / self.tasks if self.tasks else 0.0,
+            }
+
+
+PIPELINE_POOL = None
+
+def start_pipeline_pool():
+    global PIPELINE_POOL
+    # Spawned workers re-import the main module; never start a pool from inside one
+    if PIPELINE_POOL_WORKERS <= 0 or PIPELINE_POOL is not None or multiprocessing.parent_process() is not None:
+        return None
+    PIPELINE_POOL = PipelinePool().start()
+    print(f"✅ Pipeline pool ready ({PIPELINE_POOL.workers} workers)")
+    return PIPELINE_POOL
+
+def get_pipeline_pool():
+    return PIPELINE_POOL
+
+def pipeline_pool_stats():
+    if PIPELINE_POOL is None:
+        return {"enabled": False}
+    return PIPELINE_POOL.stats()
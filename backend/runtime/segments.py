@@ -0,0 +1,159 @@
+"""
+Segmented analysis of long clips: overlapping windows scored in parallel and
+aggregated into one verdict plus a per-window AI-probability timeline.
+
+Windows are cut from a stream of decoded blocks (a whole waveform is a single
+block), so long uploads keep the block decoder's bounded memory and decoding
+stops as soon as scoring does. Windows are cut in waves (never more than
+SEGMENT_MAX_SEGMENTS still allows); each wave is split into WINDOWS_PER_TASK
+groups, featurized with the batched extractor on a shared thread pool
+(NumPy/librosa release the GIL in the heavy parts) and scored group by group
+in order. After every scored window the running mean decides whether to stop
+early, and groups not started yet are cancelled (runtime.pipeline builds the
+response).
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from config import (
+    VAD_ENABLED, VAD_MIN_SPEECH_SECONDS, SEGMENT_SECONDS, SEGMENT_OVERLAP, SEGMENT_WORKERS,
+    SEGMENT_MIN_SEGMENTS, SEGMENT_EARLY_EXIT_CONFIDENCE, SEGMENT_MAX_SEGMENTS
+)
+from features.batch_features import extract_features_batch
+from quality.quality_score import compute_quality_factor, quality_factor_from_report
+from quality.vad import trim_silence
+from model.inference import run_batch_inference
+from runtime.metrics import timed
+
+WINDOWS_PER_TASK = 4  # windows per batched extractor call
+
+_executor = None
+_executor_lock = threading.Lock()
+SEGMENT_THREADS = SEGMENT_WORKERS or os.cpu_count() or 1
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(SEGMENT_THREADS, thread_name_prefix="segments")
+        return _executor
+
+
+def segment_windows(blocks, sr, window_s=SEGMENT_SECONDS, overlap=SEGMENT_OVERLAP):
+    """
+    Yields (start_sample, window) over a stream of blocks: windows of window_s
+    seconds every window_s * (1 - overlap). A trailing window holding samples no
+    earlier window covered may be shorter.
+    """
+    window = max(1, int(window_s * sr))
+    hop = max(1, int(window * (1 - overlap)))
+    buffer = np.zeros(0, dtype=np.float32)
+    offset = 0     # clip sample index of buffer[0]
+    covered = 0    # samples covered by the windows yielded so far
+    for block in blocks:
+        buffer = block if not len(buffer) else np.concatenate([buffer, block])
+        while len(buffer) >= window:
+            yield offset, buffer[:window]
+            covered = offset + window
+            buffer, offset = buffer[hop:], offset + hop
+    if offset + len(buffer) > covered and len(buffer):
+        yield offset, buffer
+
+
+def _featurize_group(windows, sr):
+    """(features or exception, quality_factor) per window; with VAD, windows are trimmed to speech first."""
+    speech, factors = [], []
+    for y in windows:
+        if VAD_ENABLED:
+            trimmed, report = trim_silence(y, sr)
+            if report["speech_s"] < VAD_MIN_SPEECH_SECONDS:
+                speech.append(None)
+                factors.append(None)
+                continue
+            speech.append(trimmed)
+            factors.append(quality_factor_from_report(report))
+        else:
+            speech.append(y)
+            factors.append(compute_quality_factor(y))
+    kept = [i for i, y in enumerate(speech) if y is not None]
+    vectors = extract_features_batch([speech[i] for i in kept], [sr] * len(kept))
+    results = [(None, None)] * len(windows)
+    for i, vector in zip(kept, vectors):
+        results[i] = (vector, factors[i])
+    return results
+
+
+def _stop_reason(probabilities):
+    n = len(probabilities)
+    if SEGMENT_MAX_SEGMENTS and n >= SEGMENT_MAX_SEGMENTS:
+        return "maxSegments"
+    if n >= SEGMENT_MIN_SEGMENTS and SEGMENT_EARLY_EXIT_CONFIDENCE < 1:
+        mean = float(np.mean(probabilities))
+        if max(mean, 1 - mean) >= SEGMENT_EARLY_EXIT_CONFIDENCE:
+            return "confidence"
+    return None
+
+
+def score_segments(blocks, sr, timer=None):
+    """
+    Scores the windows of a block stream. Returns a summary dict: aiProbability
+    (mean over scored windows), qualityFactor (mean), timeline entries
+    {start, end, aiProbability} in clip seconds (aiProbability None for windows
+    without speech or features), stoppedEarly ("confidence", "maxSegments" or
+    None) and analyzedSeconds. Raises ValueError when no window could be scored.
+    """
+    executor = _get_executor()
+    wave_size = SEGMENT_THREADS * WINDOWS_PER_TASK
+    windows = segment_windows(blocks, sr)
+    timeline, probabilities, factors = [], [], []
+    stopped, analyzed = None, 0
+    while stopped is None:
+        # Never cut more windows than SEGMENT_MAX_SEGMENTS still allows
+        size = wave_size if not SEGMENT_MAX_SEGMENTS else min(wave_size, SEGMENT_MAX_SEGMENTS - len(probabilities))
+        with timed(timer, "decode"):
+            wave = [w for _, w in zip(range(size), windows)]
+        if not wave:
+            break
+        groups = [wave[i:i + WINDOWS_PER_TASK] for i in range(0, len(wave), WINDOWS_PER_TASK)]
+        futures = [executor.submit(_featurize_group, [y for _, y in group], sr) for group in groups]
+        # Groups are consumed in order as they finish, so the stop rule runs per window
+        for group, future in zip(groups, futures):
+            if stopped is not None:
+                future.cancel()
+                continue
+            with timed(timer, "features"):
+                featurized = future.result()
+            scorable = [i for i, (vector, _) in enumerate(featurized)
+                        if vector is not None and not isinstance(vector, Exception)]
+            with timed(timer, "inference"):
+                scored = run_batch_inference([featurized[i][0] for i in scorable])
+            probability = {i: float(confidence) for i, (_, confidence, _) in zip(scorable, scored)}
+
+            for i, (start, y) in enumerate(group):
+                p = probability.get(i)
+                timeline.append({"start": round(start / sr, 2), "end": round((start + len(y)) / sr, 2),
+                                 "aiProbability": None if p is None else round(p, 3)})
+                analyzed = max(analyzed, start + len(y))
+                if p is not None:
+                    probabilities.append(p)
+                    factors.append(featurized[i][1])
+                    stopped = _stop_reason(probabilities)
+                    if stopped is not None:
+                        break
+    windows.close()  # stops block decoding when scoring ended early
+
+    if timer is not None:
+        timer.add_clip(analyzed, sr)
+    if not probabilities:
+        raise ValueError("No audio segment could be analyzed")
+    return {
+        "aiProbability": float(np.mean(probabilities)),
+        "qualityFactor": float(np.mean(factors)),
+        "timeline": timeline,
+        "stoppedEarly": stopped,
+        "analyzedSeconds": round(analyzed / sr, 2),
+    }
@@ -0,0 +1,137 @@
+"""
+Worker startup: model loading, synthetic warm-up and readiness tracking.
+
+In "eager" mode create_app loads the model and runs the warm-up before returning.
+In "background" mode both run on a thread so the worker binds immediately; the
+readiness endpoint only reports ready once the warm-up clip has gone through
+decode, features and inference (which also pays librosa/numba JIT costs).
+
+Under gunicorn with preload (PREFORK_PRELOAD) "eager" loads and warms up once
+in the master and the workers inherit the result; after_fork finishes what
+cannot cross fork() (Keras, the pipeline pool) and only then marks the worker
+ready. "background" with preload loads nothing in the master (a thread would
+not survive fork): each worker loads and warms up on a thread after fork.
+"""
+import io
+import threading
+import time
+
+import numpy as np
+
+from config import STARTUP_MODE, WARMUP_ENABLED, PREFORK_PRELOAD
+
+STARTUP_STATE = {
+    "mode": STARTUP_MODE,
+    "ready": False,
+    "error": None,
+    "backend": None,
+    "timings": {},
+}
+_started = threading.Event()
+_process_started = None
+
+
+def _synthetic_clip(sr=16000, duration_s=1.0):
+    """Encodes a short harmonic tone as MP3 (WAV if libsndfile lacks MP3 support)."""
+    import soundfile as sf
+
+    t = np.arange(int(sr * duration_s)) / sr
+    y = sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 6))
+    y = 0.3 * y / np.max(np.abs(y))
+    buf = io.BytesIO()
+    try:
+        sf.write(buf, y, sr, format="MP3")
+    except Exception:
+        buf = io.BytesIO()
+        sf.write(buf, y, sr, format="WAV")
+    return buf.getvalue()
+
+
+def warm_up():
+    """Runs one synthetic clip through decode, features, quality and inference."""
+    from audio.audio_decoder import decode_mp3
+    from features.feature_assembler import extract_all_features
+    from quality.quality_score import compute_quality_factor
+    from model.inference import run_inference
+
+    waveform, sr = decode_mp3(_synthetic_clip())
+    features = extract_all_features(waveform, sr)
+    compute_quality_factor(waveform)
+    run_inference(features)
+
+
+def _timed(name, fn):
+    start = time.perf_counter()
+    fn()
+    STARTUP_STATE["timings"][name] = round(time.perf_counter() - start, 4)
+
+
+def _run(process_started, in_master=False, preloaded=False):
+    """
+    in_master: preload in the gunicorn master, which stops before the fork-unsafe
+    parts and leaves readiness to each worker. preloaded: a worker finishing what
+    the master started.
+    """
+    from model import model_loader
+    from fingerprint.index import load_fingerprint_index
+    from runtime.process_pool import start_pipeline_pool
+
+    try:
+        if not preloaded:
+            _timed("modelLoadSeconds", lambda: model_loader.load_model_and_scaler(allow_keras=not in_master))
+            _timed("fingerprintLoadSeconds", load_fingerprint_index)
+            STARTUP_STATE["backend"] = model_loader.BACKEND
+            if WARMUP_ENABLED:
+                _timed("warmupSeconds", warm_up)
+        elif model_loader.MODEL is None:
+            # Keras backend: TensorFlow must be imported in the worker itself
+            _timed("modelLoadSeconds", model_loader.load_model_and_scaler)
+            STARTUP_STATE["backend"] = model_loader.BACKEND
+            if WARMUP_ENABLED and model_loader.MODEL is not None:
+                _timed("warmupSeconds", warm_up)
+        if in_master:
+            return
+        _timed("pipelinePoolSeconds", start_pipeline_pool)
+        STARTUP_STATE["ready"] = True
+    except Exception as e:
+        STARTUP_STATE["error"] = str(e)
+        print(f"⚠️ WARNING: Startup warm-up failed ({e})")
+    finally:
+        STARTUP_STATE["timings"]["readySeconds"] = round(time.perf_counter() - process_started, 4)
+        if STARTUP_STATE["ready"]:
+            print(f"✅ Worker ready in {STARTUP_STATE['timings']['readySeconds']:.2f}s ({STARTUP_STATE['timings']})")
+
+
+def _start_thread(*args):
+    threading.Thread(target=_run, args=args, name="startup-warmup", daemon=True).start()
+
+
+def start(process_started):
+    """
+    Loads the model and warms the pipeline according to STARTUP_MODE.
+    process_started is a time.perf_counter() value taken before the heavy imports.
+    """
+    global _process_started
+    if _started.is_set():
+        return
+    _started.set()
+    _process_started = process_started
+    STARTUP_STATE["timings"]["importSeconds"] = round(time.perf_counter() - process_started, 4)
+    if STARTUP_MODE == "background":
+        if not PREFORK_PRELOAD:
+            _start_thread(process_started)
+    else:
+        _run(process_started, in_master=PREFORK_PRELOAD)
+
+
+def after_fork():
+    """gunicorn post_fork hook (preload): per-worker setup of the fork-unsafe parts, then readiness."""
+    process_started = _process_started if _process_started is not None else time.perf_counter()
+    if STARTUP_MODE == "background":
+        _start_thread(process_started)
+    else:
+        _run(process_started, preloaded=True)
+
+
+def is_ready():
+    return STARTUP_STATE["ready"]
@@ -0,0 +1,209 @@
+"""
+Rolling analysis of a live call.
+
+A StreamingSession receives PCM frames as they arrive and keeps the last
+STREAM_WINDOW_SECONDS of audio. The magnitude STFT is extended incrementally,
+and only frames whose samples arrived since the last update are transformed.
+Every STREAM_UPDATE_SECONDS of new audio, the regular 45-element feature
+vector is computed over the window from those cached frames and scored with
+the shared inference path. Once enough speech has been heard, the session
+emits a smoothed AI/HUMAN verdict.
+
+The incremental STFT is not centered (center=False): frames lie on the
+stream's hop grid, and the window has no reflection padding at its edges.
+The upload path uses librosa's centered STFT. Over the same audio, the
+streaming magnitude therefore has about N_FFT / HOP_LENGTH fewer edge frames,
+and its frames are shifted by up to one hop. This moves the spectral and MFCC
+statistics slightly, so a streaming verdict can differ a little from the
+verdict for the same window uploaded as a file.
+"""
+import threading
+import time
+
+import numpy as np
+import librosa
+
+from config import (
+    CLASS_AI, CLASS_HUMAN,
+    STREAM_WINDOW_SECONDS, STREAM_UPDATE_SECONDS, STREAM_MIN_SPEECH_SECONDS,
+    STREAM_SMOOTHING, STREAM_MAX_SESSIONS, CANONICAL_SAMPLE_RATE
+)
+from audio.audio_decoder import BlockResampler, resample_ratio
+from features.feature_context import FeatureContext, N_FFT, HOP_LENGTH
+from features.feature_assembler import extract_all_features
+from quality.quality_score import compute_quality_factor
+from model.batch_scheduler import schedule_inference
+
+PCM_DTYPES = {"pcm_s16le": np.dtype("<i2"), "pcm_f32le": np.dtype("<f4")}
+
+# Same amplitude floor compute_quality_factor treats as near-silence
+SPEECH_ENERGY_THRESHOLD = 0.01
+SPEECH_FRAME_SECONDS = 0.02
+
+
+def decode_pcm(payload, encoding):
+    """Converts one binary frame of mono PCM into float32 samples in [-1, 1]."""
+    samples = np.frombuffer(payload, dtype=PCM_DTYPES[encoding])
+    if encoding == "pcm_s16le":
+        return samples.astype(np.float32) / 32768.0
+    return samples.astype(np.float32)
+
+
+def count_speech_samples(y, sr):
+    frame = max(1, int(SPEECH_FRAME_SECONDS * sr))
+    n_frames = len(y) // frame
+    if n_frames == 0:
+        return 0
+    energy = np.mean(np.abs(y[:n_frames * frame].reshape(n_frames, frame)), axis=1)
+    return int(np.count_nonzero(energy >= SPEECH_ENERGY_THRESHOLD) * frame)
+
+
+class StreamingSession:
+    def __init__(self, sample_rate, language="English", window_s=STREAM_WINDOW_SECONDS,
+                 update_s=STREAM_UPDATE_SECONDS, min_speech_s=STREAM_MIN_SPEECH_SECONDS,
+                 smoothing=STREAM_SMOOTHING):
+        # Frames are resampled on arrival so features see the same rate as uploads
+        self.input_sr = int(sample_rate)
+        self.sr = CANONICAL_SAMPLE_RATE or self.input_sr
+        self._resampler = None
+        if self.sr != self.input_sr:
+            self._resampler = BlockResampler(*resample_ratio(self.input_sr, self.sr))
+        self.language = language
+        self.window_samples = int(window_s * self.sr)
+        self.update_samples = max(1, int(update_s * self.sr))
+        self.min_speech_samples = int(min_speech_s * self.sr)
+        self.max_frames = max(1, self.window_samples // HOP_LENGTH)
+        self.smoothing = smoothing
+
+        self._pending = []
+        self._pending_samples = 0
+        self._window = np.zeros(0, dtype=np.float32)
+        self._stft_tail = np.zeros(0, dtype=np.float32)
+        self._magnitude = None
+
+        self.total_samples = 0
+        self.speech_samples = 0
+        self.updates = 0
+        self.ai_probability = None
+        self.quality_factor = 1.0
+        self.started = time.time()
+
+    def push(self, samples):
+        """Adds samples; returns a verdict dict when an update was due and enough speech was heard."""
+        if self._resampler is not None:
+            samples = self._resampler.push(samples)
+        if len(samples) == 0:
+            return None
+        self._pending.append(samples)
+        self._pending_samples += len(samples)
+        self.total_samples += len(samples)
+        if self._pending_samples >= self.update_samples:
+            return self._update()
+        return None
+
+    def flush(self):
+        """Scores whatever audio is still pending (used when the client stops the stream)."""
+        if self._resampler is not None:
+            tail = self._resampler.push(np.zeros(0, dtype=np.float32), final=True)
+            if len(tail):
+                self._pending.append(tail)
+                self._pending_samples += len(tail)
+                self.total_samples += len(tail)
+        if self._pending_samples:
+            return self._update()
+        return self.last_verdict()
+
+    def _advance(self):
+        new = np.concatenate(self._pending)
+        self._pending = []
+        self._pending_samples = 0
+
+        self._window = np.concatenate([self._window, new])[-self.window_samples:]
+        self.speech_samples += count_speech_samples(new, self.sr)
+
+        # Transform only the complete frames formed by the carried-over tail + new samples
+        buf = np.concatenate([self._stft_tail, new])
+        n_frames = 1 + (len(buf) - N_FFT) // HOP_LENGTH if len(buf) >= N_FFT else 0
+        if n_frames:
+            used = (n_frames - 1) * HOP_LENGTH + N_FFT
+            mag = np.abs(librosa.stft(buf[:used], n_fft=N_FFT, hop_length=HOP_LENGTH, center=False))
+            if self._magnitude is not None:
+                mag = np.concatenate([self._magnitude, mag], axis=1)
+            self._magnitude = mag[:, -self.max_frames:]
+            buf = buf[n_frames * HOP_LENGTH:]
+        self._stft_tail = buf
+
+    def _update(self):
+        self._advance()
+        if self._magnitude is None or self.speech_samples < self.min_speech_samples:
+            return None
+
+        ctx = FeatureContext(self._window, self.sr, magnitude=self._magnitude)
+        features = extract_all_features(self._window, self.sr, ctx)
+        classification, confidence, _ = schedule_inference(features)
+
+        prob = float(confidence)
+        if self.ai_probability is None:
+            self.ai_probability = prob
+        else:
+            self.ai_probability = self.smoothing * self.ai_probability + (1 - self.smoothing) * prob
+        self.quality_factor = compute_quality_factor(self._window)
+        self.updates += 1
+        return self.last_verdict()
+
+    def last_verdict(self):
+        if self.ai_probability is None:
+            return None
+        # Same quality rule as the upload route: low quality caps confidence
+        confidence = self.ai_probability
+        if self.quality_factor < 0.8:
+            confidence = min(confidence, self.quality_factor)
+        return {
+            "type": "verdict",
+            "language": self.language,
+            "classification": CLASS_AI if self.ai_probability >= 0.5 else CLASS_HUMAN,
+            "confidenceScore": round(float(confidence), 3),
+            "aiProbability": round(float(self.ai_probability), 3),
+            "secondsReceived": round(self.total_samples / self.sr, 2),
+            "secondsOfSpeech": round(self.speech_samples / self.sr, 2),
+            "windowSeconds": round(len(self._window) / self.sr, 2),
+            "updates": self.updates,
+        }
+
+
+class SessionRegistry:
+    """Caps concurrent sessions per worker and keeps counters for /api/stats."""
+
+    def __init__(self, max_sessions=STREAM_MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self.active = 0
+        self.opened = 0
+        self.rejected = 0
+
+    def open(self, sample_rate, language="English"):
+        with self._lock:
+            if self.active >= self.max_sessions:
+                self.rejected += 1
+                return None
+            self.active += 1
+            self.opened += 1
+        return StreamingSession(sample_rate, language)
+
+    def close(self, session):
+        if session is None:
+            return
+        with self._lock:
+            self.active -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "activeSessions": self.active,
+                "maxSessions": self.max_sessions,
+                "openedSessions": self.opened,
+                "rejectedSessions": self.rejected,
+            }
+
+
+SESSIONS = SessionRegistry()
@@ -0,0 +1,89 @@
+"""
+WebSocket endpoint for live-call analysis: /api/voice-detection/stream
+
+Protocol:
+  1. Client sends a JSON text message:
+       {"type": "start", "sampleRate": 16000, "encoding": "pcm_s16le" | "pcm_f32le",
+        "language": "English", "apiKey": "..."}
+     (apiKey may instead be sent as the x-api-key handshake header)
+  2. Client streams binary messages of mono PCM in the declared encoding.
+  3. Server pushes {"type": "verdict", ...} whenever the rolling verdict updates.
+  4. Client sends {"type": "stop"}; server replies {"type": "final", ...} and closes.
+Errors are sent as {"type": "error", "message": ...} before closing, including
+for text messages that are not JSON objects.
+"""
+import json
+
+from flask import Blueprint, request, current_app
+from flask_sock import Sock
+from simple_websocket import ConnectionClosed
+
+from config import STREAM_IDLE_TIMEOUT_SECONDS
+from utils.validators import validate_stream_start
+from streaming.session import SESSIONS, PCM_DTYPES, decode_pcm
+
+sock = Sock()
+streaming_bp = Blueprint("streaming", __name__)
+
+def _send(ws, message):
+    ws.send(json.dumps(message))
+
+def _parse_object(raw):
+    """Returns a text message's JSON object, or None for anything else."""
+    try:
+        message = json.loads(raw) if isinstance(raw, str) else None
+    except ValueError:
+        return None
+    return message if isinstance(message, dict) else None
+
+@sock.route("/voice-detection/stream", bp=streaming_bp)
+def voice_detection_stream(ws):
+    raw = ws.receive(timeout=STREAM_IDLE_TIMEOUT_SECONDS)
+    start = _parse_object(raw)
+    api_key = request.headers.get("x-api-key") or (start or {}).get("apiKey")
+    if api_key != current_app.config["API_KEY"]:
+        _send(ws, {"type": "error", "message": "Invalid API key"})
+        return
+
+    error = validate_stream_start(start, PCM_DTYPES)
+    if error:
+        _send(ws, {"type": "error", "message": error})
+        return
+
+    session = SESSIONS.open(start["sampleRate"], start.get("language", "English"))
+    if session is None:
+        _send(ws, {"type": "error", "message": "Too many concurrent streams, retry later"})
+        return
+
+    encoding = start.get("encoding", "pcm_s16le")
+    try:
+        _send(ws, {"type": "ready", "sampleRate": session.input_sr, "encoding": encoding})
+        while True:
+            message = ws.receive(timeout=STREAM_IDLE_TIMEOUT_SECONDS)
+            if message is None:
+                _send(ws, {"type": "error", "message": "Stream idle timeout"})
+                break
+
+            if isinstance(message, (bytes, bytearray)):
+                verdict = session.push(decode_pcm(message, encoding))
+                if verdict:
+                    _send(ws, verdict)
+                continue
+
+            control = _parse_object(message)
+            if control is None:
+                _send(ws, {"type": "error", "message": "Control messages must be JSON objects"})
+                break
+            if control.get("type") == "stop":
+                final = session.flush() or {"type": "verdict", "classification": None,
+                                            "message": "Not enough speech to classify"}
+                _send(ws, {**final, "type": "final"})
+                break
+    except ConnectionClosed:
+        pass
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        _send(ws, {"type": "error", "message": str(e)})
+    finally:
+        SESSIONS.close(session)
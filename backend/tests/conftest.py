@@ -0,0 +1,52 @@
+"""
+Tests run with backend/ and training/ importable, as the server and the
+training scripts see them, and a Flask test client for the routes:
+    python -m pytest backend/tests
+"""
+import base64
+import io
+import os
+import sys
+
+import pytest
+import soundfile as sf
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..")
+for path in ("backend", "training"):
+    sys.path.insert(0, os.path.join(ROOT, path))
+
+API_KEY = os.environ.setdefault("API_KEY", "test-key")
+
+
+@pytest.fixture(scope="session")
+def app():
+    from app import app as flask_app
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def headers():
+    return {"x-api-key": API_KEY}
+
+
+def encode_clip(seconds=2.0, sr=16000, fmt="MP3"):
+    from benchmarks.synthetic import synth_speech
+
+    buf = io.BytesIO()
+    sf.write(buf, synth_speech(seconds, sr), sr, format=fmt)
+    return buf.getvalue()
+
+
+@pytest.fixture(scope="session")
+def mp3_clip():
+    return encode_clip()
+
+
+@pytest.fixture(scope="session")
+def mp3_base64(mp3_clip):
+    return base64.b64encode(mp3_clip).decode()
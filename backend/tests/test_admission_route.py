@@ -0,0 +1,50 @@
+"""Duration probe and payload checks in front of /api/voice-detection."""
+import base64
+import io
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+import routes
+
+URL = "/api/voice-detection"
+
+
+def fake_frame_wav(seconds=20, sr=16000):
+    """16-bit PCM whose bytes repeat a valid 32 kbps MPEG-1 Layer III frame header."""
+    frame = bytes([0xFF, 0xFB, 0x14, 0x00]) + bytes(92)
+    pcm = np.frombuffer(frame * (seconds * sr * 2 // len(frame)), dtype="<i2")
+    buf = io.BytesIO()
+    sf.write(buf, pcm, sr, format="WAV", subtype="PCM_16")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def one_minute_limit(monkeypatch):
+    monkeypatch.setattr(routes, "MAX_AUDIO_SECONDS", 60.0)
+
+
+def test_pcm_is_not_probed_as_mp3(client, headers, one_minute_limit):
+    wav = fake_frame_wav()
+    # The probe alone would call this 20 s clip 160 s long
+    assert routes.probe_mp3_duration(routes.bytes_reader(wav), len(wav)) > 60
+    body = {"audioFormat": "mp3", "audioBase64": base64.b64encode(wav).decode()}
+    assert client.post(URL, json=body, headers=headers).status_code == 200
+    response = client.post(URL, data=wav, headers={**headers, "Content-Type": "audio/mpeg"})
+    assert response.status_code == 200
+
+
+def test_long_mp3_is_refused(client, headers, mp3_base64, monkeypatch):
+    monkeypatch.setattr(routes, "MAX_AUDIO_SECONDS", 1.0)
+    response = client.post(URL, json={"audioFormat": "mp3", "audioBase64": mp3_base64}, headers=headers)
+    assert response.status_code == 413
+    assert response.get_json()["message"].startswith("Audio too long")
+
+
+@pytest.mark.parametrize("field, value", [("audioBase64", 123), ("audioBase64", None), ("language", ["English"])])
+def test_non_string_fields_are_rejected(client, headers, mp3_base64, field, value):
+    body = {"audioFormat": "mp3", "audioBase64": mp3_base64, field: value}
+    response = client.post(URL, json=body, headers=headers)
+    assert response.status_code == 400
+    assert response.get_json()["message"] == f"{field} must be a string"
@@ -0,0 +1,37 @@
+"""Batched multi-clip features against extract_all_features clip by clip."""
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import synth_speech
+from features import pitch_features
+from features.feature_assembler import extract_all_features
+from features.batch_features import extract_features_batch
+
+SR = 16000
+FLATNESS = 3  # index of the spectral flatness mean in the 45-element vector
+
+
+@pytest.mark.parametrize("estimator", ["piptrack", "yin"])
+def test_batch_matches_single_clips(estimator, monkeypatch):
+    monkeypatch.setattr(pitch_features, "PITCH_ESTIMATOR", estimator)
+    clips = [synth_speech(seconds, SR, f0=f0, seed=i)
+             for i, (seconds, f0) in enumerate([(1.0, 120.0), (2.5, 180.0), (2.6, 220.0), (4.0, 150.0)])]
+    for y, features in zip(clips, extract_features_batch(clips, [SR] * len(clips))):
+        expected = np.asarray(extract_all_features(y, SR))
+        features = np.asarray(features)
+        others = np.arange(len(expected)) != FLATNESS
+        np.testing.assert_allclose(features[others], expected[others], rtol=1e-5, atol=1e-8)
+        # librosa sums flatness over bins in float32, in a different order for stacked input
+        np.testing.assert_allclose(features[FLATNESS], expected[FLATNESS], rtol=3e-4)
+
+
+def test_a_failing_clip_does_not_fail_its_bucket():
+    good = [synth_speech(2.0, SR, seed=i) for i in range(3)]
+    bad = synth_speech(2.0, SR, seed=9)
+    bad[100] = np.nan
+    short = np.zeros(0, dtype=np.float32)
+    results = extract_features_batch([good[0], bad, good[1], short, good[2]], [SR] * 5)
+    assert isinstance(results[1], Exception)
+    assert isinstance(results[3], Exception)
+    for y, features in zip(good, [results[0], results[2], results[4]]):
+        np.testing.assert_allclose(features, extract_all_features(y, SR), rtol=3e-4, atol=1e-8)
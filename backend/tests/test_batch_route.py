@@ -0,0 +1,34 @@
+"""/api/voice-detection/batch: malformed bodies get a 400, malformed items a per-item error."""
+import pytest
+
+URL = "/api/voice-detection/batch"
+
+
+@pytest.mark.parametrize("body", [[], [{"audioFormat": "mp3"}], "items", 3])
+def test_non_object_body_is_rejected(client, headers, body):
+    response = client.post(URL, json=body, headers=headers)
+    assert response.status_code == 400
+    assert response.get_json()["status"] == "error"
+
+
+def test_malformed_item_fails_alone(client, headers, mp3_base64):
+    items = [
+        {"id": "ok", "audioFormat": "mp3", "audioBase64": mp3_base64},
+        {"id": "null-format", "audioFormat": None, "audioBase64": mp3_base64},
+        {"id": "list-format", "audioFormat": ["mp3"], "audioBase64": mp3_base64},
+        "not an object",
+    ]
+    response = client.post(URL, json={"items": items}, headers=headers)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["status"] == "partial" and body["failed"] == 3
+    results = body["results"]
+    assert results[0]["status"] == "success" and results[0]["id"] == "ok"
+    assert results[1] == {"status": "error", "message": "audioFormat must be a string", "id": "null-format"}
+    assert results[2]["message"] == "audioFormat must be a string"
+    assert results[3] == {"status": "error", "message": "Invalid item"}
+
+
+def test_single_route_rejects_a_list_body(client, headers):
+    response = client.post("/api/voice-detection", json=["audioFormat", "audioBase64"], headers=headers)
+    assert response.status_code == 400
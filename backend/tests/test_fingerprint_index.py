@@ -0,0 +1,52 @@
+"""Fingerprint index: bucket directory and lookups of re-encoded clips."""
+import numpy as np
+import pytest
+
+from fingerprint.index import FingerprintIndex, _bucket_directory
+
+MAX_BER, MIN_FRAMES = 0.30, 32
+
+
+@pytest.fixture(scope="module")
+def clips():
+    return np.random.default_rng(0).integers(0, 2**32, size=(500, 300), dtype=np.uint32)
+
+
+@pytest.fixture(scope="module")
+def index(clips, tmp_path_factory):
+    index = FingerprintIndex()
+    for i, clip in enumerate(clips):
+        index.add(clip, {"classification": "AI_GENERATED", "clip": i})
+    path = str(tmp_path_factory.mktemp("index"))
+    index.save(path)
+    return FingerprintIndex.load(path)
+
+
+def test_directory_points_at_each_prefix_bucket():
+    hashes = np.sort(np.random.default_rng(1).integers(0, 2**32, size=5000, dtype=np.uint32))
+    directory = _bucket_directory(hashes, 13, chunk=1000)
+    assert directory.dtype == np.uint32 and len(directory) == 2**13 + 1
+    top = (hashes >> np.uint32(19)).astype(np.int64)
+    rows = np.arange(len(hashes))
+    assert np.all(directory[top] <= rows) and np.all(rows < directory[top + 1])
+    assert directory[-1] == len(hashes)
+
+
+def test_index_has_a_prefix_per_row(index):
+    assert len(index.directory) - 1 >= len(index.hashes)
+
+
+def test_finds_a_trimmed_noisy_copy(index, clips):
+    rng = np.random.default_rng(2)
+    query = clips[123, 40:].copy()
+    # Flip one random bit in a quarter of the frames
+    noisy = rng.random(len(query)) < 0.25
+    query[noisy] ^= np.uint32(1) << rng.integers(0, 32, size=noisy.sum()).astype(np.uint32)
+    verdict, info = index.query(query, MAX_BER, MIN_FRAMES)
+    assert verdict["clip"] == 123
+    assert info["frameShift"] == 40
+
+
+def test_unseen_clip_does_not_match(index):
+    query = np.random.default_rng(3).integers(0, 2**32, size=300, dtype=np.uint32)
+    assert index.query(query, MAX_BER, MIN_FRAMES) == (None, None)
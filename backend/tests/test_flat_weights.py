@@ -0,0 +1,22 @@
+"""Memory-mapped model.weights against the NumPy model it was written from."""
+import numpy as np
+
+from model.flat_weights import save_flat_weights, load_flat_weights
+from model.numpy_backend import NumpyDenseModel, NumpyScaler
+
+
+def test_flat_weights_round_trip(tmp_path):
+    rng = np.random.default_rng(0)
+    sizes = [45, 64, 32, 1]
+    layers = [(rng.normal(size=(a, b)), rng.normal(size=b), act)
+              for a, b, act in zip(sizes, sizes[1:], ["relu", "relu", "sigmoid"])]
+    model = NumpyDenseModel(layers)
+    scaler = NumpyScaler(rng.normal(size=45), rng.uniform(0.5, 2.0, size=45))
+
+    mm_model, mm_scaler = load_flat_weights(save_flat_weights(model, scaler, str(tmp_path / "model.weights")))
+
+    X = rng.normal(size=(50, 45))
+    np.testing.assert_array_equal(mm_model.predict(mm_scaler.transform(X)), model.predict(scaler.transform(X)))
+    # Views of the read-only mapping, shared between processes rather than copied
+    for W, b, _ in mm_model.layers:
+        assert not W.flags.writeable and not b.flags.writeable
@@ -0,0 +1,39 @@
+"""Request metrics summed across worker processes through METRICS_MULTIPROC_DIR."""
+import json
+import os
+
+import pytest
+
+from runtime import metrics
+
+
+@pytest.fixture
+def multiproc_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_MULTIPROC_DIR", str(tmp_path))
+    return tmp_path
+
+
+def sample(body, line_start):
+    return next(float(line.split(" ")[-1]) for line in body.splitlines() if line.startswith(line_start))
+
+
+def test_render_sums_every_workers_file(multiproc_dir):
+    metrics.REQUESTS.inc("/api/test", "200", amount=3)
+    metrics.REQUEST_SECONDS.observe(0.2, "/api/test")
+    metrics.observe_rejection("/api/test", "duration")
+    own = sample(metrics.render(), 'callguard_requests_total{route="/api/test",status="200"}')
+
+    # Another worker's snapshot, written the same way
+    state = json.loads((multiproc_dir / f"{os.getpid()}.json").read_text())
+    (multiproc_dir / "999999.json").write_text(json.dumps(state))
+
+    body = metrics.render({"admission": {"inFlight": 2}})
+    assert sample(body, 'callguard_requests_total{route="/api/test",status="200"}') == 2 * own
+    count = sample(body, 'callguard_request_seconds_count{route="/api/test"}')
+    assert sample(body, 'callguard_request_seconds_bucket{route="/api/test",le="0.25"}') == count
+    assert f'callguard_admission_in_flight{{worker="{os.getpid()}"}} 2' in body
+
+
+def test_unreadable_files_are_skipped(multiproc_dir):
+    (multiproc_dir / "123.json").write_text("{partial")
+    assert "callguard_requests_total" in metrics.render()
@@ -0,0 +1,40 @@
+"""NumPy inference backend against the Keras model it is exported from."""
+import numpy as np
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+tf = pytest.importorskip("tensorflow")
+
+from benchmarks.synthetic import synth_speech
+from features.feature_assembler import extract_all_features
+from model.numpy_backend import export_numpy_artifacts, load_numpy_artifacts
+from save_artifacts import PARITY_TOLERANCE, verify_parity
+
+
+@pytest.fixture(scope="module")
+def exported(tmp_path_factory):
+    rows = np.array([extract_all_features(synth_speech(2.0, f0=f0, seed=i), 16000)
+                     for i, f0 in enumerate(np.linspace(90, 260, 12))])
+    scaler = StandardScaler().fit(rows)
+    tf.keras.utils.set_random_seed(0)
+    model = tf.keras.Sequential([
+        tf.keras.Input(shape=(rows.shape[1],)),
+        tf.keras.layers.Dense(64, activation="relu"),
+        tf.keras.layers.Dense(32, activation="relu"),
+        tf.keras.layers.Dense(1, activation="sigmoid"),
+    ])
+    npz_path = str(tmp_path_factory.mktemp("assets") / "model.npz")
+    export_numpy_artifacts(model, scaler, npz_path)
+    return model, scaler, npz_path, rows
+
+
+def test_numpy_export_passes_the_parity_gate(exported):
+    model, scaler, npz_path, _ = exported
+    assert verify_parity(model, scaler, npz_path, n_samples=200) <= PARITY_TOLERANCE
+
+
+def test_numpy_backend_agrees_on_synthetic_clips(exported):
+    model, scaler, npz_path, rows = exported
+    expected = model.predict(scaler.transform(rows), verbose=0)
+    np_model, np_scaler = load_numpy_artifacts(npz_path)
+    np.testing.assert_allclose(np_model.predict(np_scaler.transform(rows)), expected, atol=PARITY_TOLERANCE)
@@ -0,0 +1,35 @@
+"""PITCH_ESTIMATOR=yin: F0 accuracy, and the streaming path still matching the whole clip."""
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import synth_speech
+from features import pitch_features
+from features.feature_assembler import extract_all_features
+from features.streaming_features import extract_features_from_blocks
+
+SR = 16000
+
+
+@pytest.fixture(autouse=True)
+def yin(monkeypatch):
+    monkeypatch.setattr(pitch_features, "PITCH_ESTIMATOR", "yin")
+
+
+@pytest.mark.parametrize("f0", [110.0, 220.0])
+def test_yin_tracks_a_steady_pitch(f0):
+    t = np.arange(2 * SR) / SR
+    y = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 6)).astype(np.float32)
+    mean, var, spread = pitch_features.extract_pitch_features(y, SR)
+    assert mean == pytest.approx(f0, rel=0.01)
+    assert spread < 0.05 * f0
+
+
+def test_yin_silence_is_unvoiced():
+    assert pitch_features.extract_pitch_features(np.zeros(SR, dtype=np.float32), SR) == [0, 0, 0]
+
+
+def test_streaming_matches_whole_clip_with_yin():
+    y = synth_speech(8.0, SR)
+    step = int(2.5 * SR)
+    features, _ = extract_features_from_blocks((y[i:i + step] for i in range(0, len(y), step)), SR)
+    np.testing.assert_allclose(features, extract_all_features(y, SR), rtol=1e-6, atol=1e-9)
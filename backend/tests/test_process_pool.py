@@ -0,0 +1,72 @@
+"""PipelinePool restart bookkeeping, with an in-process stand-in for multiprocessing.Pool."""
+import multiprocessing
+
+import pytest
+
+from runtime.process_pool import PipelinePool, PipelineTimeout
+
+
+class StuckResult:
+    def ready(self):
+        return False
+
+    def get(self, timeout=None):
+        raise multiprocessing.TimeoutError()
+
+
+class FakePool:
+    def __init__(self, workers, initializer, initargs, maxtasksperchild):
+        self.terminated = False
+        warm_workers = initargs[0]
+        with warm_workers.get_lock():
+            warm_workers.value += workers
+
+    def apply_async(self, fn, args):
+        assert not self.terminated
+        return StuckResult()
+
+    def terminate(self):
+        self.terminated = True
+
+    def join(self):
+        pass
+
+
+class FakeContext:
+    Pool = FakePool
+    Value = staticmethod(multiprocessing.Value)
+
+
+@pytest.fixture
+def pool():
+    pool = PipelinePool(workers=2, task_timeout_s=0.0, max_tasks_per_child=0)
+    pool._ctx = FakeContext()
+    pool.warm_workers = FakeContext.Value("i", 0)
+    return pool.start()
+
+
+def time_out(pool, task):
+    with pytest.raises(PipelineTimeout):
+        pool.result(task)
+
+
+def test_tasks_lost_with_an_old_pool_do_not_restart_the_new_one(pool):
+    first = pool._pool
+    tasks = [pool.submit(b"audio", "English") for _ in range(4)]
+    time_out(pool, tasks[0])
+    time_out(pool, tasks[1])
+    assert first.terminated and pool.stats()["restarts"] == 1
+    second = pool._pool
+
+    # Queued on the terminated pool; they can never finish and must not count against the new one
+    time_out(pool, tasks[2])
+    time_out(pool, tasks[3])
+    assert pool._pool is second and not second.terminated
+    assert pool.stats()["restarts"] == 1 and pool.stats()["timeouts"] == 4
+
+
+def test_submit_starts_a_pool_when_there_is_none(pool):
+    pool.shutdown()
+    task = pool.submit(b"audio", "English")
+    assert pool._pool is not None and pool.stats()["restarts"] == 1
+    time_out(pool, task)
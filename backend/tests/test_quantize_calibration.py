@@ -0,0 +1,30 @@
+"""int8 calibration rows come from the rows the float model was trained on."""
+import numpy as np
+
+from feature_store import train_val_split
+from quantize_model import calibration_indices
+
+
+class LabelsOnlyStore:
+    def __init__(self, labels):
+        self.labels = np.asarray(labels, dtype=np.int8)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def select(self, label=None):
+        return np.flatnonzero(self.labels == label)
+
+
+def test_classifier_calibrates_on_the_training_split():
+    store = LabelsOnlyStore(np.arange(1000) % 3 == 0)
+    train_idx, val_idx = train_val_split(store)
+    rows = calibration_indices("classifier", store, calibration_rows=10_000)
+    assert set(rows) == set(train_idx)
+    assert not set(rows) & set(val_idx)
+
+
+def test_autoencoder_calibrates_on_ai_rows():
+    store = LabelsOnlyStore(np.arange(1000) % 3 == 0)
+    rows = calibration_indices("autoencoder", store, calibration_rows=100)
+    assert len(rows) == 100 and store.labels[rows].all()
@@ -0,0 +1,27 @@
+"""SEGMENTED_ANALYSIS: the batch route segments long clips like the single route."""
+import pytest
+
+import routes
+from runtime import pipeline, segments
+
+
+@pytest.fixture
+def segmented(monkeypatch):
+    # 1 s windows from 1 s up, so the 2 s test clip is segmented
+    monkeypatch.setattr(routes, "SEGMENTED_ANALYSIS", True)
+    monkeypatch.setattr(pipeline, "SEGMENTED_ANALYSIS", True)
+    monkeypatch.setattr(pipeline, "SEGMENT_MIN_SECONDS", 1.0)
+    monkeypatch.setattr(segments, "SEGMENT_SECONDS", 1.0)
+    # The cache version digests the settings at import; patched ones need a fresh cache
+    if routes.VERDICT_CACHE is not None:
+        routes.VERDICT_CACHE.clear()
+
+
+def test_batch_and_single_routes_both_segment(client, headers, mp3_base64, segmented):
+    body = {"audioFormat": "mp3", "audioBase64": mp3_base64}
+    batch = client.post("/api/voice-detection/batch", json={"items": [body]}, headers=headers).get_json()
+    assert batch["status"] == "success"
+    assert batch["results"][0]["segments"]["timeline"]
+
+    single = client.post("/api/voice-detection", json=body, headers=headers).get_json()
+    assert single["segments"]["timeline"]
@@ -0,0 +1,45 @@
+"""Start and control message handling on /api/voice-detection/stream."""
+import json
+
+import pytest
+
+from conftest import API_KEY
+from streaming.session import SESSIONS
+
+
+class FakeSocket:
+    """Replays text messages to the handler and records what it sends."""
+
+    def __init__(self, *messages):
+        self.incoming = list(messages)
+        self.sent = []
+
+    def receive(self, timeout=None):
+        return self.incoming.pop(0) if self.incoming else None
+
+    def send(self, data):
+        self.sent.append(json.loads(data))
+
+
+def run_stream(app, *messages):
+    ws = FakeSocket(*messages)
+    # The registered view wraps the handler in a real WebSocket server
+    handler = app.view_functions["streaming.voice_detection_stream"].__wrapped__
+    with app.test_request_context("/api/voice-detection/stream"):
+        handler(ws)
+    return ws.sent
+
+
+@pytest.mark.parametrize("start", ["[1, 2]", '"start"', "42", "null", "not json"])
+def test_non_object_start_message_is_an_error(app, start):
+    sent = run_stream(app, start)
+    assert [m["type"] for m in sent] == ["error"]
+
+
+def test_non_object_control_message_is_an_error(app):
+    start = json.dumps({"type": "start", "sampleRate": 16000, "apiKey": API_KEY})
+    active = SESSIONS.stats()["activeSessions"]
+    sent = run_stream(app, start, "[]")
+    assert [m["type"] for m in sent] == ["ready", "error"]
+    assert sent[1]["message"] == "Control messages must be JSON objects"
+    assert SESSIONS.stats()["activeSessions"] == active
@@ -0,0 +1,26 @@
+"""Block-wise streaming features against extract_all_features on the whole clip."""
+import numpy as np
+
+from benchmarks.synthetic import synth_speech
+from features.feature_assembler import extract_all_features
+from features.streaming_features import extract_features_from_blocks
+
+SR = 16000
+
+
+def blocks(y, seconds):
+    step = int(seconds * SR)
+    return (y[i:i + step] for i in range(0, len(y), step))
+
+
+def test_streaming_matches_whole_clip():
+    y = synth_speech(12.0, SR)
+    features, _ = extract_features_from_blocks(blocks(y, 2.5), SR)
+    np.testing.assert_allclose(features, extract_all_features(y, SR), rtol=1e-6, atol=1e-9)
+
+
+def test_block_size_does_not_change_the_result():
+    y = synth_speech(6.0, SR)
+    small, _ = extract_features_from_blocks(blocks(y, 0.5), SR)
+    large, _ = extract_features_from_blocks(blocks(y, 6.0), SR)
+    np.testing.assert_allclose(small, large, rtol=1e-6, atol=1e-9)
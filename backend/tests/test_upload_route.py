@@ -0,0 +1,52 @@
+"""Binary uploads on /api/voice-detection: raw audio/mpeg bodies and multipart files."""
+import io
+
+import pytest
+
+URL = "/api/voice-detection"
+
+
+def multipart(clip, filename="call.mp3", mimetype="audio/mpeg", **fields):
+    return {"file": (io.BytesIO(clip), filename, mimetype), **fields}
+
+
+@pytest.mark.parametrize("mimetype", ["audio/mpeg", "audio/mp3"])
+def test_raw_mp3_body(client, headers, mp3_clip, mimetype):
+    response = client.post(URL + "?language=Tamil", data=mp3_clip,
+                           headers={**headers, "Content-Type": mimetype})
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    assert body["status"] == "success"
+    assert body["language"] == "Tamil"
+
+
+def test_empty_raw_body_is_rejected(client, headers):
+    response = client.post(URL, data=b"", headers={**headers, "Content-Type": "audio/mpeg"})
+    assert response.status_code == 400
+    assert response.get_json()["message"] == "Empty audio body"
+
+
+def test_multipart_upload(client, headers, mp3_clip):
+    response = client.post(URL, data=multipart(mp3_clip, language="Hindi"), headers=headers,
+                           content_type="multipart/form-data")
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    assert body["status"] == "success"
+    assert body["language"] == "Hindi"
+
+
+def test_multipart_accepts_mp3_name_with_generic_type(client, headers, mp3_clip):
+    data = multipart(mp3_clip, mimetype="application/octet-stream")
+    response = client.post(URL, data=data, headers=headers, content_type="multipart/form-data")
+    assert response.status_code == 200, response.get_json()
+
+
+@pytest.mark.parametrize("data, message", [
+    ({"language": "English"}, "Missing file field: file"),
+    (multipart(b"RIFF....WAVE", filename="call.wav", mimetype="audio/wav"), "Only MP3 audio is allowed."),
+    (multipart(b""), "Empty audio body"),
+])
+def test_bad_multipart_upload_is_rejected(client, headers, data, message):
+    response = client.post(URL, data=data, headers=headers, content_type="multipart/form-data")
+    assert response.status_code == 400
+    assert response.get_json()["message"] == message
@@ -0,0 +1,64 @@
+"""Verdict cache: no caching without a model, SQLite writes off the cache lock."""
+import threading
+
+import pytest
+
+from cache.verdict_cache import VerdictCache
+from model import model_loader
+
+VERDICT = {"classification": "AI_GENERATED", "confidenceScore": 0.91}
+
+
+@pytest.fixture
+def model_version(monkeypatch):
+    monkeypatch.setattr(model_loader, "MODEL_VERSION", "model-1")
+
+
+def test_nothing_is_cached_with_the_mock_model(monkeypatch, tmp_path):
+    monkeypatch.setattr(model_loader, "MODEL_VERSION", "mock")
+    cache = VerdictCache(disk_path=str(tmp_path / "verdicts.db"))
+    cache.put("clip", VERDICT)
+    cache.flush()
+    assert cache.get("clip") is None
+    assert cache.stats()["entries"] == 0 and cache.stats()["diskEntries"] == 0
+
+
+def test_queued_rows_reach_the_disk_tier(model_version, tmp_path):
+    path = str(tmp_path / "verdicts.db")
+    cache = VerdictCache(disk_path=path)
+    for i in range(10):
+        cache.put(f"clip-{i}", VERDICT)
+    cache.flush()
+    assert cache.stats()["pendingDiskWrites"] == 0
+
+    restarted = VerdictCache(disk_path=path)
+    assert restarted.get("clip-3") == VERDICT
+    assert restarted.stats()["diskHits"] == 1
+
+
+def test_new_model_purges_old_rows(monkeypatch, model_version, tmp_path):
+    path = str(tmp_path / "verdicts.db")
+    cache = VerdictCache(disk_path=path)
+    cache.put("clip", VERDICT)
+    cache.flush()
+
+    monkeypatch.setattr(model_loader, "MODEL_VERSION", "model-2")
+    assert cache.get("clip") is None
+    cache.flush()
+    assert cache.stats()["diskEntries"] == 0
+
+
+def test_put_does_not_wait_for_sqlite(model_version, tmp_path):
+    cache = VerdictCache(disk_path=str(tmp_path / "verdicts.db"))
+    cache.get("warm")
+    cache.flush()
+    done = threading.Event()
+    # A slow commit holds the SQLite lock; memory hits and puts must not queue behind it
+    with cache._db_lock:
+        thread = threading.Thread(target=lambda: (cache.put("clip", VERDICT), done.set()))
+        thread.start()
+        assert done.wait(2.0)
+        assert cache.get("clip") == VERDICT
+    thread.join()
+    cache.flush()
+    assert cache.stats()["diskEntries"] == 1
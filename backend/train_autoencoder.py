@@ -9,6 +9,8 @@ import tensorflow as tf
 from tensorflow.keras import layers, models
 import joblib
 import os
+import sys
+import argparse
 
 # Configuration
 INPUT_DIM = 50 # 5 Pitch + 6 Spectral + 39 MFCC
@@ -32,32 +34,68 @@ def build_autoencoder(input_dim, latent_dim):
     autoencoder.compile(optimizer='adam', loss='mse')
     return autoencoder
 
-def train_one_class_model(ai_features_path):
+def _open_store(path):
+    # The feature store lives with the training scripts
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "training"))
+    from feature_store import FeatureStore
+    return FeatureStore(path)
+
+def _stream_reconstruction_mse(ae, store, indices, scaler):
+    mse = []
+    for X, _ in store.batches(65536, indices):
+        X_scaled = scaler.transform(X)
+        mse.append(np.mean(np.square(X_scaled - ae.predict(X_scaled, verbose=0)), axis=1))
+    return np.concatenate(mse)
+
+def train_one_class_model(ai_features_path, stream=False):
     """
     Args:
-        ai_features_path: Path to .npy file containing AI feature vectors (N, 50)
+        ai_features_path: Path to .npy file containing AI feature vectors (N, 50),
+            or a feature store version directory (training/feature_store/v<N>), whose AI rows are used
+        stream: with a feature store, fit batch by batch from the memory-mapped shards
     """
     if not os.path.exists(ai_features_path):
         print("❌ Error: AI Training features not found. Please run feature extraction first.")
         return
 
-    # Load AI-only data
-    X_train = np.load(ai_features_path)
-    
-    # Scale Data
     from sklearn.preprocessing import StandardScaler
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    
-    # Build and Train
-    ae = build_autoencoder(INPUT_DIM, LATENT_DIM)
-    print("🚀 Training One-Class Autoencoder on AI samples...")
-    ae.fit(X_train_scaled, X_train_scaled, epochs=EPOCHS, batch_size=BATCH_SIZE, validation_split=0.1, verbose=1)
-    
+    if os.path.isdir(ai_features_path) and stream:
+        # Larger-than-RAM store: streaming scaler fit, batched training and threshold
+        store = _open_store(ai_features_path)
+        from feature_store import fit_scaler, keras_batches
+        ai_idx = np.random.default_rng(0).permutation(store.select(label=1))
+        n_val = len(ai_idx) // 10
+        train_idx, val_idx = ai_idx[n_val:], ai_idx[:n_val]
+        scaler = fit_scaler(store, train_idx)
+
+        ae = build_autoencoder(store.n_features, LATENT_DIM)
+        print("🚀 Training One-Class Autoencoder on AI samples (streamed)...")
+        ae.fit(keras_batches(store, train_idx, scaler, BATCH_SIZE, target="input", seed=0),
+               validation_data=keras_batches(store, val_idx, scaler, 4096, target="input", shuffle=False),
+               epochs=EPOCHS, verbose=1)
+        mse = _stream_reconstruction_mse(ae, store, train_idx, scaler)
+    else:
+        # Load AI-only data
+        if os.path.isdir(ai_features_path):
+            store = _open_store(ai_features_path)
+            X_train = store.rows(store.select(label=1))
+        else:
+            X_train = np.load(ai_features_path)
+
+        # Scale Data
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
+
+        # Build and Train
+        ae = build_autoencoder(X_train.shape[1], LATENT_DIM)
+        print("🚀 Training One-Class Autoencoder on AI samples...")
+        ae.fit(X_train_scaled, X_train_scaled, epochs=EPOCHS, batch_size=BATCH_SIZE, validation_split=0.1, verbose=1)
+
+        X_pred = ae.predict(X_train_scaled)
+        mse = np.mean(np.square(X_train_scaled - X_pred), axis=1)
+
     # Calculate Reconstruction Threshold T
     # T = 95th percentile of training MSE
-    X_pred = ae.predict(X_train_scaled)
-    mse = np.mean(np.square(X_train_scaled - X_pred), axis=1)
     threshold_t = np.percentile(mse, 95)
     
     print(f"✅ Training Complete. Recommended Threshold T: {threshold_t:.4f}")
@@ -69,6 +107,13 @@ def train_one_class_model(ai_features_path):
     print("📁 Assets saved to backend/assets/")
 
 if __name__ == "__main__":
-    # Example usage (requires pre-extracted ai_features.npy)
-    # train_one_class_model('data/ai_features.npy')
-    print("Ready for offline training. Provide AI-only feature vector path.")
+    # Example usage: python train_autoencoder.py ../training/feature_store/v1 [--stream]
+    # (or a pre-extracted AI-only ai_features.npy)
+    parser = argparse.ArgumentParser(description="Train the one-class autoencoder on AI feature vectors")
+    parser.add_argument("features", nargs="?", help="ai_features.npy or a feature store version directory")
+    parser.add_argument("--stream", action="store_true", help="stream batches from the feature store")
+    args = parser.parse_args()
+    if args.features is None:
+        print("Ready for offline training. Provide AI-only feature vector path or a feature store.")
+    else:
+        train_one_class_model(args.features, stream=args.stream)
@@ -3,7 +3,7 @@ def validate_api_key(request, expected_key):
 
 
 def validate_request_json(data):
-    if not data:
+    if not isinstance(data, dict) or not data:
         return "Invalid JSON body"
 
     # Language is now optional - backend will auto-detect it
@@ -12,8 +12,64 @@ def validate_request_json(data):
         if field not in data:
             return f"Missing field: {field}"
 
+    if not isinstance(data["audioBase64"], str):
+        return "audioBase64 must be a string"
+    if data.get("language") is not None and not isinstance(data["language"], str):
+        return "language must be a string"
+
     # Strictly accept only MP3 files as requested
+    if not isinstance(data["audioFormat"], str):
+        return "audioFormat must be a string"
     if data["audioFormat"].lower() != "mp3":
         return f"Format {data['audioFormat']} not supported. Only MP3 audio is allowed."
 
     return None
+
+
+def validate_batch_request_json(data, max_items):
+    if not isinstance(data, dict) or not data:
+        return "Invalid JSON body"
+
+    items = data.get("items")
+    if not isinstance(items, list) or not items:
+        return "Missing field: items (non-empty list)"
+
+    if len(items) > max_items:
+        return f"Too many items: {len(items)} (maximum is {max_items})"
+
+    return None
+
+
+def validate_binary_upload(audio, filename=None, mimetype=None):
+    # Multipart uploads must look like MP3; raw bodies are already gated on Content-Type
+    if filename is not None or mimetype is not None:
+        is_mp3_name = bool(filename) and filename.lower().endswith(".mp3")
+        if not is_mp3_name and mimetype not in ("audio/mpeg", "audio/mp3"):
+            return "Only MP3 audio is allowed."
+
+    if isinstance(audio, (bytes, bytearray)):
+        empty = len(audio) == 0
+    else:
+        # File-like upload: peek without consuming the stream
+        position = audio.tell()
+        empty = not audio.read(1)
+        audio.seek(position)
+    if empty:
+        return "Empty audio body"
+
+    return None
+
+
+def validate_stream_start(message, encodings):
+    if not isinstance(message, dict) or message.get("type") != "start":
+        return "First message must be a JSON start message"
+
+    sample_rate = message.get("sampleRate")
+    if not isinstance(sample_rate, int) or not 8000 <= sample_rate <= 48000:
+        return "sampleRate must be an integer between 8000 and 48000"
+
+    encoding = message.get("encoding", "pcm_s16le")
+    if encoding not in encodings:
+        return f"Encoding {encoding} not supported. Use one of: {', '.join(encodings)}"
+
+    return None
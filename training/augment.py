@@ -0,0 +1,172 @@
+"""
+On-the-fly audio augmentation for training (telephony conditions).
+
+Each clip is expanded into several variants held in one (variants, samples)
+array, and every transform is applied to a random subset of the rows at once:
+
+  narrowband  round trip through an 8 kHz telephone channel (resample_poly on the rows)
+  codec       low-pass at a per-row cutoff with a raised-cosine roll-off (FFT domain)
+  noise       additive white noise at a per-row SNR
+  gain        per-row gain in dB
+  clipping    hard clipping at a per-row fraction of the row's peak
+
+Randomness comes from SeedSequence([seed, epoch, clip index]), so a variant
+depends only on those three numbers and not on which worker produced it.
+Variants go straight into the backend's batched feature extractor; nothing is
+written to disk. augmented_batches() feeds Keras a fresh set of variants every
+epoch.
+"""
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.signal import resample_poly
+
+from extract_features import load_audio, speech_only
+from audio.audio_decoder import resample_ratio
+from features.batch_features import extract_features_batch
+
+# Probability per variant and parameter ranges of each transform, applied in this order
+AUGMENT_CONFIG = {
+    "narrowband": {"p": 0.5, "sr": 8000},
+    "codec": {"p": 0.5, "cutoff_hz": (3000.0, 7000.0), "rolloff_hz": 500.0},
+    "noise": {"p": 0.7, "snr_db": (5.0, 30.0)},
+    "gain": {"p": 0.8, "db": (-12.0, 6.0)},
+    "clipping": {"p": 0.2, "ratio": (0.3, 0.9)},
+}
+
+
+def augment(y, sr, variants, rng, config=AUGMENT_CONFIG):
+    """Returns a (variants, len(y)) float32 array of independently degraded copies of y."""
+    n = len(y)
+    X = np.repeat(np.asarray(y, dtype=np.float32)[None, :], variants, axis=0)
+
+    def pick(name):
+        rows = rng.random(variants) < config[name]["p"]
+        return rows, int(rows.sum())
+
+    rows, k = pick("narrowband")
+    band_sr = config["narrowband"]["sr"]
+    if k and sr > band_sr:
+        up, down = resample_ratio(sr, band_sr)
+        restored = resample_poly(resample_poly(X[rows], up, down, axis=1), down, up, axis=1)
+        X[rows] = np.pad(restored, ((0, 0), (0, max(0, n - restored.shape[1]))))[:, :n]
+
+    rows, k = pick("codec")
+    if k:
+        cutoff = rng.uniform(*config["codec"]["cutoff_hz"], size=k)[:, None]
+        freqs = np.fft.rfftfreq(n, 1.0 / sr)[None, :]
+        rolloff = np.clip((freqs - cutoff) / config["codec"]["rolloff_hz"], 0.0, 1.0)
+        response = 0.5 * (1.0 + np.cos(np.pi * rolloff))
+        X[rows] = np.fft.irfft(np.fft.rfft(X[rows], axis=1) * response, n=n, axis=1)
+
+    rows, k = pick("noise")
+    if k:
+        snr_db = rng.uniform(*config["noise"]["snr_db"], size=k)
+        signal_power = np.mean(np.square(X[rows], dtype=np.float64), axis=1)
+        noise_std = np.sqrt(signal_power / 10.0 ** (snr_db / 10.0))
+        X[rows] += (rng.standard_normal((k, n)) * noise_std[:, None]).astype(np.float32)
+
+    rows, k = pick("gain")
+    if k:
+        X[rows] *= (10.0 ** (rng.uniform(*config["gain"]["db"], size=k) / 20.0)).astype(np.float32)[:, None]
+
+    rows, k = pick("clipping")
+    if k:
+        threshold = rng.uniform(*config["clipping"]["ratio"], size=k) * np.abs(X[rows]).max(axis=1)
+        X[rows] = np.clip(X[rows], -threshold[:, None], threshold[:, None])
+
+    return X
+
+
+def _augment_clip(task):
+    """Worker entry point: (features (m, 45), label) for one clip's variants; failed variants are dropped."""
+    index, path, label, variants, seed, epoch = task
+    try:
+        y, sr = load_audio(path)
+    except Exception as e:
+        print(f"⚠️ WARNING: Skipping {path}: {e}")
+        return np.empty((0, 0)), label
+    rng = np.random.default_rng(np.random.SeedSequence([seed, epoch, index]))
+    X = augment(y, sr, variants, rng)
+    waveforms = [speech_only(x, sr) for x in X]
+    vectors = [v for v in extract_features_batch(waveforms, [sr] * variants) if not isinstance(v, Exception)]
+    return np.array(vectors, dtype=np.float64), label
+
+
+def augmented_features(clips, variants=4, seed=0, epoch=0, workers=None):
+    """
+    Yields (X, y) per clip with `variants` augmented feature vectors each, in
+    input order. clips is [(index, path, label)]; index (e.g. the feature store
+    row) seeds the clip's randomness. Work is spread over `workers` processes.
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = [(index, path, label, variants, seed, epoch) for index, path, label in clips]
+    # spawn: the training scripts import TensorFlow, which is not fork-safe
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        chunksize = max(1, len(tasks) // (workers * 8))
+        for X, label in executor.map(_augment_clip, tasks, chunksize=chunksize):
+            if len(X):
+                yield X, np.full(len(X), label)
+
+
+def epoch_variants(clips, variants, seed, epoch, workers=None):
+    """One epoch's augmented features of every clip, concatenated as (X, y)."""
+    parts = list(augmented_features(clips, variants, seed, epoch, workers))
+    if not parts:
+        return np.empty((0, 0)), np.empty(0)
+    return np.concatenate([X for X, _ in parts]), np.concatenate([y for _, y in parts])
+
+
+def augmented_batches(X_clean, y_clean, clips, scaler, variants, seed=0, batch_size=16, workers=None,
+                      first_epoch=None):
+    """
+    Keras input over the clean training rows plus new augmented variants of
+    `clips` every epoch: Keras epoch e uses SeedSequence epoch e, regenerated in
+    on_epoch_begin (Keras may call on_epoch_end before the first epoch, so it
+    is not used). first_epoch is epoch 0's (X, y) when the caller already has it
+    (e.g. to fit the scaler). The epoch length stays that of epoch 0; if some
+    variants fail later, the rest are resampled to fill it.
+    """
+    import tensorflow as tf
+
+    X_clean = scaler.transform(X_clean).astype(np.float32)
+    y_clean = np.asarray(y_clean, dtype=np.float32)
+
+    class AugmentedBatches(tf.keras.utils.Sequence):
+        def __init__(self):
+            super().__init__()
+            self.epoch = -1  # on_epoch_begin moves to 0 with the variants built here
+            self.rng = np.random.default_rng(seed)
+            X_aug, y_aug = first_epoch if first_epoch is not None else epoch_variants(
+                clips, variants, seed, 0, workers)
+            self.n_variants = len(X_aug)
+            self._use(X_aug, y_aug)
+
+        def _use(self, X_aug, y_aug):
+            if not len(X_aug) and self.n_variants:
+                # Every variant failed: keep the previous epoch's
+                self.order = self.rng.permutation(len(self.X))
+                return
+            if len(X_aug) != self.n_variants:
+                pick = self.rng.choice(len(X_aug), self.n_variants, replace=len(X_aug) < self.n_variants)
+                X_aug, y_aug = X_aug[pick], y_aug[pick]
+            parts = [X_clean] + ([scaler.transform(X_aug).astype(np.float32)] if self.n_variants else [])
+            self.X = np.concatenate(parts)
+            self.y = np.concatenate([y_clean, np.asarray(y_aug, dtype=np.float32)])
+            self.order = self.rng.permutation(len(self.X))
+
+        def __len__(self):
+            return (len(X_clean) + self.n_variants + batch_size - 1) // batch_size
+
+        def __getitem__(self, i):
+            batch = self.order[i * batch_size:(i + 1) * batch_size]
+            return self.X[batch], self.y[batch]
+
+        def on_epoch_begin(self):
+            self.epoch += 1
+            if self.epoch > 0:
+                self._use(*epoch_variants(clips, variants, seed, self.epoch, workers))
+
+    return AugmentedBatches()
@@ -1,27 +1,120 @@
+"""
+Builds the (X, y) training matrix from training/data/{human,ai}.
+
+Feature extraction runs in a process pool, EXTRACT_CHUNK files per batched
+call (the backend's batch extractor), and every file's feature vector is
+cached on disk under FEATURE_CACHE_DIR/v<EXTRACTOR_VERSION>/<sha256>.npz
+(features + duration). The key is the file's content hash, so renamed or
+copied clips hit the cache while edited ones are re-extracted. Bump
+EXTRACTOR_VERSION in extract_features.py whenever the features change; old
+versions are simply never read again.
+
+Files are visited in sorted order, so X is identical across runs and machines.
+Scripts importing this module use the spawn start method and must keep their
+top-level code under `if __name__ == "__main__":`.
+"""
 import os
 import json
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
-from extract_features import extract_all_features
+from extract_features import extract_files_features, EXTRACTOR_VERSION
 
 DATA_DIR = "training/data"
 HUMAN_DIR = os.path.join(DATA_DIR, "human")
 AI_DIR = os.path.join(DATA_DIR, "ai")
+FEATURE_CACHE_DIR = os.getenv("FEATURE_CACHE_DIR", "training/feature_cache")
+EXTRACT_CHUNK = 32
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _extract(paths):
+    """Worker entry point: (features, duration, None) or (None, None, error message) per path."""
+    results = []
+    for outcome in extract_files_features(paths):
+        if isinstance(outcome, Exception):
+            results.append((None, None, f"{type(outcome).__name__}: {outcome}"))
+        else:
+            results.append((np.asarray(outcome[0], dtype=np.float64), outcome[1], None))
+    return results
+
+
+def list_dataset_files():
+    """[(path, label)] for every clip, sorted by path (0 = HUMAN, 1 = AI_GENERATED)."""
+    files = []
+    for directory, label in ((HUMAN_DIR, 0), (AI_DIR, 1)):
+        for file in sorted(os.listdir(directory)):
+            files.append((os.path.join(directory, file), label))
+    return files
+
+
+def _load_entry(cache_path):
+    with np.load(cache_path) as entry:
+        return entry["features"], float(entry["duration"])
+
+
+def collect_dataset(workers=None, cache_dir=FEATURE_CACHE_DIR):
+    """
+    Returns [(path, label, features, duration)] for the whole corpus. Only files
+    whose content hash is not in the cache are extracted, across `workers`
+    processes (default: every core). Unreadable clips are reported and left out.
+    """
+    version_dir = os.path.join(cache_dir, f"v{EXTRACTOR_VERSION}")
+    os.makedirs(version_dir, exist_ok=True)
+
+    entries = []  # (path, label, cache path)
+    for path, label in list_dataset_files():
+        entries.append((path, label, os.path.join(version_dir, file_hash(path) + ".npz")))
+
+    loaded = {}  # cache path -> (features, duration)
+    to_extract = {}  # cache path -> one file with that content
+    for path, _, cache_path in entries:
+        if cache_path in loaded or cache_path in to_extract:
+            continue
+        if os.path.exists(cache_path):
+            loaded[cache_path] = _load_entry(cache_path)
+        else:
+            # Duplicate clips share a cache entry; extract each distinct content once
+            to_extract[cache_path] = path
+    cached = sum(1 for _, _, cache_path in entries if cache_path in loaded)
+
+    failed = set()
+    if to_extract:
+        workers = workers or os.cpu_count() or 1
+        paths = list(to_extract.values())
+        print(f"Extracting features for {len(paths)} new or changed files ({workers} workers)...")
+        # spawn: the training scripts import TensorFlow, which is not fork-safe
+        chunks = [paths[i:i + EXTRACT_CHUNK] for i in range(0, len(paths), EXTRACT_CHUNK)]
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            outcomes = (outcome for chunk in executor.map(_extract, chunks) for outcome in chunk)
+            for cache_path, path, (vector, duration, error) in zip(to_extract, paths, outcomes):
+                if vector is None:
+                    print(f"⚠️ WARNING: Skipping {path}: {error}")
+                    failed.add(cache_path)
+                    continue
+                # Write-then-rename so an interrupted run never leaves a truncated entry
+                tmp_path = cache_path + ".tmp.npz"
+                np.savez(tmp_path, features=vector, duration=duration)
+                os.replace(tmp_path, cache_path)
+                loaded[cache_path] = (vector, duration)
+
+    records = [(path, label) + loaded[cache_path] for path, label, cache_path in entries if cache_path not in failed]
+    print(f"✅ Dataset: {len(records)} files ({len(to_extract) - len(failed)} extracted, "
+          f"{cached} from cache, {len(failed)} skipped)")
+    return records
+
 
-def build_dataset():
-    X = []
-    y = []
-
-    for file in os.listdir(HUMAN_DIR):
-        path = os.path.join(HUMAN_DIR, file)
-        features = extract_all_features(path)
-        X.append(features)
-        y.append(0)  # HUMAN
-
-    for file in os.listdir(AI_DIR):
-        path = os.path.join(AI_DIR, file)
-        features = extract_all_features(path)
-        X.append(features)
-        y.append(1)  # AI_GENERATED
+def build_dataset(workers=None, cache_dir=FEATURE_CACHE_DIR):
+    """Returns (X, y) for the whole corpus; see collect_dataset."""
+    records = collect_dataset(workers, cache_dir)
+    X = [features for _, _, features, _ in records]
+    y = [label for _, label, _, _ in records]
 
     feature_order = [f"f_{i}" for i in range(len(X[0]))]
 
@@ -1,17 +1,50 @@
+"""
+Confusion matrix and classification report of the trained model on the feature store.
+
+Scores training/model.h5 + training/scaler.pkl, or with --weights a flat
+weights file as served by the backend (e.g. backend/assets/model.int8.weights
+from quantize_model.py).
+
+Usage (from the repository root):
+    python training/evaluate_model.py [--weights backend/assets/model.int8.weights]
+"""
+import argparse
+
 from sklearn.metrics import classification_report, confusion_matrix
 import numpy as np
 import joblib
-import tensorflow as tf
 
-from build_dataset import build_dataset
+from feature_store import open_feature_store
+
+EVAL_BATCH_SIZE = 65536
+
+
+def store_scores(store, score, batch_size=EVAL_BATCH_SIZE):
+    """score(X) -> (n,) for every store row, in store order; batches stream from the memory-mapped shards."""
+    return np.concatenate([np.asarray(score(X), dtype=float).reshape(len(X), -1)[:, 0]
+                           for X, _ in store.batches(batch_size)])
+
+
+# Feature extraction spawns worker processes that re-import this script
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--weights", help="flat weights file to evaluate instead of training/model.h5")
+    args = parser.parse_args()
 
-X, y = build_dataset()
+    # The store built by train_model
+    store = open_feature_store()
 
-scaler = joblib.load("training/scaler.pkl")
-model = tf.keras.models.load_model("training/model.h5")
+    if args.weights:
+        from model.flat_weights import load_flat_weights
+        model, scaler = load_flat_weights(args.weights)
+    else:
+        import tensorflow as tf
+        scaler = joblib.load("training/scaler.pkl")
+        model = tf.keras.models.load_model("training/model.h5")
 
-X_scaled = scaler.transform(X)
-preds = (model.predict(X_scaled) > 0.5).astype(int)
+    probs = store_scores(store, lambda X: model.predict(scaler.transform(X), verbose=0))
+    preds = (probs > 0.5).astype(int)
+    y = store.labels
 
-print(confusion_matrix(y, preds))
-print(classification_report(y, preds, target_names=["HUMAN", "AI_GENERATED"]))
+    print(confusion_matrix(y, preds))
+    print(classification_report(y, preds, target_names=["HUMAN", "AI_GENERATED"]))
@@ -1,49 +1,64 @@
-import librosa
-import numpy as np
+"""
+Training-side feature extraction.
 
-def extract_pitch_features(y, sr):
-    pitches, _ = librosa.piptrack(y=y, sr=sr)
-    pitch_values = pitches[pitches > 0]
+Clips are decoded and featurized with the backend's own code (audio_decoder
+and features/), so the model is trained on exactly the vectors the API
+computes at inference time. Several files at once go through the batched
+extractor (features/batch_features.py). With VAD_ENABLED, non-speech is
+trimmed first (quality/vad.py), as the API does.
+"""
+import os
+import sys
 
-    if len(pitch_values) == 0:
-        return [0.0, 0.0, 0.0]
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+from config import (
+    PITCH_ESTIMATOR, CANONICAL_SAMPLE_RATE, VAD_ENABLED, VAD_THRESHOLD_DB, VAD_HANGOVER_MS, VAD_MIN_SPEECH_SECONDS
+)
+from audio.audio_decoder import decode_mp3
+from features.feature_assembler import extract_all_features as extract_waveform_features
+from features.batch_features import extract_features_batch
+from quality.vad import trim_silence
 
-    return [
-        float(np.mean(pitch_values)),
-        float(np.var(pitch_values)),
-        float(np.max(pitch_values) - np.min(pitch_values))
-    ]
+# Part of the build_dataset feature-cache key: bump the number on any change to
+# the features. The pitch estimator, canonical rate and VAD settings change them
+# too (the same settings as cache/verdict_cache.py FEATURE_SETTINGS).
+EXTRACTOR_VERSION = f"2-{PITCH_ESTIMATOR}-sr{CANONICAL_SAMPLE_RATE}" + (
+    f"-vad{VAD_THRESHOLD_DB:g}-h{VAD_HANGOVER_MS}-m{VAD_MIN_SPEECH_SECONDS:g}" if VAD_ENABLED else "")
 
 
-def extract_spectral_features(y, sr):
-    flatness = librosa.feature.spectral_flatness(y=y)
-    centroid = librosa.feature.spectral_centroid(y=y, sr=sr)
+def load_audio(file_path):
+    with open(file_path, "rb") as f:
+        return decode_mp3(f.read())
 
-    return [
-        float(np.mean(flatness)),
-        float(np.var(flatness)),
-        float(np.var(centroid))
-    ]
 
+def speech_only(y, sr):
+    return trim_silence(y, sr)[0] if VAD_ENABLED else y
 
-def extract_mfcc_features(y, sr):
-    mfcc = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
-    delta = librosa.feature.delta(mfcc)
 
-    features = []
-    features.extend(np.mean(mfcc, axis=1))
-    features.extend(np.var(mfcc, axis=1))
-    features.extend(np.var(delta, axis=1))
+def extract_file_features(file_path):
+    """Returns (features, duration_seconds) for one audio file."""
+    y, sr = load_audio(file_path)
+    return extract_waveform_features(speech_only(y, sr), sr), len(y) / sr
 
-    return [float(x) for x in features]
 
+def extract_files_features(file_paths):
+    """
+    extract_file_features for many files with one batched feature pass. Returns
+    (features, duration_seconds) or the raised exception per file.
+    """
+    results = [None] * len(file_paths)
+    decoded = []  # (index, waveform, sr)
+    for i, path in enumerate(file_paths):
+        try:
+            y, sr = load_audio(path)
+            decoded.append((i, y, sr))
+        except Exception as e:
+            results[i] = e
+    vectors = extract_features_batch([speech_only(y, sr) for _, y, sr in decoded], [sr for _, _, sr in decoded])
+    for (i, y, sr), features in zip(decoded, vectors):
+        results[i] = features if isinstance(features, Exception) else (features, len(y) / sr)
+    return results
 
-def extract_all_features(file_path):
-    y, sr = librosa.load(file_path, sr=None, mono=True)
-
-    features = []
-    features.extend(extract_pitch_features(y, sr))
-    features.extend(extract_spectral_features(y, sr))
-    features.extend(extract_mfcc_features(y, sr))
 
-    return features
+def extract_all_features(file_path):
+    return extract_file_features(file_path)[0]
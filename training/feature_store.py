@@ -0,0 +1,225 @@
+"""
+Versioned, memory-mapped feature store.
+
+Layout of FEATURE_STORE_DIR/v<EXTRACTOR_VERSION>/:
+  features-00000.npy ...  float32 (rows, n_features) shards of SHARD_ROWS rows
+  labels.npy              int8 (rows,)   0 = HUMAN, 1 = AI_GENERATED
+  manifest.json           extractor version, feature order, shard list and one
+                          {path, label, language, duration} entry per row
+
+Shards are opened with mmap_mode="r", so opening a store is instant and costs
+no RAM; pages are read on demand. FeatureStore.features() is zero-copy for a
+single-shard store, and FeatureStore.batches() streams any subset of rows for
+datasets larger than memory.
+
+The store is (re)built from build_dataset's per-file cache, so refreshing it
+only extracts new or changed clips. Clip languages come from the optional
+LANGUAGES_FILE ({"relative/path.mp3": "Hindi"}); other clips are "unknown".
+
+Usage (from the repository root):
+    python training/feature_store.py [--workers N] [--shard-rows 131072]
+"""
+import os
+import json
+import shutil
+import argparse
+
+import numpy as np
+from extract_features import EXTRACTOR_VERSION
+from build_dataset import collect_dataset, DATA_DIR
+
+FEATURE_STORE_DIR = os.getenv("FEATURE_STORE_DIR", "training/feature_store")
+LANGUAGES_FILE = os.path.join(DATA_DIR, "languages.json")
+SHARD_ROWS = 131072  # ~23 MB per shard at 45 float32 features
+STORE_FORMAT = 1
+
+
+def store_path(store_dir=FEATURE_STORE_DIR, version=EXTRACTOR_VERSION):
+    return os.path.join(store_dir, f"v{version}")
+
+
+def _load_languages():
+    if not os.path.exists(LANGUAGES_FILE):
+        return {}
+    with open(LANGUAGES_FILE) as f:
+        return json.load(f)
+
+
+def write_feature_store(records, store_dir=FEATURE_STORE_DIR, shard_rows=SHARD_ROWS):
+    """Writes [(path, label, features, duration)] as a new store version; returns its path."""
+    if not records:
+        raise ValueError("No records to write")
+    path = store_path(store_dir)
+    tmp_path = path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    n_features = len(records[0][2])
+    languages = _load_languages()
+    shards = []
+    for start in range(0, len(records), shard_rows):
+        chunk = records[start:start + shard_rows]
+        name = f"features-{len(shards):05d}.npy"
+        shard = np.lib.format.open_memmap(
+            os.path.join(tmp_path, name), mode="w+", dtype=np.float32, shape=(len(chunk), n_features))
+        shard[:] = [features for _, _, features, _ in chunk]
+        shard.flush()
+        del shard
+        shards.append({"file": name, "rows": len(chunk)})
+    np.save(os.path.join(tmp_path, "labels.npy"), np.array([label for _, label, _, _ in records], dtype=np.int8))
+
+    manifest = {
+        "format": STORE_FORMAT,
+        "extractorVersion": EXTRACTOR_VERSION,
+        "featureOrder": [f"f_{i}" for i in range(n_features)],
+        "numRows": len(records),
+        "shardRows": shard_rows,
+        "shards": shards,
+        "clips": [
+            {
+                "path": file_path,
+                "label": int(label),
+                "language": languages.get(os.path.relpath(file_path, DATA_DIR), "unknown"),
+                "duration": round(float(duration), 4),
+            }
+            for file_path, label, _, duration in records
+        ],
+    }
+    with open(os.path.join(tmp_path, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=1)
+
+    # Swap in the finished version so readers never see a half-written store
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+    return path
+
+
+def build_feature_store(workers=None, store_dir=FEATURE_STORE_DIR, shard_rows=SHARD_ROWS):
+    return write_feature_store(collect_dataset(workers), store_dir, shard_rows)
+
+
+class FeatureStore:
+    def __init__(self, path):
+        with open(os.path.join(path, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        self.path = path
+        self.extractor_version = self.manifest["extractorVersion"]
+        self.feature_order = self.manifest["featureOrder"]
+        self.clips = self.manifest["clips"]
+        self.shard_rows = self.manifest["shardRows"]
+        self.shards = [np.load(os.path.join(path, s["file"]), mmap_mode="r") for s in self.manifest["shards"]]
+        self.labels = np.load(os.path.join(path, "labels.npy"))
+
+    def __len__(self):
+        return self.manifest["numRows"]
+
+    @property
+    def n_features(self):
+        return len(self.feature_order)
+
+    def features(self):
+        """All rows as one array: the memory map itself for a single shard, else a copy."""
+        if len(self.shards) == 1:
+            return self.shards[0]
+        return np.concatenate(self.shards)
+
+    def rows(self, indices):
+        """Features for the given row indices (read from the shards, in the given order)."""
+        indices = np.asarray(indices)
+        out = np.empty((len(indices), self.n_features), dtype=np.float32)
+        shard_ids = indices // self.shard_rows
+        for shard_id in np.unique(shard_ids):
+            mask = shard_ids == shard_id
+            out[mask] = self.shards[shard_id][indices[mask] - shard_id * self.shard_rows]
+        return out
+
+    def batches(self, batch_size=4096, indices=None, shuffle=False, seed=None):
+        """
+        Yields (X, y) batches over `indices` (default: every row). Each batch is
+        read in sorted order, so a shuffled pass still touches the shards sequentially within a batch.
+        """
+        indices = np.arange(len(self)) if indices is None else np.asarray(indices)
+        if shuffle:
+            indices = np.random.default_rng(seed).permutation(indices)
+        for start in range(0, len(indices), batch_size):
+            batch = np.sort(indices[start:start + batch_size])
+            yield self.rows(batch), self.labels[batch]
+
+    def select(self, label=None, language=None):
+        """Row indices matching the given label and/or language."""
+        mask = np.ones(len(self), dtype=bool)
+        if label is not None:
+            mask &= self.labels == label
+        if language is not None:
+            mask &= np.array([clip["language"] == language for clip in self.clips])
+        return np.flatnonzero(mask)
+
+
+def open_feature_store(store_dir=FEATURE_STORE_DIR, refresh=False, workers=None):
+    """
+    Opens the store for the current EXTRACTOR_VERSION, building it when missing.
+    refresh=True rebuilds it from the corpus first (only new or changed files are extracted).
+    """
+    path = store_path(store_dir)
+    if refresh or not os.path.exists(os.path.join(path, "manifest.json")):
+        path = build_feature_store(workers, store_dir)
+    store = FeatureStore(path)
+    print(f"📁 Feature store v{store.extractor_version}: {len(store)} rows x {store.n_features} features, "
+          f"{len(store.shards)} shard(s) in {store.path}")
+    return store
+
+
+def keras_batches(store, indices, scaler, batch_size=32, target="label", shuffle=True, seed=None):
+    """
+    Keras input that streams scaled rows from the store, one epoch per pass over
+    `indices`. target="label" yields (X, y); target="input" yields (X, X) for the autoencoder.
+    """
+    import tensorflow as tf
+
+    class StoreBatches(tf.keras.utils.Sequence):
+        def __init__(self):
+            super().__init__()
+            self.order = np.asarray(indices)
+            self.rng = np.random.default_rng(seed)
+            self.on_epoch_end()
+
+        def __len__(self):
+            return (len(self.order) + batch_size - 1) // batch_size
+
+        def __getitem__(self, i):
+            batch = np.sort(self.order[i * batch_size:(i + 1) * batch_size])
+            X = scaler.transform(store.rows(batch)).astype(np.float32)
+            return X, (store.labels[batch].astype(np.float32) if target == "label" else X)
+
+        def on_epoch_end(self):
+            if shuffle:
+                self.order = self.rng.permutation(self.order)
+
+    return StoreBatches()
+
+
+def train_val_split(store):
+    """train_model's stratified 80/20 split: (train_idx, val_idx) row indices."""
+    from sklearn.model_selection import train_test_split
+
+    return train_test_split(np.arange(len(store)), test_size=0.2, random_state=42, stratify=store.labels)
+
+
+def fit_scaler(store, indices, batch_size=65536):
+    """StandardScaler fitted in one streaming pass (partial_fit) over the given rows."""
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler()
+    for X, _ in store.batches(batch_size, indices):
+        scaler.partial_fit(X.astype(np.float64))
+    return scaler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--shard-rows", type=int, default=SHARD_ROWS)
+    args = parser.parse_args()
+    store = FeatureStore(build_feature_store(args.workers, shard_rows=args.shard_rows))
+    print(f"📁 Feature store v{store.extractor_version}: {len(store)} rows x {store.n_features} features, "
+          f"{len(store.shards)} shard(s) in {store.path}")
@@ -0,0 +1,148 @@
+"""
+Quantizes the trained Dense model to int8 or float16 weights and publishes it
+to backend/assets only if it passes an accuracy gate against the float model.
+
+Models:
+  classifier   training/model.h5 + training/scaler.pkl (train_model.py);
+               a clip is AI when its probability is > 0.5
+  autoencoder  backend/assets/model.h5 + scaler.pkl (backend/train_autoencoder.py);
+               a clip is AI when its reconstruction MSE is within the float
+               model's 95th percentile on AI rows (train_autoencoder's threshold T)
+
+int8 input scales are calibrated on --calibration-rows rows the float model
+was trained on: train_model's training split for the classifier, AI rows for
+the autoencoder. Validation rows are never used, so the gate does not see
+calibration data as held-out data. See backend/model/quantized_backend.py.
+float16 needs no calibration.
+
+Gate: every row of the feature store (what evaluate_model.py reports on) is
+scored by the float model and by the quantized file as the server loads it. The
+file is published only when the decisions agree on at least --min-agreement of the rows and
+accuracy drops by at most --max-accuracy-drop. Otherwise it is discarded and
+the script exits with status 1, which stops a deployment pipeline. Classifier
+weights go to backend/assets/model.<mode>.weights (served with
+MODEL_BACKEND=<mode>); autoencoder weights go to autoencoder.<mode>.weights, so
+its reconstructions can never be served as AI probabilities.
+
+Usage (from the repository root):
+    python training/quantize_model.py [--mode int8|float16|all] [--kind classifier|autoencoder]
+        [--min-agreement 0.995] [--max-accuracy-drop 0.005] [--calibration-rows 4096]
+"""
+import argparse
+import os
+
+import joblib
+import numpy as np
+import tensorflow as tf
+
+from feature_store import open_feature_store, train_val_split
+from evaluate_model import store_scores
+from save_artifacts import ASSETS_DIR, time_single_row
+from model.flat_weights import save_flat_weights, load_flat_weights
+from model.numpy_backend import NumpyDenseModel, NumpyScaler, dense_layers_from_keras
+from model.quantized_backend import QUANTIZATIONS, quantize_int8
+
+MODELS = {
+    "classifier": ("training/model.h5", "training/scaler.pkl"),
+    "autoencoder": (os.path.join(ASSETS_DIR, "model.h5"), os.path.join(ASSETS_DIR, "scaler.pkl")),
+}
+# Published file name prefix per kind; only "model" is loaded by model_loader
+ARTIFACT_NAMES = {"classifier": "model", "autoencoder": "autoencoder"}
+AUTOENCODER_PERCENTILE = 95
+MIN_AGREEMENT = 0.995
+MAX_ACCURACY_DROP = 0.005
+CALIBRATION_ROWS = 4096
+
+
+def make_scorer(kind, model, scaler):
+    """X -> (n,) AI probability (classifier) or reconstruction MSE (autoencoder)."""
+    if kind == "classifier":
+        return lambda X: model.predict(scaler.transform(X)).reshape(-1)
+
+    def reconstruction_mse(X):
+        X_scaled = scaler.transform(X)
+        return np.mean(np.square(X_scaled - model.predict(X_scaled)), axis=1)
+    return reconstruction_mse
+
+
+def calibration_indices(kind, store, calibration_rows=CALIBRATION_ROWS, seed=0):
+    """Sorted sample of the rows the float model was trained on."""
+    pool = store.select(label=1) if kind == "autoencoder" else train_val_split(store)[0]
+    rng = np.random.default_rng(seed)
+    return np.sort(rng.choice(pool, min(calibration_rows, len(pool)), replace=False))
+
+
+def compare(kind, reference, candidate, labels, threshold):
+    """Accuracy of both models and agreement of their decisions over the store."""
+    if kind == "classifier":
+        ref_ai, cand_ai = reference > threshold, candidate > threshold
+    else:
+        ref_ai, cand_ai = reference <= threshold, candidate <= threshold
+    return {
+        "float_accuracy": float(np.mean(ref_ai == labels)),
+        "accuracy": float(np.mean(cand_ai == labels)),
+        "agreement": float(np.mean(ref_ai == cand_ai)),
+        "max_abs_diff": float(np.max(np.abs(reference - candidate))),
+    }
+
+
+def quantize_model(kind="classifier", modes=QUANTIZATIONS, min_agreement=MIN_AGREEMENT,
+                   max_accuracy_drop=MAX_ACCURACY_DROP, calibration_rows=CALIBRATION_ROWS, seed=0):
+    """Returns {mode: (passed, report)}; only passing modes are written to ASSETS_DIR."""
+    model_path, scaler_path = MODELS[kind]
+    keras_model = tf.keras.models.load_model(model_path, compile=False)
+    scaler = joblib.load(scaler_path)
+    float_model = NumpyDenseModel(dense_layers_from_keras(keras_model))
+    float_scaler = NumpyScaler(scaler.mean_, scaler.scale_)
+
+    store = open_feature_store()
+    labels = store.labels.astype(bool)
+    reference = store_scores(store, make_scorer(kind, float_model, float_scaler))
+    ai_rows = store.select(label=1)
+    threshold = 0.5 if kind == "classifier" else float(np.percentile(reference[ai_rows], AUTOENCODER_PERCENTILE))
+
+    calibration = store.rows(calibration_indices(kind, store, calibration_rows, seed))
+    X_row = float_scaler.transform(float_scaler.mean_.reshape(1, -1))
+
+    os.makedirs(ASSETS_DIR, exist_ok=True)
+    results = {}
+    for mode in modes:
+        model = quantize_int8(float_model, float_scaler.transform(calibration)) if mode == "int8" else float_model
+        target = os.path.join(ASSETS_DIR, f"{ARTIFACT_NAMES[kind]}.{mode}.weights")
+        candidate_path = save_flat_weights(model, float_scaler, target + ".candidate", quantization=mode)
+        # Gate the file exactly as the server will load it
+        q_model, q_scaler = load_flat_weights(candidate_path)
+        report = compare(kind, reference, store_scores(store, make_scorer(kind, q_model, q_scaler)), labels, threshold)
+        report["size_kb"] = os.path.getsize(candidate_path) / 1024
+        passed = (report["agreement"] >= min_agreement
+                  and report["float_accuracy"] - report["accuracy"] <= max_accuracy_drop)
+
+        print(f"{mode}: accuracy {report['accuracy']:.4f} (float {report['float_accuracy']:.4f}), "
+              f"agreement {report['agreement']:.4f}, max |diff| {report['max_abs_diff']:.2e}, "
+              f"{report['size_kb']:.1f} KiB; single-row latency float "
+              f"{time_single_row(float_model.predict, X_row):.3f} ms, {mode} {time_single_row(q_model.predict, X_row):.3f} ms")
+        if passed:
+            os.replace(candidate_path, target)
+            served = f" (MODEL_BACKEND={mode})" if kind == "classifier" else ""
+            print(f"📁 {mode} weights published to {target}{served}")
+        else:
+            os.remove(candidate_path)
+            print(f"❌ {mode} weights rejected: agreement must be >= {min_agreement} "
+                  f"and accuracy drop <= {max_accuracy_drop}")
+        results[mode] = (passed, report)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=QUANTIZATIONS + ("all",), default="int8")
+    parser.add_argument("--kind", choices=tuple(MODELS), default="classifier")
+    parser.add_argument("--min-agreement", type=float, default=MIN_AGREEMENT)
+    parser.add_argument("--max-accuracy-drop", type=float, default=MAX_ACCURACY_DROP)
+    parser.add_argument("--calibration-rows", type=int, default=CALIBRATION_ROWS)
+    args = parser.parse_args()
+
+    modes = QUANTIZATIONS if args.mode == "all" else (args.mode,)
+    results = quantize_model(args.kind, modes, args.min_agreement, args.max_accuracy_drop, args.calibration_rows)
+    if not all(passed for passed, _ in results.values()):
+        raise SystemExit(1)
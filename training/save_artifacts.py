@@ -0,0 +1,79 @@
+"""
+Publishes the trained artifacts to backend/assets.
+
+Copies training/model.h5 and training/scaler.pkl, then exports the Dense weights
+and scaler statistics into backend/assets/model.npz for the NumPy inference
+backend, plus the same arrays as backend/assets/model.weights for the
+memory-mapped backend. The export is only published after a parity check
+against Keras.
+"""
+import os
+import shutil
+import sys
+import time
+
+import joblib
+import numpy as np
+import tensorflow as tf
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+from model.numpy_backend import export_numpy_artifacts, load_numpy_artifacts
+from model.flat_weights import save_flat_weights
+
+MODEL_PATH = "training/model.h5"
+SCALER_PATH = "training/scaler.pkl"
+ASSETS_DIR = "backend/assets"
+PARITY_TOLERANCE = 1e-5
+
+
+def verify_parity(keras_model, scaler, npz_path, n_samples=1000, seed=0):
+    """
+    Scores the same inputs with Keras and the NumPy backend.
+    Inputs are drawn around the scaler's training distribution (mean +- 3 std).
+    Returns the max absolute difference in predicted probability.
+    """
+    rng = np.random.default_rng(seed)
+    X = scaler.mean_ + scaler.scale_ * rng.normal(scale=3.0, size=(n_samples, scaler.n_features_in_))
+
+    np_model, np_scaler = load_numpy_artifacts(npz_path)
+    keras_out = keras_model.predict(scaler.transform(X), verbose=0)
+    numpy_out = np_model.predict(np_scaler.transform(X))
+    return float(np.max(np.abs(keras_out - numpy_out)))
+
+
+def time_single_row(predict, X_row, repeats=200):
+    predict(X_row)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        predict(X_row)
+    return (time.perf_counter() - start) / repeats * 1e3
+
+
+def save_artifacts():
+    model = tf.keras.models.load_model(MODEL_PATH)
+    scaler = joblib.load(SCALER_PATH)
+
+    os.makedirs(ASSETS_DIR, exist_ok=True)
+    tmp_npz = os.path.join(ASSETS_DIR, "model.tmp.npz")
+    export_numpy_artifacts(model, scaler, tmp_npz)
+
+    max_diff = verify_parity(model, scaler, tmp_npz)
+    print(f"Parity Keras vs NumPy: max |diff| = {max_diff:.2e}")
+    if max_diff > PARITY_TOLERANCE:
+        os.remove(tmp_npz)
+        raise SystemExit(f"❌ NumPy export differs from Keras by more than {PARITY_TOLERANCE}")
+
+    np_model, np_scaler = load_numpy_artifacts(tmp_npz)
+    X_row = scaler.transform(scaler.mean_.reshape(1, -1))
+    print(f"Single-row latency: keras {time_single_row(lambda x: model.predict(x, verbose=0), X_row):.3f} ms, "
+          f"numpy {time_single_row(np_model.predict, X_row):.3f} ms")
+
+    shutil.copy(MODEL_PATH, os.path.join(ASSETS_DIR, "model.h5"))
+    shutil.copy(SCALER_PATH, os.path.join(ASSETS_DIR, "scaler.pkl"))
+    save_flat_weights(np_model, np_scaler, os.path.join(ASSETS_DIR, "model.weights"))
+    os.replace(tmp_npz, os.path.join(ASSETS_DIR, "model.npz"))
+    print(f"📁 Artifacts saved to {ASSETS_DIR}/ (model.h5, scaler.pkl, model.npz, model.weights)")
+
+
+if __name__ == "__main__":
+    save_artifacts()
@@ -1,50 +1,101 @@
+"""
+Trains the HUMAN vs AI_GENERATED classifier from the feature store.
+
+By default the store is loaded whole (zero-copy for a single shard). --stream
+fits the scaler and the model batch by batch from the memory-mapped shards,
+for stores larger than RAM. --refresh re-syncs the store with training/data first.
+--augment N adds N telephony-degraded variants of every training clip
+(training/augment.py), generated in memory and drawn anew every epoch; the
+validation split stays clean.
+
+The StandardScaler is fitted on the training split only (train_val_split), in
+every mode, so validation rows never leak into the scaling. Before the feature
+store it was fitted on every row, so retraining publishes a slightly different
+training/scaler.pkl. Publish it only with the model trained against it
+(training/save_artifacts.py copies both).
+
+Usage (from the repository root):
+    python training/train_model.py [--refresh] [--stream] [--workers N] [--augment N] [--seed 0]
+"""
+import argparse
+
 import numpy as np
 from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Dense
 from tensorflow.keras.callbacks import EarlyStopping
 from tensorflow.keras.optimizers import Adam
 import joblib
 
-from build_dataset import build_dataset
-
-X, y = build_dataset()
-
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
-
-X_train, X_val, y_train, y_val = train_test_split(
-    X_scaled, y, test_size=0.2, random_state=42, stratify=y
-)
-
-model = Sequential([
-    Dense(64, activation="relu", input_shape=(X_train.shape[1],)),
-    Dense(32, activation="relu"),
-    Dense(1, activation="sigmoid")
-])
-
-model.compile(
-    optimizer=Adam(learning_rate=0.001),
-    loss="binary_crossentropy",
-    metrics=["accuracy"]
-)
-
-early_stop = EarlyStopping(
-    monitor="val_loss",
-    patience=5,
-    restore_best_weights=True
-)
-
-model.fit(
-    X_train,
-    y_train,
-    validation_data=(X_val, y_val),
-    epochs=50,
-    batch_size=16,
-    callbacks=[early_stop],
-    verbose=1
-)
-
-model.save("training/model.h5")
-joblib.dump(scaler, "training/scaler.pkl")
+from feature_store import open_feature_store, train_val_split, fit_scaler, keras_batches
+from augment import epoch_variants, augmented_batches
+
+# Feature extraction spawns worker processes that re-import this script
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--refresh", action="store_true", help="rebuild the feature store from training/data")
+    parser.add_argument("--stream", action="store_true", help="train from memory-mapped batches")
+    parser.add_argument("--workers", type=int, default=None, help="feature extraction processes")
+    parser.add_argument("--augment", type=int, default=0, help="augmented variants per training clip")
+    parser.add_argument("--seed", type=int, default=0, help="augmentation seed")
+    args = parser.parse_args()
+    if args.augment and args.stream:
+        parser.error("--augment keeps the augmented features in memory; drop --stream")
+
+    store = open_feature_store(refresh=args.refresh, workers=args.workers)
+    y = store.labels
+
+    train_idx, val_idx = train_val_split(store)
+
+    if args.stream:
+        scaler = fit_scaler(store, train_idx)
+        train_data = keras_batches(store, train_idx, scaler, batch_size=16, seed=42)
+        val_data = keras_batches(store, val_idx, scaler, batch_size=4096, shuffle=False)
+        fit_kwargs = {}
+    else:
+        X = store.features()
+        X_train, y_train = X[train_idx], y[train_idx]
+        scaler = StandardScaler()
+        if args.augment:
+            clips = [(i, store.clips[i]["path"], int(y[i])) for i in train_idx]
+            # Epoch 0's variants also fit the scaler; later epochs draw new ones
+            X_aug, y_aug = epoch_variants(clips, args.augment, args.seed, 0, workers=args.workers)
+            print(f"✅ Augmented: {len(X_aug)} variants of {len(train_idx)} training clips per epoch")
+            scaler.fit(np.concatenate([X_train, X_aug]) if len(X_aug) else X_train)
+            train_data = augmented_batches(X_train, y_train, clips, scaler, args.augment, args.seed,
+                                           batch_size=16, workers=args.workers, first_epoch=(X_aug, y_aug))
+            fit_kwargs = {}
+        else:
+            train_data = scaler.fit_transform(X_train)
+            fit_kwargs = {"y": y_train, "batch_size": 16}
+        val_data = (scaler.transform(X[val_idx]), y[val_idx])
+
+    model = Sequential([
+        Dense(64, activation="relu", input_shape=(store.n_features,)),
+        Dense(32, activation="relu"),
+        Dense(1, activation="sigmoid")
+    ])
+
+    model.compile(
+        optimizer=Adam(learning_rate=0.001),
+        loss="binary_crossentropy",
+        metrics=["accuracy"]
+    )
+
+    early_stop = EarlyStopping(
+        monitor="val_loss",
+        patience=5,
+        restore_best_weights=True
+    )
+
+    model.fit(
+        train_data,
+        validation_data=val_data,
+        epochs=50,
+        callbacks=[early_stop],
+        verbose=1,
+        **fit_kwargs
+    )
+
+    model.save("training/model.h5")
+    joblib.dump(scaler, "training/scaler.pkl")